@@ -2,6 +2,7 @@ import re
 from agents.base import BaseAgent
 from airis.llm import llm_client
 from airis.sandbox import Sandbox
+import difflib
 import os
 import ast # Import ast module for syntax checking
 
@@ -15,6 +16,23 @@ class CodeAgent(BaseAgent):
         """
         Generates Python code, executes it, and returns the result along with the code.
         Includes a retry mechanism for syntax errors.
+
+        A ``code`` keyword argument (e.g. a speculative draft generated while
+        the user was still confirming the spec) skips generation.
+        """
+        code = kwargs.get("code")
+        if code is None:
+            error, code = self.generate(task)
+            if error:
+                return error, code
+        return self.run(code, kwargs.get("request_context"))
+
+    def generate(self, task: str) -> tuple[str | None, str]:
+        """
+        Generates syntactically correct Python code for a task.
+
+        Returns:
+            (error message or None, code)
         """
         max_retries = 3
         last_error = None
@@ -29,40 +47,75 @@ Task: {task}
                 prompt += f"\n\nPrevious attempt failed with a syntax error: {last_error}. Please correct the code."
             
             response = llm_client.invoke(prompt)
-            code = response.content.strip()
-            
-            # Check if the code starts with a markdown block delimiter
-            if code.startswith("```python"):
-                code = code[len("```python"):].lstrip() # Remove "```python" and leading whitespace
-            elif code.startswith("```"):
-                code = code[len("```"):].lstrip() # Remove "```" and leading whitespace
-                
-            # Check if the code ends with a markdown block delimiter
-            if code.endswith("```"):
-                code = code[:-len("```")].rstrip() # Remove "```" and trailing whitespace
-
-            # --- NEW: Post-process to close unterminated triple-quoted strings ---
-            # This is a heuristic to fix common LLM errors where docstrings are cut off.
-            if code.count('"""') % 2 != 0:
-                code += '"""'
-            if code.count("'''") % 2 != 0:
-                code += "'''"
-            # --- END NEW ---
+            code = self._clean(response.content)
 
             try:
                 compile(code, '<string>', 'exec')
-                # If compilation is successful, break the retry loop
-                break
+                return None, code
             except SyntaxError as e:
                 last_error = e
                 if attempt == max_retries - 1:
                     return f"Generated code has a persistent syntax error after {max_retries} attempts: {e}", code
                 # Continue to next attempt
-        else: # This else block executes if the loop completes without a 'break'
-            return "Failed to generate syntactically correct code after multiple attempts.", ""
+        return "Failed to generate syntactically correct code after multiple attempts.", ""
+
+    def revise(self, code: str, previous_task: str, task: str) -> tuple[str | None, str]:
+        """
+        Updates code written for ``previous_task`` to fit a slightly changed ``task``.
+
+        One call that edits the existing code, instead of generating it from scratch.
+
+        Returns:
+            (error message or None, code)
+        """
+        diff = "\n".join(difflib.unified_diff(
+            previous_task.splitlines(), task.splitlines(), "previous task", "task", lineterm=""
+        ))
+        prompt = f"""The following Python code was written for a task that has since changed slightly.
+Update the code so that it fits the changed task, keeping everything else as it is. Only output the complete code, without any explanation or markdown formatting.
+
+Changes to the task:
+{diff}
+
+Task: {task}
+
+Code:
+{code}
+"""
+        revised = self._clean(llm_client.invoke(prompt).content)
+        try:
+            compile(revised, '<string>', 'exec')
+        except SyntaxError as e:
+            return f"Revised code has a syntax error: {e}", revised
+        return None, revised
+
+    @staticmethod
+    def _clean(code: str) -> str:
+        """Strip markdown fences and close cut-off triple-quoted strings."""
+        code = code.strip()
+        # Check if the code starts with a markdown block delimiter
+        if code.startswith("```python"):
+            code = code[len("```python"):].lstrip() # Remove "```python" and leading whitespace
+        elif code.startswith("```"):
+            code = code[len("```"):].lstrip() # Remove "```" and leading whitespace
+            
+        # Check if the code ends with a markdown block delimiter
+        if code.endswith("```"):
+            code = code[:-len("```")].rstrip() # Remove "```" and trailing whitespace
+
+        # --- NEW: Post-process to close unterminated triple-quoted strings ---
+        # This is a heuristic to fix common LLM errors where docstrings are cut off.
+        if code.count('"""') % 2 != 0:
+            code += '"""'
+        if code.count("'''") % 2 != 0:
+            code += "'''"
+        # --- END NEW ---
+        return code
 
+    def run(self, code: str, request_context=None) -> tuple[str, str]:
+        """Executes code in the sandbox and returns (result, code)."""
         # Execute code directly in sandbox using python -c
-        working_dir = os.getcwd()
+        working_dir = request_context.working_dir if request_context else os.getcwd()
         
         # Use base64 encoding to avoid shell escaping issues
         import base64
@@ -74,7 +127,7 @@ code = base64.b64decode('{encoded_code}').decode('utf-8')
 exec(code)
 " """
         
-        stdout, stderr, exit_code = self.sandbox.run_command(python_cmd, working_dir)
+        stdout, stderr, exit_code = self.sandbox.run_command(python_cmd, working_dir, request_context)
 
         if exit_code == 0:
             result = f"Code executed successfully.\nOutput:\n{stdout}"
@@ -1,8 +1,9 @@
-import requests
 import os
 import subprocess
 import json
+from airis.cancellation import OperationCancelled, run_cancellable
 from airis.config import config
+from airis.request_context import call_budget, current_request
 from .base import BaseAgent
 
 class CursorAgent(BaseAgent):
@@ -30,13 +31,28 @@ class CursorAgent(BaseAgent):
             print("Warning: CURSOR_API_KEY not found in environment variables. Cursor API calls might fail.")
 
     def _make_request(self, method: str, endpoint: str, data: dict = None) -> dict:
+        # Imported lazily to keep CLI startup fast
+        import requests
+
         headers = {"Content-Type": "application/json"}
 
         url = f"{self.api_url}/{endpoint}"
+        request = current_request()
+        timeout = call_budget(config.snapshot.timeouts.http)
+        # A session of our own, so cancelling the request can close its connection
+        session = requests.Session()
         try:
-            response = requests.request(method, url, json=data, headers=headers)
+            response = run_cancellable(
+                lambda: session.request(method, url, json=data, headers=headers, timeout=timeout),
+                request.cancellation if request is not None else None,
+                timeout,
+                on_cancel=session.close,
+                name="Cursor request",
+            )
             response.raise_for_status() # Raise HTTPError for bad responses (4xx or 5xx)
             return response.json()
+        except OperationCancelled:
+            raise
         except requests.exceptions.ConnectionError:
             print(f"Error: Could not connect to Cursor Background Agent at {self.api_url}. Is Cursor running with the agent enabled?")
             return {"error": "Connection failed"}
@@ -46,6 +62,8 @@ class CursorAgent(BaseAgent):
         except Exception as e:
             print(f"An unexpected error occurred: {e}")
             return {"error": str(e)}
+        finally:
+            session.close()
 
     def get_active_file_content(self) -> tuple[str, str]:
         """
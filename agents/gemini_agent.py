@@ -1,7 +1,8 @@
 import os
-import google.generativeai as genai
 from .base import BaseAgent
+from airis.cancellation import OperationCancelled, run_cancellable
 from airis.config import config
+from airis.request_context import call_budget, current_request
 
 class GeminiAgent(BaseAgent):
     """
@@ -14,6 +15,9 @@ class GeminiAgent(BaseAgent):
             print("Warning: GEMINI_API_KEY not found in environment variables.")
             return
         
+        # Imported lazily: the Gemini SDK is expensive to import
+        import google.generativeai as genai
+        
         # Configure Gemini
         genai.configure(api_key=self.api_key)
         # Use the latest stable model with correct API version
@@ -30,15 +34,26 @@ class GeminiAgent(BaseAgent):
         """
         Generate content using Gemini API.
         """
+        import google.generativeai as genai
+        request = current_request()
+        timeout = call_budget(config.snapshot.timeouts.llm_call)
         try:
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=self.max_tokens,
-                    temperature=self.temperature,
-                )
+            response = run_cancellable(
+                lambda: self.model.generate_content(
+                    prompt,
+                    generation_config=genai.types.GenerationConfig(
+                        max_output_tokens=self.max_tokens,
+                        temperature=self.temperature,
+                    ),
+                    request_options={"timeout": timeout},
+                ),
+                request.cancellation if request is not None else None,
+                timeout,
+                name="Gemini call",
             )
             return response.text
+        except OperationCancelled:
+            raise
         except Exception as e:
             return f"エラー: Gemini API呼び出しに失敗しました - {e}"
     
@@ -1,5 +1,8 @@
 import subprocess
 import os
+from airis.cancellation import OperationCancelled
+from airis.config import config
+from airis.request_context import call_budget, current_request
 from .base import BaseAgent
 
 class GitAgent(BaseAgent):
@@ -13,20 +16,37 @@ class GitAgent(BaseAgent):
     def _run_git_command(self, command: str, cwd: str = None) -> tuple[str, str, int]:
         """
         Run a git command and return stdout, stderr, and exit code.
+        
+        The command gets the current request's remaining time (capped at
+        timeouts.git) and is killed if the request is cancelled.
         """
+        request = current_request()
+        timeout = call_budget(config.snapshot.timeouts.git)
         try:
             # Use shell=True for proper command parsing
-            result = subprocess.run(
+            with subprocess.Popen(
                 command,
                 cwd=cwd or os.getcwd(),
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 text=True,
-                timeout=30,
                 shell=True
-            )
-            return result.stdout.strip(), result.stderr.strip(), result.returncode
-        except subprocess.TimeoutExpired:
-            return "", "Git command timed out", 1
+            ) as process:
+                try:
+                    if request is not None:
+                        with request.cancellation.on_cancel(process.kill):
+                            stdout, stderr = process.communicate(timeout=timeout)
+                        if request.cancellation.cancelled:
+                            raise OperationCancelled(f"Git command cancelled: {request.cancellation.reason}")
+                    else:
+                        stdout, stderr = process.communicate(timeout=timeout)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.communicate()
+                    return "", "Git command timed out", 1
+            return stdout.strip(), stderr.strip(), process.returncode
+        except OperationCancelled:
+            raise
         except Exception as e:
             return "", f"Error running git command: {e}", 1
     
@@ -92,15 +112,19 @@ class GitAgent(BaseAgent):
         Execute git operations based on the instruction.
         """
         
+        # Run in the request's working directory when one is given
+        request_context = kwargs.get("request_context")
+        path = request_context.working_dir if request_context else None
+
         # Check if we're in a git repository
-        if not self._check_git_repo():
+        if not self._check_git_repo(path):
             return "エラー: 現在のディレクトリはgitリポジトリではありません。"
         
         # Parse instruction
         instruction_lower = instruction.lower()
         
         if "status" in instruction_lower or "状態" in instruction_lower:
-            status = self._get_git_status()
+            status = self._get_git_status(path)
             if status:
                 return f"Git status:\n{status}"
             else:
@@ -115,7 +139,7 @@ class GitAgent(BaseAgent):
                 file_matches = re.findall(r'(\S+\.\w+)', instruction)
                 files = file_matches
             
-            stdout, stderr, exit_code = self._add_files(files if files else None)
+            stdout, stderr, exit_code = self._add_files(files if files else None, path)
             if exit_code == 0:
                 return f"Files added to staging area: {stdout or 'All changes'}"
             else:
@@ -131,7 +155,7 @@ class GitAgent(BaseAgent):
                 if msg_match:
                     message = msg_match.group(1)
             
-            stdout, stderr, exit_code = self._commit_changes(message)
+            stdout, stderr, exit_code = self._commit_changes(message, path)
             if exit_code == 0:
                 return f"Changes committed: {stdout}"
             else:
@@ -146,7 +170,7 @@ class GitAgent(BaseAgent):
                 if branch_match:
                     branch = branch_match.group(1)
             
-            stdout, stderr, exit_code = self._push_changes(branch)
+            stdout, stderr, exit_code = self._push_changes(branch, path)
             if exit_code == 0:
                 return f"Changes pushed to {branch}: {stdout}"
             else:
@@ -157,11 +181,11 @@ class GitAgent(BaseAgent):
             results = []
             
             # Setup git config if needed
-            self._setup_git_config()
+            self._setup_git_config(path)
             results.append("✅ Git configuration checked/set")
             
             # Add all changes
-            stdout, stderr, exit_code = self._add_files()
+            stdout, stderr, exit_code = self._add_files(path=path)
             if exit_code == 0:
                 results.append("✅ Files added to staging area")
             else:
@@ -170,7 +194,7 @@ class GitAgent(BaseAgent):
             
             # Commit with auto message
             message = "Auto-commit: Code changes by Airis"
-            stdout, stderr, exit_code = self._commit_changes(message)
+            stdout, stderr, exit_code = self._commit_changes(message, path)
             if exit_code == 0:
                 results.append("✅ Changes committed")
             else:
@@ -178,7 +202,7 @@ class GitAgent(BaseAgent):
                 return "\n".join(results)
             
             # Push to main branch
-            stdout, stderr, exit_code = self._push_changes()
+            stdout, stderr, exit_code = self._push_changes(path=path)
             if exit_code == 0:
                 results.append("✅ Changes pushed to remote repository")
             else:
@@ -22,8 +22,9 @@ Task: {task}
         response = llm_client.invoke(prompt)
         command = response.content
         
-        working_dir = os.getcwd()
-        stdout, stderr, exit_code = self.sandbox.run_command(command, working_dir)
+        request_context = kwargs.get("request_context")
+        working_dir = request_context.working_dir if request_context else os.getcwd()
+        stdout, stderr, exit_code = self.sandbox.run_command(command, working_dir, request_context)
 
         if exit_code == 0:
             return f"Command executed successfully.\nOutput:\n{stdout}"
@@ -6,6 +6,7 @@ It performs double-checking to ensure accuracy and quality of responses.
 """
 
 from .base import BaseAgent
+from airis.cancellation import OperationCancelled
 from airis.llm import LLMClient
 
 class ValidatorAgent(BaseAgent):
@@ -74,7 +75,7 @@ class ValidatorAgent(BaseAgent):
 """
         
         try:
-            validation_result = self.llm_client.invoke(validation_prompt)
+            validation_result = self.llm_client.invoke(validation_prompt, profile="validation_verdict")
             result_text = validation_result.content.strip()
             
             # Parse validation result
@@ -88,6 +89,8 @@ class ValidatorAgent(BaseAgent):
                 # Fallback: if format is unclear, assume OK
                 return f"VALIDATION_OK|{result_text}"
                 
+        except OperationCancelled:
+            raise
         except Exception as e:
             return f"VALIDATION_ERROR|検証中にエラーが発生しました: {str(e)}"
     
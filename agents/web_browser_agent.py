@@ -1,7 +1,8 @@
 from .base import BaseAgent
+from airis.cancellation import run_cancellable
+from airis.config import config
 from airis.llm import LLMClient
-import requests
-from bs4 import BeautifulSoup
+from airis.request_context import call_budget, current_request
 import re
 
 class WebBrowserAgent(BaseAgent):
@@ -22,11 +23,24 @@ class WebBrowserAgent(BaseAgent):
 
     def _fetch_and_parse(self, url: str) -> str:
         """Fetches a URL and extracts clean text content."""
+        # Imported lazily to keep CLI startup fast
+        import requests
+        from bs4 import BeautifulSoup
+
         try:
             headers = {
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
             }
-            response = requests.get(url, headers=headers, timeout=10)
+            request = current_request()
+            timeout = call_budget(config.snapshot.timeouts.http)
+            with requests.Session() as session:
+                response = run_cancellable(
+                    lambda: session.get(url, headers=headers, timeout=timeout),
+                    request.cancellation if request is not None else None,
+                    timeout,
+                    on_cancel=session.close,
+                    name="URL fetch",
+                )
             response.raise_for_status() # Raise an exception for bad status codes
 
             soup = BeautifulSoup(response.text, 'lxml')
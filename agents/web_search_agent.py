@@ -1,6 +1,8 @@
 from .base import BaseAgent
+from airis.cancellation import OperationCancelled, run_cancellable
+from airis.config import config
 from airis.llm import LLMClient
-from ddgs import DDGS
+from airis.request_context import call_budget, current_request
 
 class WebSearchAgent(BaseAgent):
     """
@@ -30,12 +32,21 @@ class WebSearchAgent(BaseAgent):
         Current User Instruction: "{instruction}"
         """
         
-        query = self.llm_client.invoke(prompt).content.strip()
+        query = self.llm_client.invoke(prompt, profile="query_rewrite").content.strip()
 
         try:
-            with DDGS() as ddgs:
+            # Imported lazily to keep CLI startup fast
+            from ddgs import DDGS
+            request = current_request()
+            timeout = call_budget(config.snapshot.timeouts.http)
+            with DDGS(timeout=max(1, int(timeout))) as ddgs:
                 # max_results=5 to keep it concise
-                results = list(ddgs.text(query, max_results=5))
+                results = run_cancellable(
+                    lambda: list(ddgs.text(query, max_results=5)),
+                    request.cancellation if request is not None else None,
+                    timeout,
+                    name="web search",
+                )
             
             if not results:
                 return "No search results found."
@@ -61,5 +72,7 @@ class WebSearchAgent(BaseAgent):
             summary = self.llm_client.invoke(summary_prompt)
             return summary.content
 
+        except OperationCancelled:
+            raise
         except Exception as e:
             return f"Error during web search or summarization: {e}"
@@ -0,0 +1,218 @@
+"""
+Lazy Agent Registry
+
+Agents are declared, not constructed. Each entry is an entry-point style
+reference ("module:attribute") or a zero-argument factory, and the agent is
+only imported and instantiated the first time it is requested. This keeps
+Orchestrator startup cheap: a shell request never pays for Docker clients,
+Gemini configuration or Cursor filesystem probing of unrelated agents.
+
+Third-party agents are discovered through the ``airis.agents`` entry point
+group and load just as lazily as the built-in ones.
+"""
+
+import importlib
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = "airis.agents"
+
+# Built-in agents, declared like entry points ("module:attribute")
+BUILTIN_AGENTS: Dict[str, str] = {
+    "code": "agents.code_agent:CodeAgent",
+    "shell": "agents.shell_agent:ShellAgent",
+    "cursor": "agents.cursor_agent:CursorAgent",
+    "web_search": "agents.web_search_agent:WebSearchAgent",
+    "web_browser": "agents.web_browser_agent:WebBrowserAgent",
+    "doc_completion": "agents.document_completion_agent:DocumentCompletionAgent",
+    "git": "agents.git_agent:GitAgent",
+    "gemini": "agents.gemini_agent:GeminiAgent",
+    "validator": "agents.validator_agent:ValidatorAgent",
+}
+
+# Agents that are typically needed right after a given agent ran
+LIKELY_NEXT_AGENTS: Dict[str, List[str]] = {
+    "code": ["git", "validator"],
+    "gemini": ["validator"],
+    "web_search": ["validator"],
+    "web_browser": ["validator"],
+    "doc_completion": ["validator"],
+    "cursor": ["code", "validator"],
+}
+
+AgentSpec = Union[str, Callable[[], object]]
+
+
+def _resolve(reference: str) -> Callable[[], object]:
+    """Import a "module:attribute" reference and return the attribute."""
+    module_name, _, attr = reference.partition(":")
+    if not module_name or not attr:
+        raise ValueError(f"Invalid agent reference '{reference}' (expected 'module:attribute')")
+    target = importlib.import_module(module_name)
+    for part in attr.split("."):
+        target = getattr(target, part)
+    return target
+
+
+class AgentRegistry:
+    """
+    Registry that constructs agents on first use.
+
+    Supports dict-style access (``registry["code"]``, ``"code" in registry``)
+    so existing ``self.agents[name]`` call sites keep working.
+    """
+
+    def __init__(self, specs: Optional[Dict[str, AgentSpec]] = None,
+                 entry_point_group: Optional[str] = ENTRY_POINT_GROUP):
+        """
+        Initialize the registry.
+
+        Args:
+            specs: Mapping of agent name to "module:attribute" or factory.
+                Defaults to BUILTIN_AGENTS.
+            entry_point_group: Entry point group scanned for third-party
+                agents, or None to disable discovery.
+        """
+        self._specs: Dict[str, AgentSpec] = dict(BUILTIN_AGENTS if specs is None else specs)
+        self._instances: Dict[str, object] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+        self._entry_point_group = entry_point_group
+        self._entry_points_loaded = entry_point_group is None
+        self.init_timings: Dict[str, float] = {}
+
+    def register(self, name: str, spec: AgentSpec, replace: bool = False) -> None:
+        """
+        Declare an agent without constructing it.
+
+        Args:
+            name: Agent name used for routing
+            spec: "module:attribute" reference or zero-argument factory
+            replace: Overwrite an existing declaration with the same name
+        """
+        with self._registry_lock:
+            if name in self._specs and not replace:
+                logger.warning(f"Agent '{name}' is already registered; ignoring duplicate")
+                return
+            self._specs[name] = spec
+            self._instances.pop(name, None)
+
+    def _discover_entry_points(self) -> None:
+        """Register third-party agents from the entry point group (metadata only, no imports)."""
+        if self._entry_points_loaded:
+            return
+        self._entry_points_loaded = True
+        try:
+            from importlib.metadata import entry_points
+            discovered = entry_points(group=self._entry_point_group)
+        except Exception as e:
+            logger.warning(f"Failed to discover agent entry points: {e}")
+            return
+        for ep in discovered:
+            # Built-in agents take precedence over plugins with the same name
+            if ep.name not in self._specs:
+                self._specs[ep.name] = ep.value
+
+    def _lock_for(self, name: str) -> threading.Lock:
+        with self._registry_lock:
+            lock = self._locks.get(name)
+            if lock is None:
+                lock = self._locks[name] = threading.Lock()
+            return lock
+
+    def get(self, name: str):
+        """
+        Return the agent, constructing it on first use.
+
+        Raises:
+            KeyError: If no agent with that name is declared
+        """
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        if name not in self._specs:
+            self._discover_entry_points()
+            if name not in self._specs:
+                raise KeyError(name)
+
+        with self._lock_for(name):
+            # Another thread (e.g. a prewarm) may have finished meanwhile
+            instance = self._instances.get(name)
+            if instance is not None:
+                return instance
+
+            spec = self._specs[name]
+            start = time.perf_counter()
+            factory = _resolve(spec) if isinstance(spec, str) else spec
+            instance = factory()
+            self.init_timings[name] = time.perf_counter() - start
+            self._instances[name] = instance
+            logger.debug(f"Agent '{name}' initialized in {self.init_timings[name] * 1000:.1f}ms")
+            return instance
+
+    def __getitem__(self, name: str):
+        return self.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        if name in self._specs:
+            return True
+        self._discover_entry_points()
+        return name in self._specs
+
+    def names(self) -> List[str]:
+        """Return all declared agent names (built-in and discovered)."""
+        self._discover_entry_points()
+        return list(self._specs)
+
+    def is_loaded(self, name: str) -> bool:
+        """Check whether an agent has already been constructed."""
+        return name in self._instances
+
+    def prewarm(self, names: Iterable[str], background: bool = True) -> Optional[threading.Thread]:
+        """
+        Construct agents ahead of time.
+
+        Args:
+            names: Agent names to construct
+            background: Construct in a daemon thread instead of blocking
+
+        Returns:
+            The worker thread when running in the background, otherwise None
+        """
+        pending = [n for n in names if not self.is_loaded(n) and n in self]
+        if not pending:
+            return None
+
+        def _warm():
+            for name in pending:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    # Prewarming is best effort; the real call will surface the error
+                    logger.warning(f"Prewarming agent '{name}' failed: {e}")
+
+        if not background:
+            _warm()
+            return None
+        thread = threading.Thread(target=_warm, name="airis-agent-prewarm", daemon=True)
+        thread.start()
+        return thread
+
+    def prewarm_likely_next(self, agent_name: str) -> Optional[threading.Thread]:
+        """Prewarm the agents that usually follow ``agent_name`` in the background."""
+        return self.prewarm(LIKELY_NEXT_AGENTS.get(agent_name, []))
+
+    def get_status(self) -> str:
+        """Format declared agents, load state and init timings for display."""
+        lines = ["=== Agents ==="]
+        for name in self.names():
+            if name in self.init_timings:
+                lines.append(f"  {name}: loaded ({self.init_timings[name] * 1000:.1f}ms)")
+            else:
+                lines.append(f"  {name}: not loaded")
+        return "\n".join(lines)
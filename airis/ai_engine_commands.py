@@ -6,6 +6,10 @@ This module provides commands for managing AI engine selection and configuration
 
 from airis.ai_engine_manager import ai_engine_manager
 from airis.config import config
+from airis.config_schema import ROUTING_POLICIES
+from airis.engine_stats import engine_stats
+from airis.resilience import format_metrics
+from airis.usage_ledger import usage_ledger
 import yaml
 import os
 
@@ -31,9 +35,7 @@ class AIEngineCommands:
             return f"Error: Engine '{engine}' is not available. Available engines: {ai_engine_manager.get_available_engines()}"
         
         # Update config
-        task_routing = config.get("ai_engines.task_routing", {})
-        task_routing[task_type] = engine
-        config.set("ai_engines.task_routing", task_routing)
+        config.set(f"ai_engines.task_routing.{task_type}", engine)
         ai_engine_manager.task_routing[task_type] = engine
         
         return f"Task '{task_type}' now uses engine: {engine}"
@@ -51,9 +53,10 @@ class AIEngineCommands:
         if invalid_engines:
             return f"Error: Invalid engines: {invalid_engines}. Available engines: {available_engines}"
         
-        # Update config
-        config.set("ai_engines.compliance_mode", True)
-        config.set("ai_engines.allowed_engines", allowed_engines)
+        # Update config (single atomic write)
+        with config.batch():
+            config.set("ai_engines.compliance_mode", True)
+            config.set("ai_engines.allowed_engines", allowed_engines)
         ai_engine_manager.set_compliance_mode(True, allowed_engines)
         
         return f"Compliance mode enabled. Allowed engines: {allowed_engines}"
@@ -77,9 +80,10 @@ class AIEngineCommands:
                 "free": "local"
             }
         
-        # Update config
-        config.set("ai_engines.cost_optimization", True)
-        config.set("ai_engines.cost_preferences", preferences)
+        # Update config (single atomic write)
+        with config.batch():
+            config.set("ai_engines.cost_optimization", True)
+            config.set("ai_engines.cost_preferences", preferences)
         ai_engine_manager.set_cost_optimization(True, preferences)
         
         return f"Cost optimization enabled. Preferences: {preferences}"
@@ -92,6 +96,17 @@ class AIEngineCommands:
         
         return "Cost optimization disabled"
     
+    @staticmethod
+    def set_routing_policy(policy: str) -> str:
+        """Switch between static task routing and latency-aware routing."""
+        if policy not in ROUTING_POLICIES:
+            return f"Error: Unknown routing policy '{policy}'. Choose from: {', '.join(ROUTING_POLICIES)}"
+        
+        config.set("routing.policy", policy)
+        ai_engine_manager.routing_policy = policy
+        
+        return f"Routing policy set to: {policy}"
+    
     @staticmethod
     def set_engine_availability(engine: str, available: bool) -> str:
         """Set engine availability."""
@@ -108,7 +123,8 @@ class AIEngineCommands:
         result += f"Default Engine: {info['default_engine']}\n"
         result += f"Available Engines: {', '.join(info['available_engines'])}\n"
         result += f"Compliance Mode: {info['compliance_mode']}\n"
-        result += f"Cost Optimization: {info['cost_optimization']}\n\n"
+        result += f"Cost Optimization: {info['cost_optimization']}\n"
+        result += f"Routing Policy: {info['routing_policy']}\n\n"
         
         result += "Task Routing:\n"
         for task, engine in info['task_routing'].items():
@@ -119,21 +135,41 @@ class AIEngineCommands:
             status = "✓" if available else "✗"
             result += f"  {engine}: {status}\n"
         
+        if info['failover']:
+            result += "\nFailover Chains:\n"
+            for task, chain in info['failover'].items():
+                result += f"  {task}: {' -> '.join(chain)}\n"
+        
+        if info['served_counts']:
+            result += f"\nServed By (failovers: {info['failover_count']}):\n"
+            for task, counts in info['served_counts'].items():
+                served = ", ".join(f"{engine}={count}" for engine, count in counts.items())
+                result += f"  {task}: {served}\n"
+        
+        if info['hedge_stats']:
+            result += "\nHedged Requests:\n"
+            for task, stats in info['hedge_stats'].items():
+                rate = stats['hedged'] / stats['calls'] if stats['calls'] else 0.0
+                result += (f"  {task}: {stats['calls']} calls, hedged {stats['hedged']} ({rate:.0%}), "
+                           f"secondary won {stats['secondary_wins']}\n")
+        
+        result += "\nEngine Health (rate limits / retries / circuit breaker):\n"
+        result += format_metrics() + "\n"
+        
+        result += "\nEngine Latency (EWMA per task type):\n"
+        result += engine_stats.format() + "\n"
+        
+        result += "\nToken Usage (per project / engine):\n"
+        result += usage_ledger.format() + "\n"
+        
         return result
     
     @staticmethod
     def save_config() -> str:
         """Save current configuration to config.yaml."""
         try:
-            # Get current config
-            current_config = config.settings
-            
-            # Write to file
-            config_path = "config.yaml"
-            with open(config_path, 'w') as f:
-                yaml.dump(current_config, f, default_flow_style=False, allow_unicode=True)
-            
-            return f"Configuration saved to {config_path}"
+            config.save()
+            return f"Configuration saved to {config.config_path}"
         except Exception as e:
             return f"Error saving configuration: {e}"
     
@@ -143,7 +179,7 @@ class AIEngineCommands:
         import yaml
         
         # Read config file directly
-        with open("config.yaml", 'r') as f:
+        with open(config.config_path, 'r') as f:
             file_config = yaml.safe_load(f)
         
         # Get config from Config object
@@ -192,8 +228,9 @@ class AIEngineCommands:
         }
         
         # Update config
-        for key, value in default_config.items():
-            config.set(key, value)
+        with config.batch():
+            for key, value in default_config.items():
+                config.set(key, value)
         
         # Reload AI engine manager
         ai_engine_manager._load_configuration()
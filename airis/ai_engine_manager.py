@@ -7,10 +7,20 @@ compliance requirements, and cost optimization settings.
 
 from typing import Dict, List, Optional, Any
 from airis.config import config
+from airis.engine_stats import engine_stats
+from airis.resilience import is_healthy
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Engines that can serve LLM prompts (and therefore appear in failover chains)
+LLM_ENGINES = ("gemini", "claude")
+
+# Relative price of each engine; latency routing never picks a pricier engine
+# than the cost-optimized choice
+ENGINE_COST_RANK = {"local": 0, "web_search": 1, "web_browser": 1, "gemini": 2, "cursor": 2, "claude": 3}
+
 class AIEngineManager:
     """
     Manages AI engine selection and routing based on configuration.
@@ -18,21 +28,8 @@ class AIEngineManager:
     
     def __init__(self):
         self.config = config
-        self._load_configuration()
-    
-    def _load_configuration(self):
-        """Load AI engine configuration from config.yaml"""
-        # Reload config from file to get latest settings
-        self.config.settings = self.config._load_config()
-        
-        self.default_engine = self.config.get("ai_engines.default_engine", "claude")
-        self.task_routing = self.config.get("ai_engines.task_routing", {})
-        self.compliance_mode = self.config.get("ai_engines.compliance_mode", False)
-        self.allowed_engines = self.config.get("ai_engines.allowed_engines", [])
-        self.cost_optimization = self.config.get("ai_engines.cost_optimization", False)
-        self.cost_preferences = self.config.get("ai_engines.cost_preferences", {})
-        
-        # Engine availability mapping
+        self._config_version = None
+        # Engine availability mapping (runtime overrides, kept across reloads)
         self.engine_availability = {
             "claude": True,
             "gemini": True,
@@ -41,20 +38,74 @@ class AIEngineManager:
             "web_browser": True,
             "local": True
         }
+        # Which engine actually served each task type (after failover)
+        self.served_counts: Dict[str, Dict[str, int]] = {}
+        self.failover_count = 0
+        # Hedged calls per task type: calls, hedged, secondary_wins
+        self.hedge_stats: Dict[str, Dict[str, int]] = {}
+        self._stats_lock = threading.Lock()
+        self._load_configuration()
     
-    def get_engine_for_task(self, task_type: str, user_prompt: str = "") -> str:
+    def _load_configuration(self):
+        """Load AI engine configuration from config.yaml"""
+        # Pick up edits made to config.yaml by other processes (cheap stat check)
+        self.config.reload_if_changed()
+        if self.config.version == self._config_version:
+            return
+        self._config_version = self.config.version
+        
+        engines = self.config.snapshot.ai_engines
+        self.default_engine = engines.default_engine
+        self.task_routing = dict(engines.task_routing)
+        self.compliance_mode = engines.compliance_mode
+        self.allowed_engines = list(engines.allowed_engines)
+        self.cost_optimization = engines.cost_optimization
+        self.cost_preferences = dict(engines.cost_preferences)
+        self.failover = {task: list(chain) for task, chain in engines.failover.items()}
+        self.routing_policy = self.config.snapshot.routing.policy
+    
+    def get_engine_for_task(self, task_type: str, user_prompt: str = "", preferred: Optional[str] = None) -> str:
         """
         Determine the best AI engine for a given task.
         
         Args:
             task_type: Type of task (code_generation, document_generation, etc.)
             user_prompt: User's prompt for additional context
+            preferred: Per-request engine override; used when it is available
+                and permitted by compliance mode
             
         Returns:
             Selected engine name
         """
         # Reload configuration to get latest settings
         self._load_configuration()
+        if preferred and self._is_engine_available(preferred):
+            if not self.compliance_mode or preferred in self.allowed_engines:
+                return preferred
+            logger.warning(f"Engine override '{preferred}' is not allowed in compliance mode; ignoring")
+        engine = self._get_routed_engine(task_type, user_prompt)
+        if self.routing_policy == "latency" and engine in LLM_ENGINES:
+            engine = self._get_fastest_engine(task_type, engine)
+        return engine
+    
+    def _get_fastest_engine(self, task_type: str, routed: str) -> str:
+        """
+        Pick the fastest healthy LLM engine for a task type (routing.policy: latency).
+        
+        Candidates are the permitted, available LLM engines; with cost
+        optimization on, only engines no pricier than the routed one qualify.
+        """
+        candidates = [
+            engine for engine in LLM_ENGINES
+            if self._is_engine_permitted(engine) and self._is_engine_available(engine)
+            and (not self.cost_optimization or ENGINE_COST_RANK[engine] <= ENGINE_COST_RANK.get(routed, 0))
+        ]
+        if routed not in candidates:
+            candidates.insert(0, routed)
+        return engine_stats.rank(task_type, candidates)[0]
+    
+    def _get_routed_engine(self, task_type: str, user_prompt: str) -> str:
+        """Static routing: compliance mode, cost optimization, task_routing, default engine."""
         # Check compliance mode first
         if self.compliance_mode:
             return self._get_compliant_engine(task_type, user_prompt)
@@ -144,10 +195,70 @@ class AIEngineManager:
         else:
             return "medium"  # Default to medium complexity
     
+    def get_failover_chain(self, task_type: str, primary: Optional[str] = None) -> List[str]:
+        """
+        Ordered list of LLM engines to try for a task type.
+        
+        The primary engine comes first, followed by the configured failover
+        chain for the task type (or the "default" chain). Engines that are
+        disabled or not allowed (outside allowed_engines in compliance mode) are
+        dropped, and engines whose circuit breaker is open move to the end.
+        With routing.policy "latency" the chain is ordered fastest first
+        (see EngineStatsTracker.rank).
+        
+        Args:
+            task_type: Type of task (orchestration, interactive_mode, ...)
+            primary: Engine to try first (defaults to the routed engine)
+            
+        Returns:
+            Engine names, never empty
+        """
+        self._load_configuration()
+        primary = primary or self.task_routing.get(task_type) or self.default_engine
+        configured = self.failover.get(task_type) or self.failover.get("default") or []
+        chain = []
+        for engine in [primary, *configured]:
+            if engine in LLM_ENGINES and engine not in chain and self._is_engine_permitted(engine):
+                chain.append(engine)
+        if not chain:
+            # Let the primary engine raise its own configuration error
+            return [primary]
+        if self.routing_policy == "latency":
+            chain = engine_stats.rank(task_type, chain)
+        healthy = [engine for engine in chain if is_healthy(engine)]
+        return healthy + [engine for engine in chain if engine not in healthy]
+    
+    def _is_engine_permitted(self, engine: str) -> bool:
+        """Check the runtime availability switch and, in compliance mode, allowed_engines."""
+        if not self.engine_availability.get(engine, False):
+            return False
+        if self.compliance_mode and engine not in self.allowed_engines:
+            return False
+        return True
+    
+    def record_served(self, task_type: str, engine: str, failed_over: bool = False):
+        """Record which engine served a request for a task type."""
+        with self._stats_lock:
+            per_task = self.served_counts.setdefault(task_type, {})
+            per_task[engine] = per_task.get(engine, 0) + 1
+            if failed_over:
+                self.failover_count += 1
+    
+    def record_hedge(self, task_type: str, hedged: bool, won: bool):
+        """Record a hedge-eligible call, whether the second engine was fired and whether it won."""
+        with self._stats_lock:
+            stats = self.hedge_stats.setdefault(task_type, {"calls": 0, "hedged": 0, "secondary_wins": 0})
+            stats["calls"] += 1
+            stats["hedged"] += int(hedged)
+            stats["secondary_wins"] += int(won)
+    
     def _is_engine_available(self, engine: str) -> bool:
         """Check if an engine is available and properly configured."""
         if not self.engine_availability.get(engine, False):
             return False
+        # Engines whose circuit breaker is open are treated as down
+        if engine in LLM_ENGINES and not is_healthy(engine):
+            return False
         
         # Check specific engine requirements
         if engine == "claude":
@@ -183,7 +294,7 @@ class AIEngineManager:
         """Check if Cursor is available."""
         try:
             import shutil
-            cursor_path = self.config.get("cursor.path", "cursor")
+            cursor_path = self.config.snapshot.cursor.path
             return shutil.which(cursor_path) is not None
         except:
             return False
@@ -222,7 +333,12 @@ class AIEngineManager:
             "compliance_mode": self.compliance_mode,
             "cost_optimization": self.cost_optimization,
             "task_routing": self.task_routing,
-            "engine_availability": self.engine_availability
+            "engine_availability": self.engine_availability,
+            "failover": self.failover,
+            "served_counts": self.served_counts,
+            "failover_count": self.failover_count,
+            "routing_policy": self.routing_policy,
+            "hedge_stats": self.hedge_stats,
         }
 
 # Global instance
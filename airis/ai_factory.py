@@ -6,7 +6,51 @@ Ensures all AI usage goes through centralized configuration.
 """
 
 from airis.config import config
+from airis.ai_engine_manager import ai_engine_manager
+from airis.cancellation import CancellationToken, OperationCancelled, run_cancellable
+from airis.engine_stats import engine_stats
+from airis.prompt_cache import claude_messages, gemini_context_cache, gemini_history
+from airis.request_context import RequestContext, call_budget, current_request
+from airis.resilience import LLMError, ProviderUnavailableError, estimate_tokens, get_guard
+from airis.usage_ledger import provider_usage, usage_ledger
+import logging
 import os
+import contextvars
+import dataclasses
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Sequence
+
+logger = logging.getLogger(__name__)
+
+_hedge_pool = None
+_hedge_pool_lock = threading.Lock()
+
+
+def _get_hedge_pool() -> ThreadPoolExecutor:
+    """Shared worker threads for hedged LLM calls, started on first use."""
+    global _hedge_pool
+    if _hedge_pool is None:
+        with _hedge_pool_lock:
+            if _hedge_pool is None:
+                _hedge_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="airis-hedge")
+    return _hedge_pool
+
+
+class LLMResponse:
+    """Provider-independent response with a .content attribute."""
+    
+    def __init__(self, content: str, engine: str = None, input_tokens: int = None,
+                 output_tokens: int = None, estimated: bool = False, cache_read_tokens: int = 0):
+        self.content = content
+        self.engine = engine
+        # Token usage (provider-reported, or a local estimate when estimated is True)
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.estimated = estimated
+        # Input tokens read from the provider's prompt cache (included in input_tokens)
+        self.cache_read_tokens = cache_read_tokens
 
 
 class AIFactory:
@@ -27,35 +71,32 @@ class AIFactory:
             AI client instance
         """
         # Get the engine for this task type from config
-        engine = config.get(f"ai_engines.task_routing.{task_type}")
-        
-        if not engine:
-            # Fall back to default engine
-            engine = config.get("ai_engines.default_engine", "gemini")
+        engine = AIFactory.get_engine_for_task(task_type)
         
         # Verify engine is allowed
-        allowed_engines = config.get("ai_engines.allowed_engines", [])
+        allowed_engines = list(config.snapshot.ai_engines.allowed_engines)
         if engine not in allowed_engines:
             raise ValueError(f"Engine '{engine}' is not in allowed_engines list: {allowed_engines}")
         
         return AIFactory._create_client(engine)
     
     @staticmethod
-    def _create_client(engine: str):
+    def _create_client(engine: str, profile: str = None):
         """
         Create a client for the specified engine.
         
         Args:
             engine: Engine name (gemini, claude, cursor, etc.)
+            profile: Generation profile (see AIFactory.get_model_settings)
             
         Returns:
             Client instance
         """
         if engine == "gemini":
-            return AIFactory._create_gemini_client()
+            return AIFactory._create_gemini_client(AIFactory.get_model_settings("gemini", profile))
         
         elif engine == "claude":
-            return AIFactory._create_claude_client()
+            return AIFactory._create_claude_client(AIFactory.get_model_settings("claude", profile))
         
         elif engine == "cursor":
             from agents.cursor_agent import CursorAgent
@@ -79,7 +120,31 @@ class AIFactory:
             raise NotImplementedError(f"Engine '{engine}' is not implemented")
     
     @staticmethod
-    def _create_gemini_client():
+    def get_model_settings(engine: str, profile: str = None):
+        """
+        Generation settings for an engine, optionally for a generation profile.
+        
+        Profiles (the ``generation`` section of config.yaml) give short
+        utility prompts such as filename suggestions a small, fast model and
+        a tight token budget; engines a profile does not configure use their
+        own section.
+        
+        Args:
+            engine: "gemini" or "claude"
+            profile: Profile name (filename_suggestion, query_rewrite, ...)
+            
+        Returns:
+            ModelSettings
+        """
+        snapshot = config.snapshot
+        if profile:
+            settings = snapshot.generation.get(profile, {}).get(engine)
+            if settings is not None:
+                return settings
+        return getattr(snapshot, engine)
+    
+    @staticmethod
+    def _create_gemini_client(settings=None):
         """Create Gemini client."""
         import google.generativeai as genai
         import os
@@ -101,9 +166,10 @@ class AIFactory:
                 "Please set it in .env file or disable gemini in config.yaml"
             )
         
-        model_name = config.get("gemini.model_name", "gemini-2.5-pro")
-        max_tokens = config.get("gemini.max_tokens", 4000)
-        temperature = config.get("gemini.temperature", 0.1)
+        settings = settings or config.snapshot.gemini
+        model_name = settings.model_name
+        max_tokens = settings.max_tokens
+        temperature = settings.temperature
         
         genai.configure(api_key=api_key)
         return genai.GenerativeModel(
@@ -111,11 +177,12 @@ class AIFactory:
             generation_config=genai.types.GenerationConfig(
                 max_output_tokens=max_tokens,
                 temperature=temperature,
+                stop_sequences=list(settings.stop_sequences) or None,
             )
         )
     
     @staticmethod
-    def _create_claude_client():
+    def _create_claude_client(settings=None):
         """Create Claude client."""
         from langchain_anthropic import ChatAnthropic
         from dotenv import load_dotenv
@@ -129,15 +196,17 @@ class AIFactory:
                 "Please set it in .env file or disable claude in config.yaml"
             )
         
-        model_name = config.get("claude.model_name", "claude-sonnet-4-5-20250929")
-        max_tokens = config.get("claude.max_tokens", 4000)
-        temperature = config.get("claude.temperature", 0.1)
+        settings = settings or config.snapshot.claude
+        model_name = settings.model_name
+        max_tokens = settings.max_tokens
+        temperature = settings.temperature
         
         return ChatAnthropic(
             model=model_name,
             api_key=api_key,
             max_tokens=max_tokens,
-            temperature=temperature
+            temperature=temperature,
+            stop_sequences=list(settings.stop_sequences) or None,
         )
     
     @staticmethod
@@ -151,10 +220,8 @@ class AIFactory:
         Returns:
             Engine name
         """
-        engine = config.get(f"ai_engines.task_routing.{task_type}")
-        if not engine:
-            engine = config.get("ai_engines.default_engine", "gemini")
-        return engine
+        engines = config.snapshot.ai_engines
+        return engines.task_routing.get(task_type) or engines.default_engine
 
 
 class UnifiedAIClient:
@@ -166,50 +233,279 @@ class UnifiedAIClient:
     def __init__(self, task_type: str = "orchestration"):
         self.task_type = task_type
         self.engine = AIFactory.get_engine_for_task(task_type)
-        self.client = AIFactory.create_llm_client(task_type)
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._fallback_clients = {}
+        self._profile_clients = {}
+        self.last_engine = None
     
-    def invoke(self, prompt: str):
+    @property
+    def client(self):
+        """
+        Provider client, created on first use.
+        
+        Provider SDKs (google.generativeai, langchain_anthropic) are expensive
+        to import, so they are only loaded when a prompt is actually sent.
+        """
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = AIFactory.create_llm_client(self.task_type)
+        return self._client
+    
+    @client.setter
+    def client(self, value):
+        self._client = value
+    
+    @property
+    def provider(self) -> str:
+        """Engine whose API is actually called (non-LLM engines fall back to Gemini)."""
+        if self.engine in ("cursor", "web_search", "web_browser"):
+            return "gemini"
+        return self.engine
+    
+    def invoke(self, prompt: str, profile: str = None, prefix: str = None,
+               history: Sequence[Dict[str, str]] = ()):
         """
         Send a prompt to the AI and get a response.
         
+        Calls go through each engine's guard (rate limits, retries with
+        backoff, circuit breaker; see airis.resilience). When the engine
+        fails, the prompt transparently moves to the next engine of the task
+        type's failover chain (see AIEngineManager.get_failover_chain).
+        
+        For task types listed in routing.hedge_task_types the call is hedged:
+        if the first engine has not answered within its p90 latency, the
+        prompt is also sent to the second engine and the first answer wins.
+        
         Args:
-            prompt: Input prompt
+            prompt: Input prompt (the variable part when ``prefix`` is given)
+            profile: Generation profile for short utility prompts (e.g.
+                "filename_suggestion"); uses that profile's smaller model,
+                token budget and stop sequences
+            prefix: Stable prompt prefix (system / project context) that the
+                provider may cache across calls (see airis.prompt_cache);
+                sent as the system prompt
+            history: Earlier turns of a chat, oldest first, as
+                ``{"role": "user" | "assistant", "content": ...}``; sent
+                through the providers' chat APIs (see airis.chat.ChatSession)
             
         Returns:
-            Response object with .content attribute
+            LLMResponse with .content and .engine (the engine that served it)
+            
+        Raises:
+            LLMError: If every engine in the chain failed
         """
-        # Wrap response in object with .content attribute
-        class Response:
-            def __init__(self, content):
-                self.content = content
+        if self.engine == "local":
+            # Local operations don't use AI
+            raise ValueError("Local engine doesn't support invoke()")
+        if self.engine not in ("gemini", "claude", "cursor", "web_search", "web_browser"):
+            raise NotImplementedError(f"Engine '{self.engine}' invoke not implemented")
         
-        if self.engine == "gemini":
-            # Gemini returns GenerateContentResponse, extract text
+        chain = ai_engine_manager.get_failover_chain(self.task_type, primary=self.provider)
+        primary = chain[0]
+        tokens = estimate_tokens(prompt) + (estimate_tokens(prefix) if prefix else 0)
+        tokens += sum(estimate_tokens(message["content"]) for message in history)
+        last_error = None
+        if len(chain) > 1 and self.task_type in config.snapshot.routing.hedge_task_types:
             try:
-                response = self.client.generate_content(prompt)
-                return Response(response.text)
-            except Exception as e:
-                return Response(f"Gemini API Error: {str(e)}")
-        
-        elif self.engine == "claude":
-            # Claude returns AIMessage with .content
-            return self.client.invoke(prompt)
-        
-        elif self.engine in ["cursor", "web_search", "web_browser"]:
-            # These should not be used as LLM engines
-            # Fall back to Gemini
+                engine, response = self._invoke_hedged(chain[0], chain[1], prompt, tokens, profile, prefix, history)
+                return self._served(engine, primary, response)
+            except LLMError as e:
+                last_error = e
+                chain = chain[2:]
+        for engine in chain:
             try:
-                response = self.client.generate_content(prompt)
-                return Response(response.text)
-            except Exception as e:
-                return Response(f"API Error: {str(e)}")
+                response = self._call(engine, prompt, tokens, profile, prefix, history)
+            except LLMError as e:
+                last_error = e
+                if engine != chain[-1]:
+                    logger.warning(f"{e}; failing over to the next engine for '{self.task_type}'")
+                continue
+            return self._served(engine, primary, response)
+        raise last_error
+    
+    def _call(self, engine: str, prompt: str, tokens: int, profile: str = None, prefix: str = None,
+              history: Sequence[Dict[str, str]] = ()):
+        """One guarded call (rate limits, retries, circuit breaker) to an engine."""
+        return get_guard(engine).call(
+            lambda: self._invoke_once(engine, prompt, profile, prefix, history), tokens=tokens
+        )
+    
+    def _served(self, engine: str, primary: str, response):
+        self.last_engine = engine
+        request = current_request()
+        if request is not None and engine not in request.served_engines:
+            request.served_engines.append(engine)
+        ai_engine_manager.record_served(self.task_type, engine, failed_over=engine != primary)
+        return response
+    
+    def _invoke_hedged(self, primary: str, secondary: str, prompt: str, tokens: int, profile: str = None,
+                       prefix: str = None, history: Sequence[Dict[str, str]] = ()):
+        """
+        Race two engines for latency-critical prompts.
         
-        elif self.engine == "local":
-            # Local operations don't use AI
-            raise ValueError("Local engine doesn't support invoke()")
+        The secondary engine is only called when the primary has not
+        answered within its ``hedge_percentile`` latency (or failed). The
+        first successful answer wins. Each call runs as its own child of the
+        current request with its own cancellation token, which is cancelled
+        when the other call wins (or the request is cancelled), so the
+        losing call stops waiting on its provider and frees its worker.
         
-        else:
-            raise NotImplementedError(f"Engine '{self.engine}' invoke not implemented")
+        Returns:
+            (engine, response) of the winning call
+            
+        Raises:
+            LLMError: If both engines failed
+        """
+        settings = config.snapshot.routing
+        stats = engine_stats.get(primary, profile or self.task_type)
+        delay = (stats.percentile(settings.hedge_percentile) if stats else None) or settings.hedge_default_delay
+        pool = _get_hedge_pool()
+        request = current_request() or RequestContext()
+        legs: Dict[Future, CancellationToken] = {}
+        engines: Dict[Future, str] = {}
+
+        def _submit(engine: str) -> Future:
+            leg = dataclasses.replace(request, cancellation=CancellationToken())
+            # Each call runs in a copy of this context, as the current request
+            future = pool.submit(contextvars.copy_context().run, self._call_leg, leg, engine,
+                                 prompt, tokens, profile, prefix, history)
+            legs[future] = leg.cancellation
+            engines[future] = engine
+            return future
+
+        def _cancel_legs(reason: str) -> None:
+            for token in list(legs.values()):
+                token.cancel(reason)
+
+        started = time.monotonic()
+        with request.cancellation.on_cancel(lambda: _cancel_legs(request.cancellation.reason or "cancelled")):
+            pending = {_submit(primary)}
+            hedged = False
+            last_error = None
+            while pending:
+                timeout = None if len(engines) > 1 else max(0.0, started + delay - time.monotonic())
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        response = future.result()
+                    except LLMError as e:
+                        last_error = e
+                        continue
+                    for loser in pending:
+                        legs[loser].cancel("another engine answered first")
+                    engine = engines[future]
+                    ai_engine_manager.record_hedge(self.task_type, hedged, won=hedged and engine == secondary)
+                    return engine, response
+                if len(engines) == 1:
+                    # The primary is slower than usual (hedge) or already failed (plain failover)
+                    hedged = bool(pending)
+                    if hedged:
+                        logger.info(f"{primary} exceeded {delay:.1f}s for '{self.task_type}'; hedging with {secondary}")
+                    pending.add(_submit(secondary))
+        ai_engine_manager.record_hedge(self.task_type, hedged, won=False)
+        raise last_error
+
+    def _call_leg(self, leg: RequestContext, engine: str, prompt: str, tokens: int, profile: str = None,
+                  prefix: str = None, history: Sequence[Dict[str, str]] = ()):
+        """One call of a hedged race, run as the leg's own request."""
+        with leg.activate():
+            return self._call(engine, prompt, tokens, profile, prefix, history)
+    
+    def _client_for(self, engine: str, profile: str = None):
+        """Provider client for an engine of the failover chain (and profile), created on first use."""
+        if profile and engine in config.snapshot.generation.get(profile, {}):
+            key = (engine, profile)
+            client = self._profile_clients.get(key)
+            if client is None:
+                with self._client_lock:
+                    client = self._profile_clients.get(key)
+                    if client is None:
+                        client = self._profile_clients[key] = AIFactory._create_client(engine, profile)
+            return client
+        if engine == self.engine:
+            return self.client
+        client = self._fallback_clients.get(engine)
+        if client is None:
+            with self._client_lock:
+                client = self._fallback_clients.get(engine)
+                if client is None:
+                    client = self._fallback_clients[engine] = AIFactory._create_client(engine)
+        return client
+    
+    def _invoke_once(self, engine: str, prompt: str, profile: str = None, prefix: str = None,
+                     history: Sequence[Dict[str, str]] = ()):
+        """
+        Make a single provider call; provider exceptions propagate to the guard.
+        
+        Every attempt is timed for latency-aware routing (under the profile
+        name for profiled calls, so fast utility prompts do not skew the
+        task type's numbers). Responses are not streamed, so the time to
+        first token equals the call latency.
+        
+        A ``prefix`` goes to Claude as a cached system prompt and to Gemini
+        as the system instruction (cached content when it is long enough).
+        With ``history`` the prompt is the next turn of a chat (Anthropic
+        messages, Gemini ``start_chat``).
+        
+        Token usage comes from the provider's usage metadata (a local
+        estimate when there is none) and is added to the usage ledger
+        under the current request's project.
+        
+        The call gets the current request's remaining time, capped at
+        timeouts.llm_call, and is abandoned as soon as the request is
+        cancelled. Running out of the per-call cap is a retryable provider
+        timeout; running out of the request's own time is not.
+        """
+        client = self._client_for(engine, profile)
+        stats_key = profile or self.task_type
+        request = current_request()
+        budget = call_budget(config.snapshot.timeouts.llm_call)
+        
+        def _call_provider():
+            if engine == "claude":
+                # Claude returns AIMessage with .content
+                messages = claude_messages(prefix, prompt, history) if prefix or history else prompt
+                raw = client.invoke(messages, timeout=budget)
+                return LLMResponse(raw.content, engine), provider_usage(raw)
+            # Gemini returns GenerateContentResponse, extract text
+            # (.text raises ValueError when the response was blocked)
+            model = client
+            if prefix:
+                model = gemini_context_cache.model_for(AIFactory.get_model_settings(engine, profile), prefix)
+            if history:
+                # The SDK's chat object only holds the history locally, so a fresh
+                # one per call over our history is equivalent and survives failover
+                chat = model.start_chat(history=gemini_history(history))
+                raw = chat.send_message(prompt, request_options={"timeout": budget})
+            else:
+                raw = model.generate_content(prompt, request_options={"timeout": budget})
+            return LLMResponse(raw.text, engine), provider_usage(raw)
+        
+        started = time.monotonic()
+        try:
+            if request is not None:
+                request.check()
+            token = request.cancellation if request is not None else None
+            response, usage = run_cancellable(_call_provider, token, budget, name=f"{engine} call")
+        except OperationCancelled as e:
+            if request is not None and (request.cancellation.cancelled or request.expired):
+                raise
+            engine_stats.record(engine, stats_key, time.monotonic() - started, ok=False)
+            raise ProviderUnavailableError(engine, f"no response within {budget:.0f}s") from e
+        except Exception:
+            engine_stats.record(engine, stats_key, time.monotonic() - started, ok=False)
+            raise
+        if usage is None:
+            sent = [prefix or "", *(message["content"] for message in history), prompt]
+            usage = (sum(estimate_tokens(text) for text in sent if text), estimate_tokens(response.content or ""), 0)
+            response.estimated = True
+        response.input_tokens, response.output_tokens, response.cache_read_tokens = usage
+        engine_stats.record(engine, stats_key, time.monotonic() - started, output_tokens=response.output_tokens)
+        usage_ledger.record(request.project if request is not None else None, engine, *usage,
+                            estimated=response.estimated)
+        return response
     
     def get_engine_name(self) -> str:
         """Get the name of the current engine."""
@@ -222,6 +518,14 @@ _interactive_client = None
 _validation_client = None
 
 
+def reset_clients():
+    """Drop cached clients so the next call picks up the current config."""
+    global _orchestration_client, _interactive_client, _validation_client
+    _orchestration_client = None
+    _interactive_client = None
+    _validation_client = None
+
+
 def get_orchestration_client():
     """Get the AI client for orchestration tasks."""
     global _orchestration_client
@@ -0,0 +1,239 @@
+"""
+Batch Prompt Runner
+
+Pushes many prompts through one Orchestrator: ``airis batch input.jsonl``.
+
+Input is JSONL, one prompt per line:
+
+    {"id": "doc-alpha", "prompt": "generate docs readme", "project": "alpha"}
+    {"id": "scan-1", "prompt": "analyze code ...", "engine_overrides": {"code_analysis": "gemini"}}
+
+Results are appended to an output JSONL file as prompts finish, one record
+per prompt with its status, the engines that served it and timings. Ids that already
+have an ``ok`` record in the output file are skipped, so an interrupted run
+can simply be started again.
+
+Provider rate limits are not handled here: every LLM call goes through the
+per-engine limits of ``resilience.engines`` (see airis.resilience), which
+also stop waiting when a prompt runs out of time.
+"""
+
+import io
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from airis.config import config
+from airis.output_capture import capture_output
+from airis.request_context import RequestContext, is_project_name
+
+
+@dataclass(slots=True)
+class BatchItem:
+    """One prompt from the input file."""
+    id: str
+    prompt: str
+    project: Optional[str] = None
+    engine_overrides: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class BatchSummary:
+    """Outcome of a batch run."""
+    total: int = 0
+    skipped: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+
+    def format(self) -> str:
+        ran = self.succeeded + self.failed
+        rate = ran / self.elapsed if self.elapsed > 0 else 0.0
+        return (f"Batch finished: {self.succeeded} ok, {self.failed} failed, {self.skipped} skipped "
+                f"of {self.total} in {self.elapsed:.1f}s ({rate:.2f} prompts/s)")
+
+
+def load_items(path: str) -> List[BatchItem]:
+    """
+    Read batch items from a JSONL file.
+
+    Lines without an ``id`` get their line number as id.
+
+    Raises:
+        ValueError: On malformed lines, duplicate ids or unknown projects
+    """
+    items: List[BatchItem] = []
+    seen: Set[str] = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                data = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"{path}:{line_no}: invalid JSON: {e}")
+            if not isinstance(data, dict) or not isinstance(data.get("prompt"), str):
+                raise ValueError(f"{path}:{line_no}: each line needs a string 'prompt'")
+            item_id = str(data.get("id", line_no))
+            if item_id in seen:
+                raise ValueError(f"{path}:{line_no}: duplicate id '{item_id}'")
+            seen.add(item_id)
+            project = data.get("project")
+            if project is not None:
+                if not is_project_name(project):
+                    raise ValueError(f"{path}:{line_no}: 'project' must be a plain project name")
+                if not os.path.isdir(os.path.join(config.snapshot.projects_root_dir, project)):
+                    raise ValueError(f"{path}:{line_no}: project '{project}' not found")
+            items.append(BatchItem(
+                id=item_id,
+                prompt=data["prompt"],
+                project=project,
+                engine_overrides=dict(data.get("engine_overrides") or {}),
+            ))
+    return items
+
+
+def completed_ids(output_path: str) -> Set[str]:
+    """Return the ids that already finished successfully in an output file."""
+    done: Set[str] = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # A torn last line from an interrupted run
+            if isinstance(record, dict) and record.get("status") == "ok":
+                done.add(str(record.get("id")))
+    return done
+
+
+class BatchRunner:
+    """Runs batch items concurrently."""
+
+    def __init__(self, orchestrator=None, concurrency: Optional[int] = None,
+                 progress: Optional[Callable[[str], None]] = None):
+        """
+        Initialize the runner.
+
+        Args:
+            orchestrator: Orchestrator to use (created on demand if omitted)
+            concurrency: Prompts in flight at once (defaults to batch.concurrency)
+            progress: Callback receiving one progress line per finished prompt
+        """
+        self.concurrency = concurrency or config.snapshot.batch.concurrency
+        self._orchestrator = orchestrator
+        self._progress = progress or (lambda line: print(line, file=sys.stderr))
+        self._write_lock = threading.Lock()
+
+    @property
+    def orchestrator(self):
+        if self._orchestrator is None:
+            from airis.orchestrator import Orchestrator
+            self._orchestrator = Orchestrator()
+        return self._orchestrator
+
+    def run_item(self, item: BatchItem) -> Dict[str, Any]:
+        """Run one prompt and return its result record."""
+        started = time.monotonic()
+        record: Dict[str, Any] = {"id": item.id, "prompt": item.prompt}
+        context = None
+        try:
+            context = RequestContext.from_config(project=item.project, engine_overrides=item.engine_overrides,
+                                                 trace_id=item.id)
+            output = io.StringIO()
+            with capture_output(output):
+                display, code = self.orchestrator.delegate_task(item.prompt, context)
+            record.update(status="ok", result=display, code=code, log=output.getvalue())
+            if isinstance(display, str) and display.startswith("Error:"):
+                # The orchestrator reports failures as "Error: ..." results; rerun them on resume
+                record.update(status="error", error=display)
+        except Exception as e:
+            record.update(status="error", error=f"{type(e).__name__}: {e}")
+        # The engines that actually answered (after routing, exploration and failover)
+        record["engines"] = list(context.served_engines) if context is not None else []
+        record["duration_s"] = round(time.monotonic() - started, 3)
+        record["finished_at"] = time.time()
+        return record
+
+    def run(self, items: Iterable[BatchItem], output_path: str) -> BatchSummary:
+        """
+        Run all items not yet completed in ``output_path`` and append their results.
+
+        Returns:
+            Summary counts and wall-clock time
+        """
+        items = list(items)
+        done = completed_ids(output_path)
+        pending = [item for item in items if item.id not in done]
+        summary = BatchSummary(total=len(items), skipped=len(items) - len(pending))
+        start = time.monotonic()
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        self.orchestrator  # Build it once, before the workers share it
+
+        torn = False
+        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+            with open(output_path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                torn = f.read(1) != b"\n"
+
+        with open(output_path, "a", encoding="utf-8") as out:
+            if torn:
+                # Terminate the partial last line left by an interrupted run
+                out.write("\n")
+            def _run_and_record(item: BatchItem) -> None:
+                record = self.run_item(item)
+                with self._write_lock:
+                    out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    out.flush()
+                    if record["status"] == "ok":
+                        summary.succeeded += 1
+                    else:
+                        summary.failed += 1
+                    finished = summary.succeeded + summary.failed
+                    engines = ", ".join(record["engines"]) or "-"
+                    self._progress(f"[{finished}/{len(pending)}] {item.id}: {record['status']} "
+                                   f"({engines}, {record['duration_s']:.1f}s)")
+
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="airis-batch") as pool:
+                # list() re-raises unexpected errors from the workers
+                list(pool.map(_run_and_record, pending))
+
+        summary.elapsed = time.monotonic() - start
+        return summary
+
+
+def run_batch_command(args: List[str]) -> int:
+    """
+    Entry point for ``airis batch <input.jsonl> [--output PATH] [--concurrency N]``.
+
+    Returns:
+        Process exit code (non-zero if any prompt failed)
+    """
+    if not args or args[0].startswith("-"):
+        print("Usage: airis batch <input.jsonl> [--output results.jsonl] [--concurrency N]")
+        return 2
+    input_path = args[0]
+    if "--output" in args:
+        output_path = args[args.index("--output") + 1]
+    else:
+        output_path = f"{os.path.splitext(input_path)[0]}.results.jsonl"
+    concurrency = int(args[args.index("--concurrency") + 1]) if "--concurrency" in args else None
+
+    try:
+        items = load_items(input_path)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 2
+    runner = BatchRunner(concurrency=concurrency)
+    print(f"Running {len(items)} prompts with concurrency {runner.concurrency} -> {output_path}")
+    summary = runner.run(items, output_path)
+    print(summary.format())
+    return 1 if summary.failed else 0
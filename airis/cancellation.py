@@ -0,0 +1,154 @@
+"""
+Cancellation
+
+Cooperative cancellation for requests: a ``CancellationToken`` is carried in
+every RequestContext, and blocking work (LLM calls, sandbox containers,
+HTTP requests) either checks it or registers a callback that aborts the
+work when the request is cancelled (Ctrl-C, HTTP ``DELETE``, shutdown).
+"""
+
+import contextvars
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class OperationCancelled(Exception):
+    """The request was cancelled before the operation finished."""
+
+
+class DeadlineExceeded(OperationCancelled, TimeoutError):
+    """The request ran out of time before the operation finished."""
+
+
+class CancellationToken:
+    """Thread-safe cancellation flag with abort callbacks."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: Dict[int, Callable[[], Any]] = {}
+        self._next_id = 0
+        self.reason: Optional[str] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """Cancel the token and run the registered abort callbacks (once)."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                logger.warning(f"Cancellation callback failed: {e}")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until cancelled or ``timeout`` seconds passed; True if cancelled."""
+        return self._event.wait(timeout)
+
+    @contextmanager
+    def on_cancel(self, callback: Callable[[], Any]) -> Iterator[None]:
+        """
+        Run ``callback`` if the token is cancelled while the block runs.
+
+        The callback runs immediately if the token is already cancelled.
+        """
+        with self._lock:
+            already = self._event.is_set()
+            if not already:
+                handle = self._next_id
+                self._next_id += 1
+                self._callbacks[handle] = callback
+        if already:
+            callback()
+        try:
+            yield
+        finally:
+            if not already:
+                with self._lock:
+                    self._callbacks.pop(handle, None)
+
+
+def run_cancellable(fn: Callable[[], Any], token: Optional[CancellationToken] = None,
+                    timeout: Optional[float] = None, on_cancel: Optional[Callable[[], Any]] = None,
+                    name: str = "operation") -> Any:
+    """
+    Run a blocking call so that it can be abandoned on cancellation or timeout.
+
+    ``fn`` runs in a daemon thread while the caller waits for it, the token
+    or the timeout, whichever comes first. On cancellation or timeout
+    ``on_cancel`` is called to abort the work (kill a container, close a
+    connection); calls that cannot be aborted are left to finish in the
+    background and their result is dropped.
+
+    Args:
+        fn: Zero-argument blocking call
+        token: Token to watch (None: only the timeout applies)
+        timeout: Seconds to wait (None: no limit)
+        on_cancel: Abort hook for the abandoned call
+        name: Description for error messages
+
+    Returns:
+        Whatever ``fn`` returns
+
+    Raises:
+        OperationCancelled: If the token was cancelled first
+        DeadlineExceeded: If the timeout expired first
+    """
+    if token is not None and token.cancelled:
+        raise OperationCancelled(f"{name} cancelled: {token.reason}")
+    if token is None and timeout is None:
+        return fn()
+
+    wake = threading.Event()
+    outcome: Dict[str, Any] = {}
+
+    # Carry context variables (e.g. the current request) into the worker thread
+    run_in_context = contextvars.copy_context().run
+
+    def _target():
+        try:
+            outcome["result"] = run_in_context(fn)
+        except BaseException as e:
+            outcome["error"] = e
+        finally:
+            wake.set()
+
+    def _abort():
+        if on_cancel is not None:
+            try:
+                on_cancel()
+            except Exception as e:
+                logger.warning(f"Failed to abort {name}: {e}")
+
+    thread = threading.Thread(target=_target, name=f"airis-{name}", daemon=True)
+    thread.start()
+    try:
+        if token is not None:
+            with token.on_cancel(wake.set):
+                wake.wait(timeout)
+        else:
+            wake.wait(timeout)
+    except BaseException:
+        # Ctrl-C while waiting: abort the work before unwinding
+        _abort()
+        raise
+    if "result" in outcome:
+        return outcome["result"]
+    if "error" in outcome:
+        raise outcome["error"]
+    _abort()
+    if token is not None and token.cancelled:
+        raise OperationCancelled(f"{name} cancelled: {token.reason}")
+    raise DeadlineExceeded(f"{name} exceeded its {timeout:.1f}s budget")
@@ -0,0 +1,269 @@
+"""
+Chat Sessions
+
+A multi-turn conversation kept as a message list and sent through the
+providers' chat APIs (Anthropic messages, Gemini ``start_chat``) with a
+fixed system prompt, instead of re-flattening the whole transcript into
+one prompt every turn. The system prompt and the earlier turns stay
+byte-identical from turn to turn, so providers can serve them from their
+prompt cache (see airis.prompt_cache) and only the newest message is new
+input.
+
+Long chats are windowed: the first exchange (the original request) and
+the last ``keep_turns`` turns are sent verbatim, and older turns are
+folded into a rolling summary plus a pinned list of facts decided so far.
+Folding runs in the background by default, so a turn never waits for it,
+and every turn is still kept within the task type's prompt budget.
+"""
+
+import json
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from airis.config import config
+from airis.resilience import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+_summary_pool = None
+_summary_pool_lock = threading.Lock()
+
+
+def _get_summary_pool() -> ThreadPoolExecutor:
+    """Shared worker thread for background summaries, started on first use."""
+    global _summary_pool
+    if _summary_pool is None:
+        with _summary_pool_lock:
+            if _summary_pool is None:
+                _summary_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="airis-summary")
+    return _summary_pool
+
+
+SUMMARY_PROMPT = """以下は要件確認の会話の一部です。これまでの要約と決定事項を、新しい会話内容で更新してください。
+
+【これまでの要約】
+{summary}
+
+【これまでの決定事項】
+{facts}
+
+【新しい会話内容】
+{turns}
+
+次のJSON形式だけで出力してください（説明やMarkdownは不要）：
+{{"summary": "会話全体の簡潔な要約", "facts": ["ユーザーが決定・回答した事項", "..."]}}
+決定事項には、ユーザーが明確に決めたこと（機能、入出力、制約、技術など）だけを1項目1文で含めてください。
+"""
+
+
+def _parse_summary(text: str) -> Tuple[str, Optional[List[str]]]:
+    """Summary and facts from the summarizer's reply (facts None if it is not JSON)."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.strip("`")
+        text = text[text.find("{"):] if "{" in text else text
+    try:
+        data = json.loads(text[text.find("{"):text.rfind("}") + 1])
+    except ValueError:
+        return text, None
+    facts = data.get("facts")
+    if not isinstance(facts, list):
+        facts = None
+    return str(data.get("summary", "")), [str(fact) for fact in facts] if facts is not None else None
+
+
+class ChatSession:
+    """Message-list conversation with one LLM client."""
+
+    def __init__(self, llm_client, task_type: str, system: str = "", keep_turns: Optional[int] = None,
+                 background_summary: bool = True):
+        """
+        Initialize a chat.
+
+        Args:
+            llm_client: LLMClient (or UnifiedAIClient) to send turns with
+            task_type: Task type whose prompt budget applies
+            system: System prompt (stable across turns)
+            keep_turns: Recent turns sent verbatim; older ones are summarized
+                (None: keep everything, only the prompt budget applies)
+            background_summary: Summarize older turns in the background
+                instead of before the next turn
+        """
+        self.llm_client = llm_client
+        self.task_type = task_type
+        self.system = system
+        self.keep_turns = keep_turns
+        self.background_summary = background_summary
+        self.messages: List[Dict[str, str]] = []
+        # Rolling memory of the turns folded out of ``messages``
+        self.summary = ""
+        self.facts: List[str] = []
+        self.folded_turns = 0
+        # (input tokens, cache-read tokens) per turn, as reported by the provider
+        self.turn_tokens: List[Tuple[Optional[int], int]] = []
+        self._lock = threading.Lock()
+        # (summary job, turns it folds) while a summary is being written
+        self._pending: Optional[Tuple[Future, List[Dict[str, str]]]] = None
+
+    def reset(self, system: Optional[str] = None) -> None:
+        """Forget all turns (and optionally replace the system prompt)."""
+        with self._lock:
+            if system is not None:
+                self.system = system
+            self.messages = []
+            self.summary = ""
+            self.facts = []
+            self.folded_turns = 0
+            self.turn_tokens = []
+            # A summary still running for the old chat is discarded
+            self._pending = None
+
+    def restore(self, messages: List[Dict[str, str]], summary: str = "", facts: Optional[List[str]] = None,
+                folded_turns: int = 0) -> None:
+        """Restore a saved chat (e.g. a resumed session) without calling the LLM."""
+        with self._lock:
+            self.messages = [dict(message) for message in messages]
+            self.summary = summary
+            self.facts = list(facts or [])
+            self.folded_turns = folded_turns
+            self.turn_tokens = []
+            self._pending = None
+
+    def send(self, content: str):
+        """
+        Send the next user message and record the reply.
+
+        The history sent is the first exchange (which holds the original
+        request), the rolling summary and facts, then the recent turns.
+        When that still exceeds the task type's prompt budget, the oldest
+        recent turns are dropped.
+
+        Args:
+            content: User message
+
+        Returns:
+            The LLM response (``.content`` is the reply)
+        """
+        if self.background_summary:
+            self._apply_fold()
+        else:
+            self._fold(wait=True)
+        history = self._fit(content)
+        response = self.llm_client.invoke(content, prefix=self.system, history=history)
+        reply = response.content.strip()
+        with self._lock:
+            self.messages.append({"role": "user", "content": content})
+            self.messages.append({"role": "assistant", "content": reply})
+            self.turn_tokens.append(
+                (getattr(response, "input_tokens", None), getattr(response, "cache_read_tokens", 0))
+            )
+        if self.background_summary:
+            self._fold(wait=False)
+        return response
+
+    def memory_text(self) -> str:
+        """The rolling summary and pinned facts as sent to the model ("" before any fold)."""
+        if not self.summary and not self.facts:
+            return ""
+        text = f"【これまでの会話の要約】\n{self.summary}\n"
+        if self.facts:
+            text += "\n【決定事項】\n" + "\n".join(f"- {fact}" for fact in self.facts) + "\n"
+        return text
+
+    def _history(self) -> List[Dict[str, str]]:
+        """First exchange, memory exchange, recent turns."""
+        with self._lock:
+            messages = list(self.messages)
+        memory = self.memory_text()
+        if not memory:
+            return messages
+        return messages[:2] + [
+            {"role": "user", "content": memory},
+            {"role": "assistant", "content": "承知しました。要約と決定事項を踏まえて続けます。"},
+        ] + messages[2:]
+
+    def _fit(self, content: str) -> Tuple[Dict[str, str], ...]:
+        """History for the next turn, within the task type's prompt budget."""
+        history = self._history()
+        budget = config.snapshot.tokens.prompt_budget(self.task_type)
+        if budget is None:
+            return tuple(history)
+        total = estimate_tokens(self.system) + estimate_tokens(content)
+        total += sum(estimate_tokens(message["content"]) for message in history)
+        # Never drop the first exchange or the memory exchange
+        protected = 4 if self.memory_text() else 2
+        dropped = 0
+        while total > budget and len(history) > protected:
+            # Drop the oldest user / assistant pair of the recent turns
+            for message in history[protected:protected + 2]:
+                total -= estimate_tokens(message["content"])
+            del history[protected:protected + 2]
+            dropped += 1
+        if dropped:
+            logger.info(f"Chat over its {budget}-token budget; left out the {dropped} oldest turn(s)")
+        return tuple(history)
+
+    def _fold(self, wait: bool) -> None:
+        """
+        Start folding the turns beyond the window into the rolling summary.
+
+        The folded turns stay in ``messages`` until their summary is ready,
+        so nothing is lost while it is being written; a finished background
+        summary is applied at the start of the next turn.
+        """
+        if self.keep_turns is None:
+            return
+        with self._lock:
+            if self._pending is not None:
+                return
+            overflow = len(self.messages) // 2 - 1 - self.keep_turns
+            if overflow <= 0:
+                return
+            turns = self.messages[2:2 + 2 * overflow]
+            summary, facts = self.summary, list(self.facts)
+            job: Future = Future() if wait else _get_summary_pool().submit(self._summarize, summary, facts, turns)
+            self._pending = (job, turns)
+        if wait:
+            try:
+                job.set_result(self._summarize(summary, facts, turns))
+            except Exception as e:
+                job.set_exception(e)
+            self._apply_fold()
+
+    def _summarize(self, summary: str, facts: List[str], turns: List[Dict[str, str]]) -> Tuple[str, List[str]]:
+        """Ask the LLM for the updated summary and facts."""
+        transcript = "\n".join(
+            f"【{'ユーザー' if message['role'] == 'user' else 'Airis'}】\n{message['content']}" for message in turns
+        )
+        prompt = SUMMARY_PROMPT.format(
+            summary=summary or "(なし)",
+            facts="\n".join(f"- {fact}" for fact in facts) or "(なし)",
+            turns=transcript,
+        )
+        reply = self.llm_client.invoke(prompt, profile="conversation_summary").content
+        new_summary, new_facts = _parse_summary(reply)
+        return new_summary, facts if new_facts is None else new_facts
+
+    def _apply_fold(self) -> None:
+        """Replace the folded turns with their summary once it is ready."""
+        with self._lock:
+            if self._pending is None or not self._pending[0].done():
+                return
+            job, turns = self._pending
+            self._pending = None
+            try:
+                summary, facts = job.result()
+            except Exception as e:
+                logger.warning(f"Conversation summary failed; keeping the turns verbatim: {e}")
+                return
+            folded = {id(message) for message in turns}
+            self.messages = [message for message in self.messages if id(message) not in folded]
+            self.summary, self.facts = summary, facts
+            self.folded_turns += len(turns) // 2
+
+    @property
+    def last_turn_tokens(self) -> Tuple[Optional[int], int]:
+        """(input tokens, cache-read tokens) of the latest turn."""
+        return self.turn_tokens[-1] if self.turn_tokens else (None, 0)
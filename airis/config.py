@@ -3,16 +3,39 @@ Configuration Manager for AIris
 
 This module provides a singleton configuration manager that loads and manages
 settings from config.yaml. It supports dot notation for nested configuration access.
+
+On every (re)load the YAML is validated and compiled into a typed
+ConfigSnapshot (see airis.config_schema). Hot paths should read
+``config.snapshot`` attributes directly; ``get()`` remains available as a
+thin compatibility layer backed by a precomputed dotted-key index.
+
+Writes are transactional: ``with config.batch(): ...`` groups several
+``set()`` calls into a single atomic write (temp file + fsync + rename)
+performed under an advisory file lock, so concurrent Airis processes never
+see a half-written file or silently drop each other's updates.
 """
 
+import copy
+import os
+import stat
+import tempfile
+import threading
 import yaml
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+from airis.config_schema import ConfigError, ConfigSnapshot, compile_config, flatten_settings
 
 class Config:
     """
     Singleton configuration manager.
-    
+
     This class ensures only one instance exists throughout the application lifecycle
     and provides methods to get/set configuration values using dot notation.
     """
@@ -27,79 +50,257 @@ class Config:
     def __init__(self, config_path: str = "config.yaml"):
         """
         Initialize the configuration manager.
-        
+
         Args:
             config_path: Path to the configuration YAML file
+
+        Raises:
+            FileNotFoundError: If the configuration file doesn't exist
+            ConfigError: If the configuration does not match the schema
         """
         if not hasattr(self, 'initialized'):
             self.config_path = Path(config_path)
+            self._file_stamp: Optional[Tuple[int, int]] = None
+            self._lock = threading.RLock()
+            self._batch_depth = 0
+            self._pending: List[Tuple[str, Any]] = []
+            # Bumped on every reload or committed write; readers compare it to
+            # decide whether their derived caches are stale.
+            self.version = 0
             self.settings = self._load_config()
             self.initialized = True
 
+    @property
+    def settings(self) -> Dict[str, Any]:
+        """Raw settings dictionary as loaded from config.yaml."""
+        return self._settings
+
+    @settings.setter
+    def settings(self, value: Dict[str, Any]) -> None:
+        """Replace the raw settings and recompile the snapshot (fails fast on bad config)."""
+        value = value if value is not None else {}
+        snapshot = compile_config(value)
+        # Swap everything only after validation succeeded
+        self._settings = value
+        self._flat = flatten_settings(value)
+        self.snapshot: ConfigSnapshot = snapshot
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        """Return (mtime_ns, size) of the config file, or None if it is missing."""
+        try:
+            st = os.stat(self.config_path)
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
     def _load_config(self) -> Dict[str, Any]:
         """
         Load configuration from the YAML file.
-        
+
         Returns:
             Dictionary containing all configuration settings
-            
+
         Raises:
             FileNotFoundError: If the configuration file doesn't exist
         """
         if not self.config_path.is_file():
             raise FileNotFoundError(f"Configuration file not found at: {self.config_path}")
-        
+
+        self._file_stamp = self._file_signature()
         with open(self.config_path, 'r', encoding='utf-8') as f:
-            return yaml.safe_load(f)
+            return yaml.safe_load(f) or {}
+
+    def reload(self) -> ConfigSnapshot:
+        """
+        Reload config.yaml from disk and recompile the snapshot.
+
+        Returns:
+            The freshly compiled snapshot
+        """
+        with self._lock:
+            self.settings = self._load_config()
+            self.version += 1
+            return self.snapshot
+
+    def reload_if_changed(self) -> bool:
+        """
+        Reload config.yaml only if it changed on disk since the last load.
+
+        This is a single stat() call in the common (unchanged) case.
+
+        Returns:
+            True if the configuration was reloaded
+        """
+        if self._batch_depth or self._file_signature() == self._file_stamp:
+            return False
+        self.reload()
+        return True
 
     def get(self, key: str, default=None) -> Any:
         """
         Retrieve a value from the configuration using dot notation.
-        
+
         Args:
             key: Configuration key in dot notation (e.g., 'ai_engines.default_engine')
             default: Default value to return if key is not found
-            
+
         Returns:
             Configuration value or default if not found
-            
+
         Example:
             >>> config.get('ai_engines.default_engine', 'claude')
             'gemini'
         """
-        keys = key.split('.')
-        value = self.settings
-        for k in keys:
-            if isinstance(value, dict):
-                value = value.get(k, default)
-            else:
-                return default
-        return value
+        return self._flat.get(key, default)
 
     def set(self, key: str, value: Any) -> None:
         """
         Set a value in the configuration using dot notation and save to file.
-        
+
+        Inside ``batch()`` the value is applied in memory immediately and
+        written together with the rest of the batch when it exits.
+
         Args:
             key: Configuration key in dot notation (e.g., 'ai_engines.default_engine')
             value: Value to set
-            
+
+        Raises:
+            ConfigError: If the new value does not match the schema
+
         Example:
             >>> config.set('ai_engines.default_engine', 'gemini')
         """
+        with self.batch():
+            self._apply(key, value)
+            self._pending.append((key, copy.deepcopy(value)))
+
+    @contextmanager
+    def batch(self) -> Iterator["Config"]:
+        """
+        Group several ``set()`` calls into one transactional write.
+
+        The file is written once, atomically, when the outermost batch exits.
+        If the body raises, in-memory settings are rolled back and nothing is
+        written. Batches may be nested.
+
+        Example:
+            >>> with config.batch():
+            ...     config.set('ai_engines.compliance_mode', True)
+            ...     config.set('ai_engines.allowed_engines', ['gemini'])
+        """
+        with self._lock:
+            outermost = self._batch_depth == 0
+            if outermost:
+                backup = copy.deepcopy(self._settings)
+                self._pending = []
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth -= 1
+                if outermost:
+                    self.settings = backup
+                    self._pending = []
+                raise
+            self._batch_depth -= 1
+            if outermost and self._pending:
+                pending, self._pending = self._pending, []
+                try:
+                    self._commit(pending)
+                except BaseException:
+                    self.settings = backup
+                    raise
+
+    def save(self) -> None:
+        """Write the current in-memory settings to config.yaml atomically."""
+        with self._lock, self._file_lock():
+            self._save_config()
+            self.version += 1
+
+    def _apply(self, key: str, value: Any) -> None:
+        """Apply a dotted-key assignment in memory and recompile the snapshot."""
         keys = key.split('.')
         d = self.settings
         for k in keys[:-1]:
             if k not in d or not isinstance(d[k], dict):
                 d[k] = {}
             d = d[k]
+        had_key = keys[-1] in d
+        previous = d.get(keys[-1])
         d[keys[-1]] = value
-        self._save_config()
+        try:
+            self.settings = self._settings
+        except ConfigError:
+            # Roll back the in-memory change so the snapshot stays consistent
+            if had_key:
+                d[keys[-1]] = previous
+            else:
+                del d[keys[-1]]
+            raise
+
+    def _commit(self, pending: List[Tuple[str, Any]]) -> None:
+        """Write pending assignments under the file lock, merging concurrent edits."""
+        with self._file_lock():
+            if self._file_signature() != self._file_stamp:
+                # Another process wrote the file since we loaded it: start from
+                # its version and replay our assignments on top of it.
+                self.settings = self._load_config()
+                for key, value in pending:
+                    self._apply(key, value)
+            self._save_config()
+            self.version += 1
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Hold an exclusive advisory lock on ``<config>.lock`` (POSIX only)."""
+        if fcntl is None:
+            yield
+            return
+        lock_path = self.config_path.with_name(self.config_path.name + ".lock")
+        with open(lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
 
     def _save_config(self) -> None:
-        """Save the current configuration to the YAML file."""
-        with open(self.config_path, 'w', encoding='utf-8') as f:
-            yaml.safe_dump(self.settings, f, allow_unicode=True, default_flow_style=False)
+        """Atomically save the current configuration to the YAML file (temp + fsync + rename)."""
+        directory = self.config_path.parent
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=f".{self.config_path.name}.", suffix=".tmp", dir=str(directory) or "."
+        )
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                yaml.safe_dump(self.settings, f, allow_unicode=True, default_flow_style=False)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp creates the file 0600; keep the mode the user gave config.yaml
+            try:
+                os.chmod(tmp_path, stat.S_IMODE(os.stat(self.config_path).st_mode))
+            except FileNotFoundError:
+                pass
+            os.replace(tmp_path, self.config_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self._fsync_directory(directory)
+        self._file_stamp = self._file_signature()
+
+    @staticmethod
+    def _fsync_directory(directory: Path) -> None:
+        """Persist the rename itself (best effort; not supported everywhere)."""
+        try:
+            dir_fd = os.open(str(directory) or ".", os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(dir_fd)
+        except OSError:
+            pass
+        finally:
+            os.close(dir_fd)
 
 # Singleton instance
-config = Config()
\ No newline at end of file
+config = Config()
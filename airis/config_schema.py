@@ -0,0 +1,554 @@
+"""
+Configuration Schema for AIris
+
+This module defines the typed schema that config.yaml is validated against.
+The raw YAML dictionary is compiled once per (re)load into an immutable
+ConfigSnapshot so hot paths can use plain attribute access instead of
+walking nested dictionaries on every lookup.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+# Engines that may appear in routing, allowed_engines and cost preferences
+KNOWN_ENGINES = ("claude", "gemini", "cursor", "web_search", "web_browser", "local")
+
+DEFAULT_VALIDATION_TASKS = ("code_generation", "document_generation", "code_analysis")
+
+ROUTING_POLICIES = ("static", "latency")
+
+class ConfigError(ValueError):
+    """Raised when config.yaml does not match the expected schema."""
+
+
+@dataclass(frozen=True, slots=True)
+class ModelSettings:
+    """Generation settings for an LLM provider (gemini / claude)."""
+    model_name: str
+    max_tokens: int = 4000
+    temperature: float = 0.1
+    stop_sequences: Tuple[str, ...] = ()
+
+
+# Small, fast models for short utility prompts (see the ``generation`` section)
+_MICRO_GEMINI = ModelSettings("gemini-2.5-flash-lite", max_tokens=64, temperature=0.0, stop_sequences=("\n",))
+_MICRO_CLAUDE = ModelSettings("claude-haiku-4-5-20251001", max_tokens=64, temperature=0.0, stop_sequences=("\n",))
+DEFAULT_GENERATION_PROFILES: Dict[str, Dict[str, ModelSettings]] = {
+    "filename_suggestion": {"gemini": _MICRO_GEMINI, "claude": _MICRO_CLAUDE},
+    "query_rewrite": {"gemini": _MICRO_GEMINI, "claude": _MICRO_CLAUDE},
+    # Verdicts carry a short reason and suggestions, so no single-line stop
+    "validation_verdict": {
+        "gemini": ModelSettings("gemini-2.5-flash-lite", max_tokens=512, temperature=0.0),
+        "claude": ModelSettings("claude-haiku-4-5-20251001", max_tokens=512, temperature=0.0),
+    },
+    # Rolling summary of older interactive turns (airis.chat.ChatSession)
+    "conversation_summary": {
+        "gemini": ModelSettings("gemini-2.5-flash-lite", max_tokens=1024, temperature=0.0),
+        "claude": ModelSettings("claude-haiku-4-5-20251001", max_tokens=1024, temperature=0.0),
+    },
+}
+
+
+@dataclass(frozen=True, slots=True)
+class CursorSettings:
+    """Settings for the Cursor editor integration."""
+    api_url: str = "http://localhost:5000"
+    path: str = "cursor"
+    code_generation: bool = True
+    max_tokens: int = 4000
+    temperature: float = 0.1
+
+
+@dataclass(frozen=True, slots=True)
+class AIEnginesSettings:
+    """Engine selection settings (the ``ai_engines`` section)."""
+    default_engine: str = "claude"
+    task_routing: Dict[str, str] = field(default_factory=dict)
+    compliance_mode: bool = False
+    allowed_engines: Tuple[str, ...] = ()
+    cost_optimization: bool = False
+    cost_preferences: Dict[str, str] = field(default_factory=dict)
+    # Ordered fallback engines per task type ("default" applies to all others)
+    failover: Dict[str, Tuple[str, ...]] = field(default_factory=dict)
+
+
+@dataclass(frozen=True, slots=True)
+class AgentsSettings:
+    """Agent registry settings (the ``agents`` section)."""
+    prewarm: Tuple[str, ...] = ()
+    prewarm_likely_next: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class DaemonSettings:
+    """Settings for the ``airis serve`` daemon (the ``daemon`` section)."""
+    socket_path: Optional[str] = None
+    use_daemon: bool = True
+
+
+@dataclass(frozen=True, slots=True)
+class ServerSettings:
+    """Settings for the HTTP API server (the ``server`` section)."""
+    host: str = "127.0.0.1"
+    port: int = 8765
+    workers: int = 4
+    max_queue: int = 16
+    per_client_concurrency: int = 2
+    request_timeout: float = 600.0
+    session_ttl: float = 3600.0
+    max_hot_sessions: int = 256   # Interactive sessions kept in memory; others are spilled to disk
+
+
+@dataclass(frozen=True, slots=True)
+class TimeoutSettings:
+    """Deadlines and per-call time budgets in seconds (the ``timeouts`` section)."""
+    request: Optional[float] = None  # Deadline for CLI / REPL requests (None: no deadline)
+    llm_call: float = 300.0
+    sandbox: float = 600.0
+    http: float = 30.0
+    git: float = 30.0
+
+
+@dataclass(frozen=True, slots=True)
+class TokenSettings:
+    """Prompt budgets and usage accounting (the ``tokens`` section)."""
+    # Maximum prompt tokens per task type; "default" applies to unlisted task types
+    prompt_budgets: Dict[str, int] = field(default_factory=lambda: {"default": 32000})
+    ledger_path: str = ".airis/usage.json"
+    prompt_cache: bool = True             # Provider prompt-prefix caching (see airis.prompt_cache)
+    gemini_cache_min_tokens: int = 4096   # Shorter prefixes are not uploaded as Gemini cached content
+    gemini_cache_ttl: float = 600.0
+
+    def prompt_budget(self, task_type: str) -> Optional[int]:
+        """Prompt token budget for a task type (None: unlimited)."""
+        return self.prompt_budgets.get(task_type, self.prompt_budgets.get("default"))
+
+
+@dataclass(frozen=True, slots=True)
+class InteractiveSettings:
+    """Interactive session memory (the ``interactive`` section)."""
+    keep_turns: int = 6               # Recent turns sent verbatim; older ones are summarized
+    background_summary: bool = True   # Summarize in the background instead of before the next turn
+    persist_sessions: bool = True     # Journal sessions under .airis_memory/sessions for resuming
+    speculative_drafts: bool = False  # Draft the implementation while the user confirms the spec
+    draft_patch_similarity: float = 0.8  # Spec similarity above which a draft is revised, not regenerated
+    slot_filling: bool = True         # Ask for the final spec once the user has answered every spec field
+
+
+@dataclass(frozen=True, slots=True)
+class ReplSettings:
+    """Interactive CLI background jobs (the ``repl`` section)."""
+    max_jobs: int = 2       # Background jobs running at once; more are queued
+    progress: bool = True   # Print background jobs' output lines as they appear
+
+
+@dataclass(frozen=True, slots=True)
+class MemorySettings:
+    """Project memory storage (the ``memory`` section)."""
+    compact_every: int = 500      # Journal entries after which context.json is rewritten
+    fsync_interval: float = 1.0   # Seconds between journal fsyncs (0: fsync every update)
+    archive: bool = True          # Keep every entry, searchable, in .airis_memory/memory.db
+
+
+@dataclass(frozen=True, slots=True)
+class BatchSettings:
+    """Settings for ``airis batch`` (the ``batch`` section)."""
+    concurrency: int = 4
+
+
+@dataclass(frozen=True, slots=True)
+class RoutingSettings:
+    """Engine routing policy (the ``routing`` section)."""
+    policy: str = "static"  # "static" (task_routing) or "latency" (fastest healthy engine)
+    exploration_rate: float = 0.1
+    min_samples: int = 3
+    stale_after: float = 900.0
+    ewma_alpha: float = 0.2
+    stats_path: str = ".airis/engine_stats.json"
+    hedge_task_types: Tuple[str, ...] = ()  # Task types whose LLM calls are hedged
+    hedge_percentile: float = 0.9
+    hedge_default_delay: float = 5.0  # Seconds, until the primary engine has latency samples
+
+
+@dataclass(frozen=True, slots=True)
+class EngineLimits:
+    """Provider rate limits for one engine (``resilience.engines.<engine>``)."""
+    requests_per_minute: Optional[float] = None
+    tokens_per_minute: Optional[float] = None
+
+
+@dataclass(frozen=True, slots=True)
+class ResilienceSettings:
+    """Retry, throttling and circuit breaker settings (the ``resilience`` section)."""
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 20.0
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+    engines: Dict[str, EngineLimits] = field(default_factory=dict)
+
+
+@dataclass(frozen=True, slots=True)
+class ConfigSnapshot:
+    """Compiled, validated view of the whole config.yaml."""
+    ai_engines: AIEnginesSettings
+    gemini: ModelSettings
+    claude: ModelSettings
+    cursor: CursorSettings
+    agents: AgentsSettings = AgentsSettings()
+    daemon: DaemonSettings = DaemonSettings()
+    server: ServerSettings = ServerSettings()
+    timeouts: TimeoutSettings = TimeoutSettings()
+    tokens: TokenSettings = TokenSettings()
+    interactive: InteractiveSettings = InteractiveSettings()
+    repl: ReplSettings = ReplSettings()
+    memory: MemorySettings = MemorySettings()
+    batch: BatchSettings = BatchSettings()
+    resilience: ResilienceSettings = ResilienceSettings()
+    routing: RoutingSettings = RoutingSettings()
+    # Per-profile model overrides: {profile: {engine: ModelSettings}}
+    generation: Dict[str, Dict[str, ModelSettings]] = field(default_factory=lambda: dict(DEFAULT_GENERATION_PROFILES))
+    current_project: Optional[str] = None
+    projects_root_dir: str = "projects"
+    script_output_dir: str = "generated_scripts"
+    enable_output_validation: bool = True
+    validation_tasks: Tuple[str, ...] = DEFAULT_VALIDATION_TASKS
+
+
+def _expect(value: Any, types, path: str) -> Any:
+    """Check that a value has one of the expected types."""
+    # bool is a subclass of int; never accept it where a number is expected
+    if isinstance(value, bool) and bool not in (types if isinstance(types, tuple) else (types,)):
+        raise ConfigError(f"config.yaml: '{path}' must be {_type_names(types)}, got bool")
+    if not isinstance(value, types):
+        raise ConfigError(
+            f"config.yaml: '{path}' must be {_type_names(types)}, got {type(value).__name__}"
+        )
+    return value
+
+
+def _type_names(types) -> str:
+    if not isinstance(types, tuple):
+        types = (types,)
+    return " or ".join(t.__name__ for t in types)
+
+
+def _positive(value: Any, path: str):
+    """Check that a value is a positive number."""
+    _expect(value, (int, float), path)
+    if value <= 0:
+        raise ConfigError(f"config.yaml: '{path}' must be positive, got {value}")
+    return value
+
+
+def _section(settings: Dict[str, Any], key: str) -> Dict[str, Any]:
+    """Return a nested mapping section (missing or null sections become empty)."""
+    value = settings.get(key)
+    if value is None:
+        return {}
+    return _expect(value, dict, key)
+
+
+def _engine(value: Any, path: str) -> str:
+    _expect(value, str, path)
+    if value not in KNOWN_ENGINES:
+        raise ConfigError(
+            f"config.yaml: '{path}' has unknown engine '{value}'. Known engines: {list(KNOWN_ENGINES)}"
+        )
+    return value
+
+
+def _engine_map(value: Any, path: str) -> Dict[str, str]:
+    if value is None:
+        return {}
+    _expect(value, dict, path)
+    return {str(k): _engine(v, f"{path}.{k}") for k, v in value.items()}
+
+
+def _engine_chains(value: Any, path: str) -> Dict[str, Tuple[str, ...]]:
+    if value is None:
+        return {}
+    _expect(value, dict, path)
+    return {
+        str(task): tuple(_engine(e, f"{path}.{task}[{i}]") for i, e in enumerate(_str_list(chain, f"{path}.{task}")))
+        for task, chain in value.items()
+    }
+
+
+def _str_list(value: Any, path: str) -> Tuple[str, ...]:
+    if value is None:
+        return ()
+    _expect(value, list, path)
+    return tuple(_expect(v, str, f"{path}[{i}]") for i, v in enumerate(value))
+
+
+def _engine_limits(value: Any, path: str) -> Dict[str, EngineLimits]:
+    """Validate a mapping of engine name to rate limits."""
+    if value is None:
+        return {}
+    _expect(value, dict, path)
+    limits = {}
+    for engine, section in value.items():
+        _engine(engine, f"{path}.{engine}")
+        section = _expect(section or {}, dict, f"{path}.{engine}")
+        values = {}
+        for key in ("requests_per_minute", "tokens_per_minute"):
+            if section.get(key) is not None:
+                values[key] = float(_positive(section[key], f"{path}.{engine}.{key}"))
+        limits[engine] = EngineLimits(**values)
+    return limits
+
+
+def _model(section: Dict[str, Any], path: str, default_model: str) -> ModelSettings:
+    max_tokens = _expect(section.get("max_tokens", 4000), int, f"{path}.max_tokens")
+    if max_tokens <= 0:
+        raise ConfigError(f"config.yaml: '{path}.max_tokens' must be positive")
+    temperature = float(_expect(section.get("temperature", 0.1), (int, float), f"{path}.temperature"))
+    if not 0.0 <= temperature <= 2.0:
+        raise ConfigError(f"config.yaml: '{path}.temperature' must be between 0 and 2")
+    return ModelSettings(
+        model_name=_expect(section.get("model_name", default_model), str, f"{path}.model_name"),
+        max_tokens=max_tokens,
+        temperature=temperature,
+        stop_sequences=_str_list(section.get("stop_sequences"), f"{path}.stop_sequences"),
+    )
+
+
+def _generation(value: Any, base: Dict[str, ModelSettings]) -> Dict[str, Dict[str, ModelSettings]]:
+    """
+    Validate generation profiles: ``{profile: {engine: model settings}}``.
+
+    Configured profiles extend the built-in ones; fields left out fall back
+    to the built-in profile, or else to the engine's own section.
+    """
+    profiles = {name: dict(engines) for name, engines in DEFAULT_GENERATION_PROFILES.items()}
+    if value is None:
+        return profiles
+    _expect(value, dict, "generation")
+    for name, engines in value.items():
+        path = f"generation.{name}"
+        _expect(engines, dict, path)
+        profile = profiles.get(name, {})
+        for engine, section in engines.items():
+            if engine not in base:
+                raise ConfigError(f"config.yaml: '{path}' may only configure {', '.join(base)}, got '{engine}'")
+            _expect(section, dict, f"{path}.{engine}")
+            defaults = profile.get(engine) or base[engine]
+            merged = {"model_name": defaults.model_name, "max_tokens": defaults.max_tokens,
+                      "temperature": defaults.temperature, "stop_sequences": list(defaults.stop_sequences),
+                      **section}
+            profile[engine] = _model(merged, f"{path}.{engine}", defaults.model_name)
+        profiles[name] = profile
+    return profiles
+
+
+def compile_config(settings: Optional[Dict[str, Any]]) -> ConfigSnapshot:
+    """
+    Validate raw settings and compile them into a ConfigSnapshot.
+
+    Args:
+        settings: Dictionary loaded from config.yaml
+
+    Returns:
+        Immutable, typed configuration snapshot
+
+    Raises:
+        ConfigError: If a known key has the wrong type or an invalid value
+    """
+    if settings is None:
+        settings = {}
+    _expect(settings, dict, "<root>")
+
+    engines = _section(settings, "ai_engines")
+    ai_engines = AIEnginesSettings(
+        default_engine=_engine(engines.get("default_engine", "claude"), "ai_engines.default_engine"),
+        task_routing=_engine_map(engines.get("task_routing"), "ai_engines.task_routing"),
+        compliance_mode=_expect(engines.get("compliance_mode", False), bool, "ai_engines.compliance_mode"),
+        allowed_engines=tuple(
+            _engine(e, f"ai_engines.allowed_engines[{i}]")
+            for i, e in enumerate(_str_list(engines.get("allowed_engines"), "ai_engines.allowed_engines"))
+        ),
+        cost_optimization=_expect(engines.get("cost_optimization", False), bool, "ai_engines.cost_optimization"),
+        cost_preferences=_engine_map(engines.get("cost_preferences"), "ai_engines.cost_preferences"),
+        failover=_engine_chains(engines.get("failover"), "ai_engines.failover"),
+    )
+
+    cursor = _section(settings, "cursor")
+    agents = _section(settings, "agents")
+    daemon = _section(settings, "daemon")
+    server = _section(settings, "server")
+    timeouts = _section(settings, "timeouts")
+    request_timeout = timeouts.get("request")
+    tokens = _section(settings, "tokens")
+    interactive = _section(settings, "interactive")
+    repl = _section(settings, "repl")
+    memory = _section(settings, "memory")
+    prompt_budgets = tokens.get("prompt_budgets", {"default": 32000})
+    prompt_budgets = _expect(prompt_budgets or {}, dict, "tokens.prompt_budgets")
+    batch = _section(settings, "batch")
+    resilience = _section(settings, "resilience")
+    gemini = _model(_section(settings, "gemini"), "gemini", "gemini-2.5-pro")
+    claude = _model(_section(settings, "claude"), "claude", "claude-sonnet-4-5-20250929")
+    routing = _section(settings, "routing")
+    policy = _expect(routing.get("policy", "static"), str, "routing.policy")
+    if policy not in ROUTING_POLICIES:
+        raise ConfigError(f"config.yaml: 'routing.policy' must be one of {', '.join(ROUTING_POLICIES)}, got '{policy}'")
+    exploration_rate = float(_expect(routing.get("exploration_rate", 0.1), (int, float), "routing.exploration_rate"))
+    ewma_alpha = float(_positive(routing.get("ewma_alpha", 0.2), "routing.ewma_alpha"))
+    hedge_percentile = float(_positive(routing.get("hedge_percentile", 0.9), "routing.hedge_percentile"))
+    if not 0 <= exploration_rate <= 1 or ewma_alpha > 1 or hedge_percentile > 1:
+        raise ConfigError("config.yaml: 'routing.exploration_rate', 'routing.ewma_alpha' and "
+                          "'routing.hedge_percentile' must be between 0 and 1")
+    draft_patch_similarity = float(_expect(
+        interactive.get("draft_patch_similarity", 0.8), (int, float), "interactive.draft_patch_similarity"
+    ))
+    if not 0 <= draft_patch_similarity <= 1:
+        raise ConfigError("config.yaml: 'interactive.draft_patch_similarity' must be between 0 and 1")
+    fsync_interval = float(_expect(memory.get("fsync_interval", 1.0), (int, float), "memory.fsync_interval"))
+    if fsync_interval < 0:
+        raise ConfigError(f"config.yaml: 'memory.fsync_interval' must not be negative, got {fsync_interval}")
+    socket_path = daemon.get("socket_path")
+    if socket_path is not None:
+        _expect(socket_path, str, "daemon.socket_path")
+    current_project = settings.get("current_project")
+    if current_project is not None:
+        _expect(current_project, str, "current_project")
+
+    return ConfigSnapshot(
+        ai_engines=ai_engines,
+        gemini=gemini,
+        claude=claude,
+        generation=_generation(settings.get("generation"), {"gemini": gemini, "claude": claude}),
+        cursor=CursorSettings(
+            api_url=_expect(cursor.get("api_url", "http://localhost:5000"), str, "cursor.api_url"),
+            path=_expect(cursor.get("path", "cursor"), str, "cursor.path"),
+            code_generation=_expect(cursor.get("code_generation", True), bool, "cursor.code_generation"),
+            max_tokens=_expect(cursor.get("max_tokens", 4000), int, "cursor.max_tokens"),
+            temperature=float(_expect(cursor.get("temperature", 0.1), (int, float), "cursor.temperature")),
+        ),
+        agents=AgentsSettings(
+            prewarm=_str_list(agents.get("prewarm"), "agents.prewarm"),
+            prewarm_likely_next=_expect(
+                agents.get("prewarm_likely_next", False), bool, "agents.prewarm_likely_next"
+            ),
+        ),
+        daemon=DaemonSettings(
+            socket_path=socket_path,
+            use_daemon=_expect(daemon.get("use_daemon", True), bool, "daemon.use_daemon"),
+        ),
+        routing=RoutingSettings(
+            policy=policy,
+            exploration_rate=exploration_rate,
+            min_samples=_expect(routing.get("min_samples", 3), int, "routing.min_samples"),
+            stale_after=float(_positive(routing.get("stale_after", 900), "routing.stale_after")),
+            ewma_alpha=ewma_alpha,
+            stats_path=_expect(routing.get("stats_path", ".airis/engine_stats.json"), str, "routing.stats_path"),
+            hedge_task_types=_str_list(routing.get("hedge_task_types"), "routing.hedge_task_types"),
+            hedge_percentile=hedge_percentile,
+            hedge_default_delay=float(_positive(routing.get("hedge_default_delay", 5.0), "routing.hedge_default_delay")),
+        ),
+        resilience=ResilienceSettings(
+            max_retries=_expect(resilience.get("max_retries", 3), int, "resilience.max_retries"),
+            backoff_base=float(_positive(resilience.get("backoff_base", 0.5), "resilience.backoff_base")),
+            backoff_max=float(_positive(resilience.get("backoff_max", 20), "resilience.backoff_max")),
+            failure_threshold=_positive(
+                _expect(resilience.get("failure_threshold", 5), int, "resilience.failure_threshold"),
+                "resilience.failure_threshold",
+            ),
+            reset_timeout=float(_positive(resilience.get("reset_timeout", 30), "resilience.reset_timeout")),
+            engines=_engine_limits(resilience.get("engines"), "resilience.engines"),
+        ),
+        batch=BatchSettings(
+            concurrency=_positive(_expect(batch.get("concurrency", 4), int, "batch.concurrency"), "batch.concurrency"),
+        ),
+        timeouts=TimeoutSettings(
+            request=float(_positive(request_timeout, "timeouts.request")) if request_timeout is not None else None,
+            llm_call=float(_positive(timeouts.get("llm_call", 300), "timeouts.llm_call")),
+            sandbox=float(_positive(timeouts.get("sandbox", 600), "timeouts.sandbox")),
+            http=float(_positive(timeouts.get("http", 30), "timeouts.http")),
+            git=float(_positive(timeouts.get("git", 30), "timeouts.git")),
+        ),
+        tokens=TokenSettings(
+            prompt_budgets={
+                str(task): _positive(_expect(budget, int, f"tokens.prompt_budgets.{task}"), f"tokens.prompt_budgets.{task}")
+                for task, budget in prompt_budgets.items()
+            },
+            ledger_path=_expect(tokens.get("ledger_path", ".airis/usage.json"), str, "tokens.ledger_path"),
+            prompt_cache=_expect(tokens.get("prompt_cache", True), bool, "tokens.prompt_cache"),
+            gemini_cache_min_tokens=_positive(
+                _expect(tokens.get("gemini_cache_min_tokens", 4096), int, "tokens.gemini_cache_min_tokens"),
+                "tokens.gemini_cache_min_tokens",
+            ),
+            gemini_cache_ttl=float(_positive(tokens.get("gemini_cache_ttl", 600), "tokens.gemini_cache_ttl")),
+        ),
+        interactive=InteractiveSettings(
+            keep_turns=_positive(
+                _expect(interactive.get("keep_turns", 6), int, "interactive.keep_turns"), "interactive.keep_turns"
+            ),
+            background_summary=_expect(
+                interactive.get("background_summary", True), bool, "interactive.background_summary"
+            ),
+            persist_sessions=_expect(
+                interactive.get("persist_sessions", True), bool, "interactive.persist_sessions"
+            ),
+            speculative_drafts=_expect(
+                interactive.get("speculative_drafts", False), bool, "interactive.speculative_drafts"
+            ),
+            draft_patch_similarity=draft_patch_similarity,
+            slot_filling=_expect(interactive.get("slot_filling", True), bool, "interactive.slot_filling"),
+        ),
+        repl=ReplSettings(
+            max_jobs=_positive(_expect(repl.get("max_jobs", 2), int, "repl.max_jobs"), "repl.max_jobs"),
+            progress=_expect(repl.get("progress", True), bool, "repl.progress"),
+        ),
+        memory=MemorySettings(
+            compact_every=_positive(
+                _expect(memory.get("compact_every", 500), int, "memory.compact_every"), "memory.compact_every"
+            ),
+            fsync_interval=fsync_interval,
+            archive=_expect(memory.get("archive", True), bool, "memory.archive"),
+        ),
+        server=ServerSettings(
+            host=_expect(server.get("host", "127.0.0.1"), str, "server.host"),
+            port=_expect(server.get("port", 8765), int, "server.port"),
+            workers=_positive(_expect(server.get("workers", 4), int, "server.workers"), "server.workers"),
+            max_queue=_expect(server.get("max_queue", 16), int, "server.max_queue"),
+            per_client_concurrency=_positive(
+                _expect(server.get("per_client_concurrency", 2), int, "server.per_client_concurrency"),
+                "server.per_client_concurrency",
+            ),
+            request_timeout=float(_positive(server.get("request_timeout", 600), "server.request_timeout")),
+            session_ttl=float(_positive(server.get("session_ttl", 3600), "server.session_ttl")),
+            max_hot_sessions=_positive(
+                _expect(server.get("max_hot_sessions", 256), int, "server.max_hot_sessions"), "server.max_hot_sessions"
+            ),
+        ),
+        current_project=current_project,
+        projects_root_dir=_expect(settings.get("projects_root_dir", "projects"), str, "projects_root_dir"),
+        script_output_dir=_expect(
+            settings.get("script_output_dir", "generated_scripts"), str, "script_output_dir"
+        ),
+        enable_output_validation=_expect(
+            settings.get("enable_output_validation", True), bool, "enable_output_validation"
+        ),
+        validation_tasks=_str_list(
+            settings.get("validation_tasks", list(DEFAULT_VALIDATION_TASKS)), "validation_tasks"
+        ),
+    )
+
+
+def flatten_settings(settings: Dict[str, Any], prefix: str = "", out: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build a dotted-key index over nested settings for O(1) ``Config.get``.
+
+    Every intermediate mapping is indexed as well, so ``get('ai_engines')``
+    and ``get('ai_engines.task_routing.validation')`` are both single lookups.
+    """
+    if out is None:
+        out = {}
+    for key, value in settings.items():
+        dotted = f"{prefix}{key}"
+        out[dotted] = value
+        if isinstance(value, dict):
+            flatten_settings(value, f"{dotted}.", out)
+    return out
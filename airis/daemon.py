@@ -0,0 +1,334 @@
+"""
+Airis Daemon
+
+A long-running ``airis serve`` process that keeps the Orchestrator, its
+agents, LLM clients and Docker client warm across commands, plus the thin
+client used by the single-shot CLI to talk to it.
+
+Protocol: newline-delimited JSON over a Unix domain socket. The client sends
+one request per connection; the daemon streams back ``output`` messages
+(anything the task prints) followed by a final ``result`` or ``error``.
+
+    -> {"type": "task", "prompt": "...", "cwd": "/app"}
+    <- {"type": "output", "data": "..."}
+    <- {"type": "result", "display": "...", "code": null}
+"""
+
+import contextlib
+import json
+import logging
+import os
+import signal
+import socket
+import socketserver
+import tempfile
+import threading
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from airis.config import config
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL_VERSION = 1
+
+
+class DaemonError(RuntimeError):
+    """Raised on the client side when the daemon reports a failed request."""
+
+
+def get_socket_path() -> str:
+    """Resolve the daemon socket path (AIRIS_SOCKET env > config > per-user temp path)."""
+    path = os.environ.get("AIRIS_SOCKET") or config.snapshot.daemon.socket_path
+    if path:
+        return os.path.expanduser(path)
+    uid = os.getuid() if hasattr(os, "getuid") else "user"
+    return os.path.join(tempfile.gettempdir(), f"airis-{uid}.sock")
+
+
+def _send(stream, message: Dict[str, Any]) -> None:
+    stream.write((json.dumps(message, ensure_ascii=False) + "\n").encode("utf-8"))
+    stream.flush()
+
+
+def _messages(stream) -> Iterator[Dict[str, Any]]:
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line.decode("utf-8"))
+
+
+class _OutputStream:
+    """File-like object that forwards writes to the client as ``output`` messages."""
+
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text: str) -> int:
+        if text:
+            try:
+                _send(self.wfile, {"type": "output", "data": text})
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # Client went away; keep running the task
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Handles a single client connection."""
+
+    def handle(self):
+        daemon: "AirisDaemon" = self.server.airis_daemon
+        try:
+            request = next(_messages(self.rfile), None)
+        except ValueError as e:
+            _send(self.wfile, {"type": "error", "message": f"Invalid request: {e}"})
+            return
+        if request is None:
+            return
+
+        request_type = request.get("type")
+        try:
+            if request_type == "ping":
+                _send(self.wfile, daemon.status())
+            elif request_type == "task":
+                display, code = daemon.run_task(request.get("prompt", ""), _OutputStream(self.wfile))
+                _send(self.wfile, {"type": "result", "display": display, "code": code})
+            elif request_type == "reload":
+                daemon.reload(force=True)
+                _send(self.wfile, {"type": "result", "display": "Configuration reloaded.", "code": None})
+            elif request_type == "shutdown":
+                _send(self.wfile, {"type": "result", "display": "Airis daemon stopping.", "code": None})
+                daemon.stop()
+            else:
+                _send(self.wfile, {"type": "error", "message": f"Unknown request type: {request_type}"})
+        except (BrokenPipeError, ConnectionResetError):
+            logger.info("Client disconnected before the response was sent")
+        except Exception as e:
+            logger.exception("Daemon request failed")
+            _send(self.wfile, {"type": "error", "message": str(e)})
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class AirisDaemon:
+    """
+    Keeps one warm Orchestrator and serves tasks over a Unix socket.
+
+    Tasks are executed one at a time (the Orchestrator and project state are
+    process-wide), while ``ping``/status requests are answered concurrently.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None,
+                 orchestrator_factory: Optional[Callable[[], Any]] = None):
+        self.socket_path = socket_path or get_socket_path()
+        self._orchestrator_factory = orchestrator_factory or self._default_orchestrator_factory
+        self._orchestrator = None
+        self._task_lock = threading.Lock()
+        self._reload_requested = False
+        self._engine_settings = None
+        self._server: Optional[_UnixServer] = None
+        self.tasks_served = 0
+
+    @staticmethod
+    def _default_orchestrator_factory():
+        from airis.orchestrator import Orchestrator
+        return Orchestrator()
+
+    @staticmethod
+    def _engine_fingerprint() -> Tuple:
+        """Config sections that require rebuilding agents and LLM clients when changed."""
+        snapshot = config.snapshot
+        return snapshot.ai_engines, snapshot.gemini, snapshot.claude, snapshot.cursor, snapshot.agents
+
+    @property
+    def orchestrator(self):
+        if self._orchestrator is None:
+            self._orchestrator = self._orchestrator_factory()
+            self._engine_settings = self._engine_fingerprint()
+        return self._orchestrator
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Pick up config.yaml changes between tasks.
+
+        Engine-related changes rebuild the Orchestrator (and with it every
+        agent and LLM client); other changes such as ``current_project`` are
+        simply visible through the refreshed config snapshot.
+
+        Returns:
+            True if the Orchestrator was rebuilt
+        """
+        with self._task_lock:
+            return self._reload_locked(force)
+
+    def _reload_locked(self, force: bool) -> bool:
+        changed = config.reload_if_changed()
+        if force and not changed:
+            config.reload()
+        if self._orchestrator is None:
+            return False
+        if not force and self._engine_fingerprint() == self._engine_settings:
+            return False
+        logger.info("Engine configuration changed; rebuilding orchestrator")
+        from airis import ai_factory
+        from airis.llm import llm_client
+        ai_factory.reset_clients()
+        llm_client.reset()
+        self._orchestrator = None
+        return True
+
+    def run_task(self, prompt: str, output=None) -> Tuple[str, Optional[str]]:
+        """
+        Run one prompt through the warm Orchestrator.
+
+        Args:
+            prompt: User prompt
+            output: File-like object receiving anything printed during the task
+
+        Returns:
+            Tuple of (display_result, generated_code)
+        """
+        with self._task_lock:
+            force, self._reload_requested = self._reload_requested, False
+            self._reload_locked(force)
+            redirect = contextlib.redirect_stdout(output) if output is not None else contextlib.nullcontext()
+            with redirect:
+                result = self.orchestrator.delegate_task(prompt)
+            self.tasks_served += 1
+            return result
+
+    def status(self) -> Dict[str, Any]:
+        """Return daemon status for ``ping`` requests."""
+        return {
+            "type": "pong",
+            "protocol": PROTOCOL_VERSION,
+            "pid": os.getpid(),
+            "cwd": os.getcwd(),
+            "tasks_served": self.tasks_served,
+            "config_version": config.version,
+        }
+
+    def _prepare_socket(self) -> None:
+        """Remove a stale socket file, refusing to start if another daemon is alive."""
+        if not os.path.exists(self.socket_path):
+            os.makedirs(os.path.dirname(self.socket_path) or ".", exist_ok=True)
+            return
+        if ping(self.socket_path) is not None:
+            raise RuntimeError(f"An Airis daemon is already listening on {self.socket_path}")
+        os.unlink(self.socket_path)
+
+    def serve_forever(self, prewarm: bool = True) -> None:
+        """Bind the socket and serve until stopped (SIGTERM/SIGINT or a shutdown request)."""
+        self._prepare_socket()
+        self._server = _UnixServer(self.socket_path, _RequestHandler)
+        self._server.airis_daemon = self
+        os.chmod(self.socket_path, 0o600)
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda *_: self.stop())
+            if hasattr(signal, "SIGHUP"):
+                signal.signal(signal.SIGHUP, lambda *_: self.request_reload())
+
+        if prewarm:
+            # Build the Orchestrator up front so the first task is already warm
+            with self._task_lock:
+                self.orchestrator
+
+        print(f"Airis daemon listening on {self.socket_path} (pid {os.getpid()})")
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def request_reload(self) -> None:
+        """Ask for a full reload before the next task (used by SIGHUP)."""
+        self._reload_requested = True
+
+    def stop(self) -> None:
+        """Stop serving after in-flight requests finish."""
+        if self._server is not None:
+            threading.Thread(target=self._server.shutdown, daemon=True).start()
+
+
+def _request(socket_path: str, message: Dict[str, Any], timeout: Optional[float]) -> Iterator[Dict[str, Any]]:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+        with sock.makefile("rwb") as stream:
+            _send(stream, message)
+            yield from _messages(stream)
+    finally:
+        sock.close()
+
+
+def ping(socket_path: Optional[str] = None, timeout: float = 1.0) -> Optional[Dict[str, Any]]:
+    """
+    Check whether a daemon is listening.
+
+    Returns:
+        The daemon status, or None if no daemon answered
+    """
+    socket_path = socket_path or get_socket_path()
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(socket_path):
+        return None
+    try:
+        for message in _request(socket_path, {"type": "ping"}, timeout):
+            if message.get("type") == "pong":
+                return message
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def send_task(prompt: str, on_output: Callable[[str], None],
+              socket_path: Optional[str] = None) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Run a prompt on the daemon, streaming printed output through ``on_output``.
+
+    Returns None when no compatible daemon is available (the caller should
+    then run the task in-process).
+
+    Raises:
+        DaemonError: If the daemon reported an error while running the task
+        OSError: If the connection to the daemon failed mid-request
+    """
+    socket_path = socket_path or get_socket_path()
+    status = ping(socket_path)
+    if status is None or status.get("protocol") != PROTOCOL_VERSION:
+        return None
+    # Relative paths (config.yaml, projects/, sandbox mounts) resolve against
+    # the daemon's working directory, so only use it from the same directory.
+    if os.path.realpath(status.get("cwd", "")) != os.path.realpath(os.getcwd()):
+        return None
+
+    for message in _request(socket_path, {"type": "task", "prompt": prompt, "cwd": os.getcwd()}, None):
+        kind = message.get("type")
+        if kind == "output":
+            on_output(message.get("data", ""))
+        elif kind == "result":
+            return message.get("display", ""), message.get("code")
+        elif kind == "error":
+            raise DaemonError(message.get("message", "Airis daemon error"))
+    raise DaemonError("Airis daemon closed the connection without a result")
+
+
+def send_control(request_type: str, socket_path: Optional[str] = None) -> Optional[str]:
+    """Send a ``reload`` or ``shutdown`` request; returns None if no daemon is running."""
+    socket_path = socket_path or get_socket_path()
+    if ping(socket_path) is None:
+        return None
+    for message in _request(socket_path, {"type": request_type}, 30.0):
+        if message.get("type") == "result":
+            return message.get("display")
+        if message.get("type") == "error":
+            return f"Error: {message.get('message')}"
+    return None
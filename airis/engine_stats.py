@@ -0,0 +1,170 @@
+"""
+Engine Performance Statistics
+
+Tracks per-engine, per-task-type latency, time to first token, error rate
+and output token throughput as exponentially weighted moving averages,
+plus a window of recent latencies for percentiles. Used by the
+``latency`` routing policy to pick the fastest healthy engine, and
+persisted to disk so routing starts warm after a restart.
+"""
+
+import random
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+
+from airis.config import config
+from airis.json_store import JSONStore
+
+RECENT_WINDOW = 64
+
+# Engines failing at least this often are only used when nothing else is left
+UNHEALTHY_ERROR_RATE = 0.5
+
+
+@dataclass(slots=True)
+class EngineStats:
+    """Moving averages for one (engine, task type) pair."""
+    samples: int = 0
+    latency: float = 0.0          # EWMA seconds per call
+    ttft: float = 0.0             # EWMA seconds to first token
+    error_rate: float = 0.0       # EWMA of failures (0..1)
+    tokens_per_second: float = 0.0
+    updated_at: float = 0.0       # wall clock of the last sample
+    recent: Deque[float] = field(default_factory=lambda: deque(maxlen=RECENT_WINDOW))
+
+    def update(self, alpha: float, latency: float, ok: bool, ttft: Optional[float],
+               output_tokens: Optional[int]) -> None:
+        def ewma(old: float, new: float) -> float:
+            return new if self.samples == 0 else old + alpha * (new - old)
+
+        self.error_rate = ewma(self.error_rate, 0.0 if ok else 1.0)
+        if ok:
+            # Failed calls say little about speed (they often fail fast)
+            self.latency = ewma(self.latency, latency) if self.latency else latency
+            first = ttft if ttft is not None else latency
+            self.ttft = ewma(self.ttft, first) if self.ttft else first
+            if output_tokens and latency > 0:
+                throughput = output_tokens / latency
+                self.tokens_per_second = (ewma(self.tokens_per_second, throughput)
+                                          if self.tokens_per_second else throughput)
+            self.recent.append(latency)
+        self.samples += 1
+        self.updated_at = time.time()
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latency percentile (0..1) over recent successful calls."""
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+    def to_dict(self) -> Dict:
+        return {
+            "samples": self.samples, "latency": self.latency, "ttft": self.ttft,
+            "error_rate": self.error_rate, "tokens_per_second": self.tokens_per_second,
+            "updated_at": self.updated_at, "recent": list(self.recent),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "EngineStats":
+        stats = cls(
+            samples=int(data.get("samples", 0)),
+            latency=float(data.get("latency", 0.0)),
+            ttft=float(data.get("ttft", 0.0)),
+            error_rate=float(data.get("error_rate", 0.0)),
+            tokens_per_second=float(data.get("tokens_per_second", 0.0)),
+            updated_at=float(data.get("updated_at", 0.0)),
+        )
+        stats.recent.extend(float(v) for v in data.get("recent", [])[-RECENT_WINDOW:])
+        return stats
+
+
+class EngineStatsTracker(JSONStore[EngineStats]):
+    """Thread-safe store of EngineStats with lazy load and throttled persistence."""
+
+    entry_type = EngineStats
+    section = "stats"
+    label = "engine stats file"
+
+    def default_path(self) -> str:
+        return config.snapshot.routing.stats_path
+
+    def record(self, engine: str, task_type: str, latency: float, ok: bool = True,
+               ttft: Optional[float] = None, output_tokens: Optional[int] = None) -> None:
+        """Record one call outcome."""
+        alpha = config.snapshot.routing.ewma_alpha
+        with self._lock:
+            self._entry((engine, task_type)).update(alpha, latency, ok, ttft, output_tokens)
+            due = self._changed()
+        if due:
+            self.save()
+
+    def get(self, engine: str, task_type: str) -> Optional[EngineStats]:
+        return self._get((engine, task_type))
+
+    def rank(self, task_type: str, candidates: List[str]) -> List[str]:
+        """
+        Order candidate engines for a task type, fastest healthy engine first.
+
+        Engines with too few or stale samples are explored first; otherwise,
+        with probability ``exploration_rate``, a random engine is moved to
+        the front so the other engines' stats keep getting refreshed.
+        Engines whose error rate is at or above ``UNHEALTHY_ERROR_RATE`` go last.
+        """
+        if len(candidates) <= 1:
+            return list(candidates)
+        settings = config.snapshot.routing
+        now = time.time()
+        scored = []
+        unexplored = []
+        failing = []
+        for engine in candidates:
+            stats = self.get(engine, task_type)
+            if stats is None or stats.samples < settings.min_samples or now - stats.updated_at > settings.stale_after:
+                unexplored.append(engine)
+                continue
+            if stats.error_rate >= UNHEALTHY_ERROR_RATE:
+                failing.append(engine)
+                continue
+            # Expected time to a successful answer when failures are retried
+            scored.append((stats.latency / (1.0 - stats.error_rate), engine))
+        order = [engine for _, engine in sorted(scored)]
+        if unexplored:
+            return unexplored + order + failing
+        if not order:
+            return failing
+        if len(order) > 1 and random.random() < settings.exploration_rate:
+            explore = random.choice(order[1:])
+            order.remove(explore)
+            order.insert(0, explore)
+        return order + failing
+
+    def snapshot(self) -> Dict[str, Dict[str, EngineStats]]:
+        """Stats grouped by task type, for display."""
+        grouped: Dict[str, Dict[str, EngineStats]] = {}
+        for (engine, task_type), stats in self._items():
+            grouped.setdefault(task_type, {})[engine] = stats
+        return grouped
+
+    def format(self) -> str:
+        """Format stats for ``ai engine info``."""
+        grouped = self.snapshot()
+        if not grouped:
+            return "  No latency samples yet."
+        lines = []
+        for task_type in sorted(grouped):
+            for engine, stats in sorted(grouped[task_type].items()):
+                p90 = stats.percentile(0.9)
+                lines.append(
+                    f"  {task_type}/{engine}: latency={stats.latency:.2f}s ttft={stats.ttft:.2f}s "
+                    f"p90={(p90 or 0):.2f}s errors={stats.error_rate:.0%} "
+                    f"tok/s={stats.tokens_per_second:.0f} n={stats.samples}"
+                )
+        return "\n".join(lines)
+
+
+# Global instance
+engine_stats = EngineStatsTracker()
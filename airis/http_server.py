@@ -0,0 +1,640 @@
+"""
+Airis HTTP API Server
+
+Exposes ``Orchestrator.delegate_task`` and interactive sessions over HTTP so
+many users can share one warm Airis instance. Built on the standard
+library only: an asyncio HTTP/1.1 front end dispatches blocking work to a
+bounded thread pool.
+
+Endpoints (JSON in / JSON out):
+
+    GET    /v1/health                      Pool and session statistics
+    POST   /v1/tasks                       {"prompt", "wait"?, "timeout"?, "project"?,
+                                            "engine_overrides"?} -> job
+    GET    /v1/jobs/<id>                   Job status and result
+    GET    /v1/jobs/<id>/stream            Server-Sent Events: output..., result
+    DELETE /v1/jobs/<id>                   Cancel a queued or running task
+    POST   /v1/sessions                    {"prompt", "project"?} -> start an interactive session
+    POST   /v1/sessions/<id>/messages      {"message"} -> next clarification / result
+    GET    /v1/sessions/<id>               The session's turns so far
+    DELETE /v1/sessions/<id>               Close a session
+
+Clients identify themselves with an ``X-Client-Id`` header (falling back to
+the peer address); each client may only have a limited number of jobs in
+flight. Every request runs in its own RequestContext, so requests for
+different projects can be served side by side. Interactive sessions are
+held by a SessionManager that keeps only recently used sessions in memory
+(see airis.session_manager).
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from airis.cancellation import CancellationToken, DeadlineExceeded, OperationCancelled
+from airis.config import config
+from airis.config_schema import KNOWN_ENGINES
+from airis.output_capture import capture_output, release_output_router
+from airis.request_context import RequestContext, is_project_name
+from airis.session_manager import SessionHandle, SessionManager
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 1024 * 1024
+HEADER_TIMEOUT = 30.0
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_TIMEOUT = "timeout"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATES = (JOB_SUCCEEDED, JOB_FAILED, JOB_TIMEOUT, JOB_CANCELLED)
+
+
+class HTTPError(Exception):
+    """Error that maps directly to an HTTP status code."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Job:
+    """A unit of work executed on the worker pool."""
+
+    __slots__ = ("id", "kind", "client_id", "status", "result", "code", "error", "output",
+                 "created_at", "started_at", "finished_at", "timeout", "changed", "cancellation", "_loop", "_lock")
+
+    def __init__(self, kind: str, client_id: str, timeout: float, loop: asyncio.AbstractEventLoop,
+                 cancellation: Optional[CancellationToken] = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.client_id = client_id
+        self.status = JOB_QUEUED
+        self.result: Any = None
+        self.code: Optional[str] = None
+        self.error: Optional[str] = None
+        self.output: List[str] = []
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.timeout = timeout
+        self.changed = asyncio.Event()
+        self.cancellation = cancellation
+        self._loop = loop
+        # Status transitions come from worker threads, the supervisor and DELETE requests
+        self._lock = threading.Lock()
+
+    def notify(self) -> None:
+        """Wake stream readers (safe to call from worker threads)."""
+        self._loop.call_soon_threadsafe(self.changed.set)
+
+    def write(self, text: str) -> int:
+        if text:
+            self.output.append(text)
+            self.notify()
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    def start(self) -> bool:
+        """Mark a queued job running; False if it was cancelled or timed out while it waited."""
+        with self._lock:
+            if self.status != JOB_QUEUED:
+                return False
+            self.status = JOB_RUNNING
+            self.started_at = time.time()
+        self.notify()
+        return True
+
+    def finish(self, status: str, error: Optional[str] = None) -> bool:
+        """Move the job to a finished state; False if it had already finished."""
+        with self._lock:
+            if not self._finish(status, error):
+                return False
+        self.notify()
+        return True
+
+    def cancel(self, error: str) -> bool:
+        """Finish as cancelled if still queued, or running with a cancellation token."""
+        with self._lock:
+            running_cancellable = self.status == JOB_RUNNING and self.cancellation is not None
+            if self.status != JOB_QUEUED and not running_cancellable:
+                return False
+            self._finish(JOB_CANCELLED, error)
+        self.notify()
+        return True
+
+    def _finish(self, status: str, error: Optional[str]) -> bool:
+        """Set the finished state; call with the lock held."""
+        if self.status in FINISHED_STATES:
+            return False
+        self.status = status
+        self.error = error
+        self.finished_at = time.time()
+        return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.status in FINISHED_STATES:
+            data.update(result=self.result, code=self.code, error=self.error)
+        return data
+
+
+class JobManager:
+    """
+    Bounded worker pool with per-client concurrency limits and job timeouts.
+
+    At most ``workers`` jobs run at once and at most ``max_queue`` more wait
+    for a worker; beyond that submissions are rejected with 503 rather than
+    queueing without bound.
+    """
+
+    def __init__(self, workers: int, max_queue: int, per_client: int, default_timeout: float,
+                 job_ttl: float = 3600.0):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.per_client = per_client
+        self.default_timeout = default_timeout
+        self.job_ttl = job_ttl
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="airis-worker")
+        self._jobs: Dict[str, Job] = {}
+        self._supervisors: set = set()
+        self._in_flight = 0
+        self._per_client: Dict[str, int] = {}
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, kind: str, client_id: str, fn: Callable[[Job], Tuple[Any, Optional[str]]],
+               timeout: Optional[float] = None, cancellation: Optional[CancellationToken] = None) -> Job:
+        """
+        Queue ``fn(job)`` on the worker pool.
+
+        ``fn`` returns (result, generated_code) and may print; its output is
+        captured into the job. With a ``cancellation`` token, running jobs can
+        be cancelled and the token is cancelled when the job times out.
+
+        Raises:
+            HTTPError: 429 if the client is over its limit, 503 if the pool is full
+        """
+        if self._per_client.get(client_id, 0) >= self.per_client:
+            self.rejected += 1
+            raise HTTPError(429, f"Too many concurrent jobs for client '{client_id}' (limit {self.per_client})")
+        if self._in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPError(503, "Server is at capacity, retry later")
+
+        loop = asyncio.get_running_loop()
+        job = Job(kind, client_id, timeout or self.default_timeout, loop, cancellation)
+        self._jobs[job.id] = job
+        self._in_flight += 1
+        self._per_client[client_id] = self._per_client.get(client_id, 0) + 1
+
+        future = loop.run_in_executor(self._executor, self._run, job, fn)
+        supervisor = loop.create_task(self._supervise(job, future))
+        self._supervisors.add(supervisor)
+        supervisor.add_done_callback(self._supervisors.discard)
+        self._expire_jobs()
+        return job
+
+    def _run(self, job: Job, fn) -> None:
+        # Cancelled or timed out while it waited for a worker
+        if not job.start():
+            return
+        with capture_output(job):
+            try:
+                job.result, job.code = fn(job)
+            except DeadlineExceeded as e:
+                job.finish(JOB_TIMEOUT, str(e))
+                return
+            except OperationCancelled as e:
+                job.finish(JOB_CANCELLED, str(e))
+                return
+            except Exception as e:
+                logger.exception(f"Job {job.id} failed")
+                job.finish(JOB_FAILED, str(e))
+                return
+        job.finish(JOB_SUCCEEDED)
+
+    async def _supervise(self, job: Job, future: asyncio.Future) -> None:
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=job.timeout)
+        except asyncio.TimeoutError:
+            job.finish(JOB_TIMEOUT, f"Job exceeded its {job.timeout:.0f}s timeout")
+            if job.cancellation is not None:
+                # Kill its containers and abandon its provider calls
+                job.cancellation.cancel("timeout")
+            # The worker thread keeps its slot until the call returns
+            with contextlib.suppress(Exception):
+                await future
+        except Exception as e:
+            job.finish(JOB_FAILED, str(e))
+        finally:
+            self._in_flight -= 1
+            remaining = self._per_client.get(job.client_id, 1) - 1
+            if remaining > 0:
+                self._per_client[job.client_id] = remaining
+            else:
+                self._per_client.pop(job.client_id, None)
+            self.completed += 1
+
+    def get(self, job_id: str) -> Job:
+        job = self._jobs.get(job_id)
+        if job is None:
+            raise HTTPError(404, f"Job '{job_id}' not found")
+        return job
+
+    def cancel(self, job_id: str) -> Job:
+        """Cancel a queued job, or a running job that carries a cancellation token."""
+        job = self.get(job_id)
+        # Checked and applied under the job's lock, so a worker cannot start it in between
+        if not job.cancel("Cancelled by client"):
+            raise HTTPError(409, f"Job '{job_id}' is {job.status} and can no longer be cancelled")
+        if job.cancellation is not None:
+            job.cancellation.cancel("cancelled by client")
+        return job
+
+    def _expire_jobs(self) -> None:
+        cutoff = time.time() - self.job_ttl
+        expired = [j.id for j in self._jobs.values() if j.finished_at and j.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def stats(self) -> Dict[str, Any]:
+        running = sum(1 for j in self._jobs.values() if j.status == JOB_RUNNING)
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "running": running,
+            "queued": max(0, self._in_flight - running),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "clients": dict(self._per_client),
+        }
+
+    async def shutdown(self) -> None:
+        """Stop accepting work, drop queued jobs and cancel running ones."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        for job in self._jobs.values():
+            if job.status not in FINISHED_STATES and job.cancellation is not None:
+                job.cancellation.cancel("server shutdown")
+        for supervisor in list(self._supervisors):
+            supervisor.cancel()
+        await asyncio.gather(*self._supervisors, return_exceptions=True)
+
+
+class AirisHTTPServer:
+    """Asyncio HTTP front end over a shared Orchestrator."""
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 orchestrator_factory: Optional[Callable[[], Any]] = None,
+                 interactive_factory: Optional[Callable[[Any], Any]] = None):
+        settings = config.snapshot.server
+        self.host = host or settings.host
+        self.port = port if port is not None else settings.port
+        self._settings = settings
+        self._orchestrator_factory = orchestrator_factory or self._default_orchestrator_factory
+        self._interactive_factory = interactive_factory or self._default_interactive_factory
+        self._orchestrator = None
+        self._orchestrator_lock = threading.Lock()
+        self._llm_client = None
+        self.sessions = SessionManager(
+            lambda: self._interactive_factory(self.orchestrator),
+            max_hot=settings.max_hot_sessions,
+            idle_ttl=settings.session_ttl,
+        )
+        if not config.snapshot.interactive.persist_sessions:
+            logger.warning("interactive.persist_sessions is off: sessions cannot be spilled to disk, "
+                           "so server.max_hot_sessions is not enforced")
+        self.jobs: Optional[JobManager] = None
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    @staticmethod
+    def _default_orchestrator_factory():
+        from airis.orchestrator import Orchestrator
+        return Orchestrator()
+
+    def _default_interactive_factory(self, orchestrator):
+        from airis.interactive_mode import InteractiveOrchestrator
+        from airis.llm import LLMClient
+        # One LLM client for all sessions (created once; races only build a spare)
+        if self._llm_client is None:
+            self._llm_client = LLMClient("interactive_mode")
+        return InteractiveOrchestrator(orchestrator, llm_client=self._llm_client)
+
+    @property
+    def orchestrator(self):
+        if self._orchestrator is None:
+            with self._orchestrator_lock:
+                if self._orchestrator is None:
+                    self._orchestrator = self._orchestrator_factory()
+        return self._orchestrator
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    async def start(self) -> None:
+        """Bind the listening socket and create the worker pool."""
+        settings = self._settings
+        self.jobs = JobManager(settings.workers, settings.max_queue, settings.per_client_concurrency,
+                               settings.request_timeout)
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self.jobs is not None:
+            await self.jobs.shutdown()
+        release_output_router()
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        print(f"Airis HTTP API listening on http://{self.host}:{self.port}")
+        async with self._server:
+            await self._server.serve_forever()
+
+    # ------------------------------------------------------------------
+    # HTTP plumbing
+    # ------------------------------------------------------------------
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            try:
+                method, path, headers, body = await asyncio.wait_for(self._read_request(reader), HEADER_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise HTTPError(408, "Request timeout")
+            peer = writer.get_extra_info("peername")
+            client_id = headers.get("x-client-id") or (peer[0] if peer else "unknown")
+            await self._dispatch(method, path, body, client_id, writer)
+        except HTTPError as e:
+            await self._write_json(writer, e.status, {"error": e.message})
+        except (ConnectionResetError, BrokenPipeError):
+            pass
+        except Exception as e:
+            logger.exception("Unhandled HTTP error")
+            with contextlib.suppress(Exception):
+                await self._write_json(writer, 500, {"error": str(e)})
+        finally:
+            with contextlib.suppress(Exception):
+                writer.close()
+                await writer.wait_closed()
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        if not request_line:
+            raise HTTPError(400, "Empty request")
+        try:
+            method, target, _ = request_line.split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1")
+            if line in ("\r\n", "\n", ""):
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", "0") or 0)
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length < 0:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        raw = await reader.readexactly(length) if length else b""
+        body: Dict[str, Any] = {}
+        if raw:
+            try:
+                body = json.loads(raw.decode("utf-8"))
+            except ValueError:
+                raise HTTPError(400, "Request body must be JSON")
+            if not isinstance(body, dict):
+                raise HTTPError(400, "Request body must be a JSON object")
+        return method.upper(), target.split("?", 1)[0], headers, body
+
+    async def _write_json(self, writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {_REASONS.get(status, 'OK')}\r\n"
+                "Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                "Connection: close\r\n\r\n")
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+    async def _dispatch(self, method: str, path: str, body: Dict[str, Any], client_id: str,
+                        writer: asyncio.StreamWriter) -> None:
+        parts = [p for p in path.split("/") if p]
+        if parts[:1] != ["v1"]:
+            raise HTTPError(404, f"Unknown path '{path}'")
+        parts = parts[1:]
+
+        if parts == ["health"] and method == "GET":
+            from airis.resilience import get_metrics
+            await self._write_json(writer, 200, {"status": "ok", "jobs": self.jobs.stats(),
+                                                 "sessions": self.sessions.stats(), "engines": get_metrics()})
+        elif parts == ["tasks"] and method == "POST":
+            await self._create_task(body, client_id, writer)
+        elif len(parts) == 2 and parts[0] == "jobs" and method == "GET":
+            await self._write_json(writer, 200, self.jobs.get(parts[1]).to_dict())
+        elif len(parts) == 2 and parts[0] == "jobs" and method == "DELETE":
+            await self._write_json(writer, 200, self.jobs.cancel(parts[1]).to_dict())
+        elif len(parts) == 3 and parts[0] == "jobs" and parts[2] == "stream" and method == "GET":
+            await self._stream_job(self.jobs.get(parts[1]), writer)
+        elif parts == ["sessions"] and method == "POST":
+            await self._start_session(body, client_id, writer)
+        elif len(parts) == 3 and parts[0] == "sessions" and parts[2] == "messages" and method == "POST":
+            await self._session_message(parts[1], body, client_id, writer)
+        elif len(parts) == 2 and parts[0] == "sessions" and method == "GET":
+            handle = self._get_session(parts[1], client_id)
+            await self._write_json(writer, 200, {"session_id": handle.id, "turns": self.sessions.history(handle)})
+        elif len(parts) == 2 and parts[0] == "sessions" and method == "DELETE":
+            self._get_session(parts[1], client_id)
+            self.sessions.close(parts[1])
+            await self._write_json(writer, 200, {"session_id": parts[1], "closed": True})
+        else:
+            raise HTTPError(404, f"No route for {method} {path}")
+
+    @staticmethod
+    def _require_text(body: Dict[str, Any], key: str) -> str:
+        value = body.get(key)
+        if not isinstance(value, str) or not value.strip():
+            raise HTTPError(400, f"'{key}' must be a non-empty string")
+        return value
+
+    def _timeout_from(self, body: Dict[str, Any]) -> Optional[float]:
+        timeout = body.get("timeout")
+        if timeout is None:
+            return None
+        if not isinstance(timeout, (int, float)) or timeout <= 0:
+            raise HTTPError(400, "'timeout' must be a positive number of seconds")
+        # Clients may shorten but never extend the server-side limit
+        return min(float(timeout), self._settings.request_timeout)
+
+    def _context_from(self, body: Dict[str, Any]) -> RequestContext:
+        """Build the request's context from the optional project / engine_overrides fields."""
+        project = body.get("project")
+        if project is not None:
+            if not is_project_name(project):
+                raise HTTPError(400, "'project' must be a plain project name")
+            if not os.path.isdir(os.path.join(config.snapshot.projects_root_dir, project)):
+                raise HTTPError(404, f"Project '{project}' not found")
+        overrides = body.get("engine_overrides") or {}
+        if not isinstance(overrides, dict) or any(
+            not isinstance(engine, str) or engine not in KNOWN_ENGINES for engine in overrides.values()
+        ):
+            raise HTTPError(400, f"'engine_overrides' must map task types to one of {', '.join(KNOWN_ENGINES)}")
+        timeout = self._timeout_from(body) or self._settings.request_timeout
+        return RequestContext.from_config(project=project, timeout=timeout, engine_overrides=dict(overrides))
+
+    async def _await_job(self, job: Job) -> None:
+        while job.status not in FINISHED_STATES:
+            await job.changed.wait()
+            job.changed.clear()
+
+    async def _create_task(self, body: Dict[str, Any], client_id: str, writer) -> None:
+        prompt = self._require_text(body, "prompt")
+        context = self._context_from(body)
+
+        def _task(job):
+            context.trace_id = job.id
+            return self.orchestrator.delegate_task(prompt, context)
+
+        job = self.jobs.submit("task", client_id, _task, self._timeout_from(body), context.cancellation)
+        if body.get("wait"):
+            await self._await_job(job)
+            await self._write_json(writer, 200, job.to_dict())
+        else:
+            await self._write_json(writer, 202, job.to_dict())
+
+    async def _stream_job(self, job: Job, writer: asyncio.StreamWriter) -> None:
+        writer.write(("HTTP/1.1 200 OK\r\n"
+                      "Content-Type: text/event-stream; charset=utf-8\r\n"
+                      "Cache-Control: no-cache\r\n"
+                      "Connection: close\r\n\r\n").encode("latin-1"))
+        sent = 0
+        while True:
+            job.changed.clear()
+            while sent < len(job.output):
+                writer.write(_sse("output", {"data": job.output[sent]}))
+                sent += 1
+            if job.status in FINISHED_STATES:
+                writer.write(_sse("result", job.to_dict()))
+                await writer.drain()
+                return
+            await writer.drain()
+            await job.changed.wait()
+
+    # ------------------------------------------------------------------
+    # Interactive sessions
+    # ------------------------------------------------------------------
+    def _get_session(self, session_id: str, client_id: str) -> SessionHandle:
+        try:
+            return self.sessions.get(session_id, client_id)
+        except KeyError:
+            raise HTTPError(404, f"Session '{session_id}' not found")
+
+    async def _start_session(self, body: Dict[str, Any], client_id: str, writer) -> None:
+        prompt = self._require_text(body, "prompt")
+        context = self._context_from(body)
+        # Sessions outlive a single request; only the per-call timeout applies
+        context.deadline = None
+        handle, interactive = self.sessions.create(client_id, context)
+        context.trace_id = handle.id
+
+        def _start(_job):
+            with handle.lock, context.activate():
+                return interactive.start_interactive_mode(prompt, context), None
+
+        try:
+            job = self.jobs.submit("session", client_id, _start, self._timeout_from(body), context.cancellation)
+        except HTTPError:
+            self.sessions.close(handle.id)
+            raise
+        await self._await_job(job)
+        if job.status != JOB_SUCCEEDED:
+            self.sessions.close(handle.id)
+            raise HTTPError(504 if job.status == JOB_TIMEOUT else 500, job.error or job.status)
+        self.sessions.release(handle)
+        await self._write_json(writer, 201, {"session_id": handle.id, "response": job.result})
+
+    async def _session_message(self, session_id: str, body: Dict[str, Any], client_id: str, writer) -> None:
+        handle = self._get_session(session_id, client_id)
+        message = self._require_text(body, "message")
+
+        # Each message gets its own token, so a timed-out message stops (and
+        # releases handle.lock) without cancelling the rest of the session
+        cancellation = CancellationToken()
+
+        def _continue(_job):
+            with handle.lock:
+                interactive = self.sessions.checkout(handle)
+                session = interactive.current_session
+                try:
+                    if session is None:
+                        return interactive.process_user_input(message), None
+                    session.context.cancellation = cancellation
+                    with session.context.activate():
+                        return interactive.process_user_input(message), None
+                finally:
+                    handle.last_used = time.time()
+
+        job = self.jobs.submit("session", client_id, _continue, self._timeout_from(body), cancellation)
+        await self._await_job(job)
+        if job.status != JOB_SUCCEEDED:
+            raise HTTPError(504 if job.status == JOB_TIMEOUT else 500, job.error or job.status)
+        is_complete, response, execution_result = job.result
+        if is_complete or not self.sessions.active(handle):
+            self.sessions.close(session_id)
+        else:
+            self.sessions.release(handle)
+        await self._write_json(writer, 200, {
+            "session_id": session_id,
+            "is_complete": is_complete,
+            "response": response,
+            "execution_result": execution_result,
+        })
+
+
+_REASONS = {
+    200: "OK", 201: "Created", 202: "Accepted", 400: "Bad Request", 404: "Not Found",
+    408: "Request Timeout", 409: "Conflict", 413: "Payload Too Large", 429: "Too Many Requests",
+    500: "Internal Server Error", 503: "Service Unavailable", 504: "Gateway Timeout",
+}
+
+
+def _sse(event: str, payload: Dict[str, Any]) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+def run_http_server(host: Optional[str] = None, port: Optional[int] = None) -> None:
+    """Run the HTTP API server until interrupted."""
+    server = AirisHTTPServer(host, port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
@@ -9,7 +9,9 @@ import sys
 import os
 from airis.orchestrator import Orchestrator
 from airis.interactive_mode import InteractiveOrchestrator
+from airis.cancellation import OperationCancelled
 from airis.config import config
+from airis.repl_jobs import JobRunner
 from airis.system_context import get_capability_info
 from airis.project_memory import project_memory_manager
 
@@ -36,6 +38,8 @@ def print_welcome():
     print("  'project create <名前>' - プロジェクトを作成")
     print("  'project use <名前>' - プロジェクトを切り替え")
     print("  'ai engine info' - AI設定を確認")
+    print("  'jobs' / 'fg <番号>' / 'cancel <番号>' - バックグラウンドジョブ")
+    print("  'session list' / 'session resume <ID>' - 中断した対話を再開")
     print("  'help' - ヘルプを表示")
     print("  'exit' / 'quit' - 終了")
     print("\n現在のプロジェクト:", config.get("current_project") or "未選択")
@@ -63,6 +67,14 @@ def print_help():
     print("    例: quick web search: Docker best practices")
     print("    → 即座に実行（要件確認なし）")
     print("    → 単純なタスクや既知の操作に最適")
+    print("    → バックグラウンドジョブとして実行され、その間も入力できます")
+    print("\n【セッション】")
+    print("  session list - 再開できる対話セッション一覧（プロジェクトごと）")
+    print("  session resume <ID> - 中断した対話を続きから再開（LLM呼び出しなし）")
+    print("\n【バックグラウンドジョブ】")
+    print("  jobs - ジョブ一覧")
+    print("  fg <番号> - ジョブの完了を待って結果を表示（Ctrl-Cでバックグラウンドに戻す）")
+    print("  cancel <番号> - ジョブを中止")
     print("\n【プロジェクト管理】")
     print("  project create <名前> - 新規プロジェクト作成")
     print("  project use <名前> - プロジェクト切り替え")
@@ -72,6 +84,7 @@ def print_help():
     print("  ai engine set default <engine> - デフォルトAIを変更")
     print("\n【プロジェクト記憶】")
     print("  過去の作業 / 履歴 / memory - プロジェクト記憶を表示")
+    print("  memory search <検索語> - 過去の会話・ファイル・メモを全文検索")
     print("  続き / 続きを行いたい - 過去の作業の続きを開始")
     
     print("\n【その他】")
@@ -120,6 +133,39 @@ def save_readline_history(history_file):
             pass  # Silently fail if history can't be saved
 
 
+def echo_line(line: str):
+    """Print a line from a background job without losing the line being typed."""
+    sys.stdout.write(f"\r\033[K{line}\n")
+    sys.stdout.flush()
+    if READLINE_AVAILABLE:
+        try:
+            readline.redisplay()
+        except Exception:
+            pass
+
+
+def print_job_result(job):
+    """Print a finished job's result."""
+    print("\n" + "=" * 70)
+    print(f"[{job.id}] {job.title}")
+    print("=" * 70)
+    if job.error:
+        print(f"エラー: {job.error}")
+    else:
+        print("--- RESULT ---")
+        print(job.result)
+        if job.code:
+            print("\n--- GENERATED CODE ---")
+            print(job.code[:500] + "..." if len(job.code) > 500 else job.code)
+    print("=" * 70 + "\n")
+
+
+def submit_quick(runner: JobRunner, orchestrator, request: str):
+    """Start a 'quick' request as a background job."""
+    # Bind the request now: a queued job starts after the loop has read more input
+    return runner.submit(request, lambda context, request=request: orchestrator.delegate_task(request, context))
+
+
 def run_interactive_cli():
     """Run the interactive CLI."""
     # Setup command history
@@ -132,19 +178,29 @@ def run_interactive_cli():
     
     orchestrator = Orchestrator()
     interactive_orch = InteractiveOrchestrator(orchestrator)
+    repl_settings = config.snapshot.repl
+    runner = JobRunner(repl_settings.max_jobs, repl_settings.progress, echo=echo_line)
+    # Job executing the interactive session's confirmed spec, if any
+    session_job = None
     command_history = []
     
     while True:
         try:
+            # Show running background jobs in the prompt
+            active_jobs = len(runner.running())
+            jobs_marker = f" [ジョブ:{active_jobs}]" if active_jobs else ""
+            
             # Check if in interactive session
-            if interactive_orch.has_active_session():
-                prompt_prefix = "Airis> (対話中) "
+            if session_job is not None and not session_job.finished:
+                prompt_prefix = f"Airis{jobs_marker}> (実行中) "
+            elif interactive_orch.has_active_session():
+                prompt_prefix = f"Airis{jobs_marker}> (対話中) "
             else:
                 current_project = config.get("current_project")
                 if current_project:
-                    prompt_prefix = f"Airis [{current_project}]> "
+                    prompt_prefix = f"Airis [{current_project}]{jobs_marker}> "
                 else:
-                    prompt_prefix = "Airis> "
+                    prompt_prefix = f"Airis{jobs_marker}> "
             
             # Get user input
             user_input = input(prompt_prefix).strip()
@@ -160,10 +216,35 @@ def run_interactive_cli():
             
             # Exit commands
             if lower_input in ["exit", "quit", "終了"]:
+                if runner.running():
+                    print(f"\n実行中のジョブ {len(runner.running())} 件をキャンセルします。")
                 print("\nAirisを終了します。ありがとうございました！")
                 save_readline_history(history_file)
                 break
             
+            # Background jobs
+            elif lower_input == "jobs":
+                print("\n" + runner.format() + "\n")
+                continue
+            
+            elif lower_input.startswith("fg ") or (lower_input.startswith("cancel ") and lower_input[7:].strip().isdigit()):
+                command, _, job_id = lower_input.partition(" ")
+                if not job_id.strip().isdigit():
+                    print("エラー: ジョブ番号を指定してください（例: fg 1）")
+                    continue
+                try:
+                    if command == "cancel":
+                        job = runner.cancel(int(job_id))
+                        print(f"\n[{job.id}] キャンセルを要求しました: {job.title}\n")
+                    else:
+                        job = runner.wait(int(job_id))
+                        print_job_result(job)
+                except KeyError as e:
+                    print(f"エラー: {e.args[0]}")
+                except KeyboardInterrupt:
+                    print(f"\n[{job_id.strip()}] バックグラウンドに戻しました\n")
+                continue
+            
             # Help command
             elif lower_input in ["help", "h", "ヘルプ"]:
                 print_help()
@@ -175,6 +256,23 @@ def run_interactive_cli():
                 print("詳細: 'help'コマンドでヘルプを表示\n")
                 continue
             
+            # Full-text search over everything the project has recorded
+            elif lower_input.startswith("memory search"):
+                query = user_input[len("memory search"):].strip()
+                current_project = config.get("current_project")
+                if not query:
+                    print("エラー: 検索語を指定してください（例: memory search テトリス）")
+                    continue
+                if not current_project:
+                    print("\nエラー: プロジェクトが選択されていません")
+                    print("'project use <名前>' でプロジェクトを選択してください\n")
+                    continue
+                projects_root = config.get("projects_root_dir", "projects")
+                memory = project_memory_manager.get_memory(current_project, projects_root)
+                from airis.memory_archive import format_hits
+                print("\n" + format_hits(memory.search(query), query) + "\n")
+                continue
+            
             # Project memory commands
             elif lower_input in ["過去の作業", "履歴", "続き", "過去の作業を教えて", "続きを行いたい", "project memory", "memory"]:
                 current_project = config.get("current_project")
@@ -245,17 +343,9 @@ def run_interactive_cli():
                     print("エラー: リクエストを指定してください")
                     continue
                 
-                print("\n" + "=" * 70)
-                print("クイック実行モード...")
-                print("=" * 70 + "\n")
-                
-                result, code = orchestrator.delegate_task(request)
-                print("--- RESULT ---")
-                print(result)
-                if code:
-                    print("\n--- GENERATED CODE ---")
-                    print(code[:500] + "..." if len(code) > 500 else code)
-                print("\n" + "=" * 70 + "\n")
+                job = submit_quick(runner, orchestrator, request)
+                print(f"\n[{job.id}] クイック実行を開始しました: {request}")
+                print(f"   'fg {job.id}' で完了を待機 / 'cancel {job.id}' で中止\n")
                 continue
             
             # Project management
@@ -306,6 +396,56 @@ def run_interactive_cli():
                 
                 continue
             
+            # Stored interactive sessions
+            elif lower_input in ["session list", "sessions", "セッション一覧"]:
+                print("\n" + interactive_orch.list_sessions() + "\n")
+                continue
+            
+            elif lower_input.startswith("session resume"):
+                session_id = user_input[len("session resume"):].strip()
+                if not session_id:
+                    print("エラー: セッションIDを指定してください（'session list' で確認できます）")
+                    continue
+                if session_job is not None and not session_job.finished:
+                    print(f"\n仕様の実行中です（ジョブ {session_job.id}）。完了後に再開してください。\n")
+                    continue
+                try:
+                    last_reply = interactive_orch.resume_session(session_id)
+                except KeyError as e:
+                    print(f"エラー: {e.args[0]}")
+                    continue
+                print("\n" + "=" * 70)
+                print(f"💬 セッション {interactive_orch.current_session.session_id} を再開しました")
+                print("=" * 70 + "\n")
+                print(last_reply)
+                print("\n" + "-" * 70)
+                print("💡 続けて回答してください。")
+                print("   'execute' または '実行': 要件確定後に実装開始")
+                print("   'cancel' または 'キャンセル': 対話を中止")
+                print("-" * 70 + "\n")
+                continue
+            
+            # The session's spec is being executed in the background
+            elif session_job is not None and not session_job.finished and interactive_orch.has_active_session():
+                print(f"\n仕様の実行中です（ジョブ {session_job.id}）。'fg {session_job.id}' で完了を待てます。\n")
+                continue
+            
+            # Execute the confirmed spec as a background job
+            elif (interactive_orch.has_active_session() and interactive_orch.current_session.requirements_gathered
+                  and lower_input in ["execute", "実行", "run", "ok", "proceed"]):
+                def execute_session(context, user_input=user_input):
+                    try:
+                        _, response, execution_result = interactive_orch.process_user_input(user_input)
+                    except OperationCancelled:
+                        # The session's request was cancelled; it cannot continue
+                        interactive_orch.current_session = None
+                        raise
+                    return f"{response}\n\n{execution_result or ''}".strip(), None
+                
+                session_job = runner.submit("要件に基づく実装", execute_session, interactive_orch.current_session.context)
+                print(f"\n[{session_job.id}] 実装を開始しました。'fg {session_job.id}' で完了を待機 / 'cancel {session_job.id}' で中止\n")
+                continue
+            
             # In interactive session
             elif interactive_orch.has_active_session():
                 is_complete, response, execution_result = interactive_orch.process_user_input(user_input)
@@ -359,7 +499,8 @@ def run_interactive_cli():
             print(f"\nエラーが発生しました: {str(e)}\n")
             continue
     
-    # Save history on normal exit
+    # Cancel unfinished jobs and save history on normal exit
+    runner.shutdown()
     save_readline_history(history_file)
 
 
@@ -8,10 +8,49 @@ have multi-turn conversations with AI to refine requirements before execution.
 from typing import List, Dict, Optional
 from airis.config import config
 from airis.system_context import get_system_context, get_capability_info
-from airis.project_memory import project_memory_manager
+from airis.chat import ChatSession
+from airis.prompt_budget import PromptSection, build_prompt
+from airis.request_context import RequestContext
+from airis.session_store import SessionJournal, SessionStore, replay
+from airis.spec_slots import SpecSlots, parse_spec_fields
+import dataclasses
+from array import array
 import json
 
 
+# How to answer the user's follow-up messages (part of the cached system prompt)
+FOLLOW_UP_INSTRUCTIONS = """---
+
+ユーザーの追加の回答を受け取ったら、これまでの会話を踏まえて、あなた（Airis）の能力を考慮し、以下のいずれかを実行してください：
+
+A) まだ不明確な点がある場合：
+   追加の質問を投げかけてください。形式：
+   
+   【追加確認事項】
+   1. (質問)
+      選択肢: ...
+   2. (質問)
+   ...
+
+B) 要件が十分に明確になった場合：
+   最終的な仕様をまとめてください。形式：
+   
+   【要件確定】
+   
+   【最終仕様】
+   - 機能: ...
+   - 入力方法: ...
+   - 出力形式: ...
+   - エラーハンドリング: ...
+   - その他: ...
+   
+   【実装準備完了】
+   この仕様で実装を開始できます。
+
+どちらかの形式で応答してください。
+"""
+
+
 class InteractiveSession:
     """
     Manages an interactive conversation session with the user.
@@ -20,13 +59,82 @@ class InteractiveSession:
     executing the final task.
     """
     
-    def __init__(self):
-        # Use AI engine specified in config for interactive mode
-        from airis.llm import LLMClient
-        self.llm_client = LLMClient("interactive_mode")
+    def __init__(self, context: Optional[RequestContext] = None, llm_client=None):
+        # Use AI engine specified in config for interactive mode; servers
+        # share one client across all sessions
+        if llm_client is None:
+            from airis.llm import LLMClient
+            llm_client = LLMClient("interactive_mode")
+        self.llm_client = llm_client
+        # Native multi-turn chat; kept for the whole session so the provider
+        # sees the same system prompt and history prefix every turn. Older
+        # turns are folded into a rolling summary and pinned facts
+        settings = config.snapshot.interactive
+        self.chat = ChatSession(
+            self.llm_client,
+            "interactive_mode",
+            keep_turns=settings.keep_turns,
+            background_summary=settings.background_summary,
+        )
+        # Project and memory are fixed for the whole session
+        self.context = context or RequestContext.from_config()
         self.conversation_history: List[Dict[str, str]] = []
         self.requirements_gathered = False
         self.final_specification = None
+        # Append-only record of the session (see airis.session_store)
+        self.journal: Optional[SessionJournal] = None
+        # Journal offsets of the turn records, so a session can be described
+        # (and history served) from the journal alone
+        self.turn_offsets = array("q")
+        # Speculative draft restored with a resumed session
+        self.draft = None
+        # Spec fields answered so far (None when slot filling is off)
+        self.slots: Optional[SpecSlots] = None
+    
+    @classmethod
+    def resume(cls, session_id: str, context: Optional[RequestContext] = None,
+               llm_client=None) -> "InteractiveSession":
+        """
+        Restore a stored session from its records, without calling the LLM.
+        
+        Args:
+            session_id: Session id (or a unique prefix of it)
+            context: Request context of the session's project
+            llm_client: LLM client to continue with (a new one by default)
+            
+        Returns:
+            The session, ready to continue
+            
+        Raises:
+            KeyError: If no stored session matches
+        """
+        session = cls(context, llm_client)
+        journal = SessionStore.for_context(session.context).open(session_id)
+        state, turns = replay(journal)
+        session.journal = journal
+        session.chat.reset(system=state["system"])
+        session.chat.restore(state["messages"], state["summary"], state["facts"], state["folded_turns"])
+        if turns and config.snapshot.interactive.slot_filling:
+            session.slots = SpecSlots.for_request(turns[0][1]["user"])
+        for offset, turn in turns:
+            session.turn_offsets.append(offset)
+            session.conversation_history.append({"role": "user", "content": turn["user"]})
+            session.conversation_history.append({"role": "assistant", "content": turn["reply"]})
+            if session.slots is not None:
+                if offset != turns[0][0]:
+                    session.slots.observe_answer(turn["user"])
+                session.slots.observe_questions(turn["reply"])
+        session.requirements_gathered = state["spec"] is not None
+        session.final_specification = state["spec"]
+        if state["draft"] is not None:
+            from airis.speculation import Draft
+            session.draft = Draft(**state["draft"])
+        return session
+    
+    @property
+    def session_id(self) -> Optional[str]:
+        """Id of the stored session (None when sessions are not persisted)."""
+        return self.journal.session_id if self.journal is not None else None
     
     def start_session(self, initial_prompt: str) -> str:
         """
@@ -63,28 +171,15 @@ class InteractiveSession:
 - 「Dockerの最新情報を調べて」
 """
         
-        # Get system context
-        system_context = get_system_context()
-        
-        # Get project context if available
-        project_context = ""
-        current_project = config.get("current_project")
-        if current_project and project_memory_manager.has_memory():
-            memory = project_memory_manager.get_current_memory()
-            project_context = f"""
----
-
-【現在のプロジェクト情報】
-{memory.get_project_context()}
-
----
-"""
-        
-        # Create clarification prompt
-        clarification_prompt = f"""{system_context}
-{project_context}
-
-ユーザーから以下のリクエストを受けました：
+        # The system prompt (system context, project context, how to answer
+        # follow-ups) stays the same for the whole chat, so providers can cache it
+        self.chat.reset(system=self._system_prompt())
+        if config.snapshot.interactive.slot_filling:
+            self.slots = SpecSlots.for_request(initial_prompt)
+        if config.snapshot.interactive.persist_sessions:
+            self.journal = SessionStore.for_context(self.context).create()
+            self.journal.append("start", initial_prompt=initial_prompt, system=self.chat.system)
+        clarification_prompt = f"""ユーザーから以下のリクエストを受けました：
 
 【ユーザーのリクエスト】
 {initial_prompt}
@@ -117,8 +212,9 @@ class InteractiveSession:
 これらの確認事項が明確になれば、実装を開始できます。
 """
         
-        response = self.llm_client.invoke(clarification_prompt)
-        response_text = response.content.strip()
+        response_text = self._send(clarification_prompt, initial_prompt)
+        if self.slots is not None:
+            self.slots.observe_questions(response_text)
         
         # Store in conversation history
         self.conversation_history.append({
@@ -150,55 +246,14 @@ class InteractiveSession:
             "content": user_response
         })
         
-        # Get system context
-        system_context = get_system_context()
-        
-        # Build conversation context
-        conversation_context = self._build_conversation_context()
-        
-        # Create continuation prompt
-        continuation_prompt = f"""{system_context}
-
----
-
-これまでの会話：
-
-{conversation_context}
-
-【ユーザーの最新の回答】
-{user_response}
-
-これまでの会話を踏まえて、あなた（Airis）の能力を考慮し、以下のいずれかを実行してください：
-
-A) まだ不明確な点がある場合：
-   追加の質問を投げかけてください。形式：
-   
-   【追加確認事項】
-   1. (質問)
-      選択肢: ...
-   2. (質問)
-   ...
-
-B) 要件が十分に明確になった場合：
-   最終的な仕様をまとめてください。形式：
-   
-   【要件確定】
-   
-   【最終仕様】
-   - 機能: ...
-   - 入力方法: ...
-   - 出力形式: ...
-   - エラーハンドリング: ...
-   - その他: ...
-   
-   【実装準備完了】
-   この仕様で実装を開始できます。
-
-どちらかの形式で応答してください。
-"""
-        
-        response = self.llm_client.invoke(continuation_prompt)
-        response_text = response.content.strip()
+        # Only the new answer is sent; earlier turns go as chat history
+        content = user_response
+        if self.slots is not None:
+            self.slots.observe_answer(user_response)
+            if self.slots.complete:
+                # Every spec field is answered: ask for the spec, not more questions
+                content = self.slots.finalize_prompt(user_response)
+        response_text = self._send(content, user_response)
         
         # Add assistant response to history
         self.conversation_history.append({
@@ -210,17 +265,59 @@ B) 要件が十分に明確になった場合：
         if "【要件確定】" in response_text or "【実装準備完了】" in response_text:
             self.requirements_gathered = True
             self.final_specification = self._extract_specification(response_text)
+            if self.journal is not None:
+                self.journal.append("spec", spec=self.final_specification)
             return True, response_text
         else:
+            if self.slots is not None:
+                self.slots.observe_questions(response_text)
             return False, response_text
     
-    def _build_conversation_context(self) -> str:
-        """Build a formatted conversation context."""
-        context_parts = []
-        for i, msg in enumerate(self.conversation_history):
-            role = "ユーザー" if msg["role"] == "user" else "Airis"
-            context_parts.append(f"【{role}】\n{msg['content']}\n")
-        return "\n".join(context_parts)
+    def _send(self, content: str, shown: str) -> str:
+        """Send one chat turn and journal it; returns the reply."""
+        folded = self.chat.folded_turns
+        response_text = self.chat.send(content).content.strip()
+        if self.journal is not None:
+            if self.chat.folded_turns > folded:
+                # Applied before this turn was added, so replayed before it too
+                self.journal.append("fold", turns=self.chat.folded_turns - folded,
+                                    summary=self.chat.summary, facts=self.chat.facts)
+            offset = self.journal.append("turn", user=shown, sent=content, reply=response_text)
+            if offset is not None:
+                self.turn_offsets.append(offset)
+        return response_text
+    
+    def record_draft(self, draft) -> None:
+        """Store a speculative draft of the spec with the session."""
+        self.draft = draft
+        if self.journal is not None:
+            self.journal.append("draft", draft=dataclasses.asdict(draft))
+    
+    def close(self, reason: str) -> None:
+        """Mark the stored session as finished ("実行済み", "キャンセル")."""
+        if self.journal is not None:
+            self.journal.append("closed", reason=reason)
+    
+    def _project_context(self) -> str:
+        """Project context for the prompt prefix (empty without a project)."""
+        memory = self.context.memory
+        if memory is None:
+            return ""
+        return f"""---
+
+【現在のプロジェクト情報】
+{memory.get_project_context()}
+
+---
+"""
+    
+    def _system_prompt(self) -> str:
+        """System prompt for the chat, trimmed to the interactive_mode prompt budget."""
+        return build_prompt([
+            PromptSection(get_system_context(), priority=1, name="system context"),
+            PromptSection(self._project_context(), priority=0, name="project context"),
+            PromptSection(FOLLOW_UP_INSTRUCTIONS),
+        ], "interactive_mode")
     
     def _extract_specification(self, response: str) -> Dict[str, str]:
         """
@@ -232,27 +329,23 @@ B) 要件が十分に明確になった場合：
         Returns:
             Dictionary containing extracted specification
         """
+        fields = parse_spec_fields(response)
         spec = {
             "full_text": response,
+            "fields": fields,
             "requirements": [],
             "constraints": [],
             "implementation_notes": []
         }
-        
-        # Simple extraction (can be enhanced with more sophisticated parsing)
-        lines = response.split("\n")
-        current_section = None
-        
-        for line in lines:
-            line = line.strip()
-            if "機能:" in line or "- 機能:" in line:
-                spec["requirements"].append(line.replace("- ", "").replace("機能:", "").strip())
-            elif "入力" in line and ":" in line:
-                spec["requirements"].append(line)
-            elif "出力" in line and ":" in line:
-                spec["requirements"].append(line)
-            elif "エラー" in line and ":" in line:
-                spec["constraints"].append(line)
+        if fields.get("機能"):
+            spec["requirements"].append(fields["機能"])
+        for name in ("入力方法", "出力形式"):
+            if fields.get(name):
+                spec["requirements"].append(f"{name}: {fields[name]}")
+        if fields.get("エラーハンドリング"):
+            spec["constraints"].append(f"エラーハンドリング: {fields['エラーハンドリング']}")
+        if fields.get("その他"):
+            spec["implementation_notes"].append(fields["その他"])
         
         return spec
     
@@ -281,6 +374,15 @@ B) 要件が十分に明確になった場合：
         
         summary = f"会話ターン数: {len(self.conversation_history)}\n"
         summary += f"要件確定: {'はい' if self.requirements_gathered else 'いいえ'}\n"
+        input_tokens, cache_read = self.chat.last_turn_tokens
+        if input_tokens is not None:
+            summary += f"直近ターンの入力トークン: {input_tokens} (キャッシュ: {cache_read})\n"
+        if self.chat.folded_turns:
+            summary += f"要約済みターン数: {self.chat.folded_turns}\n"
+        if self.slots is not None and not self.requirements_gathered and self.slots.missing:
+            summary += f"未回答の項目: {', '.join(self.slots.missing)}\n"
+        if self.chat.facts:
+            summary += "決定事項:\n" + "".join(f"- {fact}\n" for fact in self.chat.facts)
         return summary
 
 
@@ -291,29 +393,67 @@ class InteractiveOrchestrator:
     Manages the flow of interactive conversations and task execution.
     """
     
-    def __init__(self, orchestrator):
+    def __init__(self, orchestrator, llm_client=None):
         """
         Initialize interactive orchestrator.
         
         Args:
             orchestrator: Main Orchestrator instance for task execution
+            llm_client: LLM client shared by this orchestrator's sessions
+                (each session creates its own by default)
         """
         self.orchestrator = orchestrator
+        self.llm_client = llm_client
         self.current_session: Optional[InteractiveSession] = None
+        # Drafts the implementation while the user reviews a candidate spec
+        self.speculator = None
+        if config.snapshot.interactive.speculative_drafts:
+            from airis.speculation import Speculator
+            self.speculator = Speculator(orchestrator)
     
-    def start_interactive_mode(self, initial_prompt: str) -> str:
+    def start_interactive_mode(self, initial_prompt: str, context: Optional[RequestContext] = None) -> str:
         """
         Start interactive mode with initial prompt.
         
         Args:
             initial_prompt: User's initial request
+            context: Request context for the session (defaults to the current config)
             
         Returns:
             First clarification questions
         """
-        self.current_session = InteractiveSession()
+        if self.speculator is not None:
+            self.speculator.cancel()
+        self.current_session = InteractiveSession(context, self.llm_client)
         return self.current_session.start_session(initial_prompt)
     
+    def resume_session(self, session_id: str, context: Optional[RequestContext] = None) -> str:
+        """
+        Resume a stored session where it left off (no LLM calls are replayed).
+        
+        Args:
+            session_id: Session id (or a unique prefix of it)
+            context: Request context of the session's project (defaults to the current config)
+            
+        Returns:
+            The session's last reply, to show the user where they left off
+            
+        Raises:
+            KeyError: If no stored session matches
+        """
+        session = InteractiveSession.resume(session_id, context, self.llm_client)
+        if self.speculator is not None:
+            self.speculator.cancel()
+            if session.draft is not None:
+                self.speculator.seed(session.draft)
+        self.current_session = session
+        history = session.conversation_history
+        return history[-1]["content"] if history else ""
+    
+    def list_sessions(self, context: Optional[RequestContext] = None) -> str:
+        """Stored sessions of the project that can be resumed."""
+        return SessionStore.for_context(context or RequestContext.from_config()).format()
+    
     def process_user_input(self, user_input: str) -> tuple[bool, str, Optional[str]]:
         """
         Process user input in interactive mode.
@@ -332,6 +472,9 @@ class InteractiveOrchestrator:
         
         # Check for special commands
         if user_input.lower() in ["cancel", "キャンセル", "quit", "exit"]:
+            if self.speculator is not None:
+                self.speculator.cancel()
+            self.current_session.close("キャンセル")
             self.current_session = None
             return True, "対話モードを終了しました。", None
         
@@ -339,22 +482,30 @@ class InteractiveOrchestrator:
             # User wants to proceed with current understanding
             if self.current_session.requirements_gathered:
                 final_prompt = self.current_session.get_final_prompt()
-                result, code = self.orchestrator.delegate_task(final_prompt)
+                context = self.current_session.context
+                draft = self.speculator.take(final_prompt, context) if self.speculator is not None else None
+                if draft is not None:
+                    result, code = self.orchestrator.delegate_task(final_prompt, context, draft=draft)
+                else:
+                    result, code = self.orchestrator.delegate_task(final_prompt, context)
+                if self.speculator is not None:
+                    self.speculator.cancel()
                 
                 # Save to project memory
-                from airis.config import config
-                current_project = config.get("current_project")
-                if current_project and project_memory_manager.has_memory():
-                    memory = project_memory_manager.get_current_memory()
-                    memory.add_conversation(
-                        user_prompt=final_prompt,
-                        ai_response=result,
-                        task_type="interactive_session"
-                    )
-                    if self.current_session.final_specification:
-                        for req in self.current_session.final_specification.get("requirements", []):
-                            memory.add_note(f"要件: {req}")
+                memory = context.memory
+                if memory is not None:
+                    # One journal write for the conversation and all requirements
+                    with memory.batch():
+                        memory.add_conversation(
+                            user_prompt=final_prompt,
+                            ai_response=result,
+                            task_type="interactive_session"
+                        )
+                        if self.current_session.final_specification:
+                            for req in self.current_session.final_specification.get("requirements", []):
+                                memory.add_note(f"要件: {req}")
                 
+                self.current_session.close("実行済み")
                 self.current_session = None
                 return True, "要件に基づいて実行しました。", result
             else:
@@ -364,6 +515,10 @@ class InteractiveOrchestrator:
         is_complete, response = self.current_session.continue_conversation(user_input)
         
         if is_complete:
+            # Draft the implementation while the user reviews the spec
+            if self.speculator is not None:
+                session = self.current_session
+                self.speculator.start(session.get_final_prompt(), session.context, on_draft=session.record_draft)
             # Requirements are gathered, ask for confirmation
             confirmation_msg = f"{response}\n\n以下のコマンドを選択してください：\n"
             confirmation_msg += "- 'execute' または '実行': この仕様で実装を開始\n"
@@ -373,6 +528,11 @@ class InteractiveOrchestrator:
         else:
             return False, response, None
     
+    def close(self) -> None:
+        """Stop background work for the session (a running draft); its journal stays resumable."""
+        if self.speculator is not None:
+            self.speculator.cancel()
+    
     def has_active_session(self) -> bool:
         """Check if there's an active interactive session."""
         return self.current_session is not None
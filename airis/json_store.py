@@ -0,0 +1,128 @@
+"""
+Persisted JSON Stores
+
+Base class for the small counters AIRIS keeps across runs (engine latency
+stats, the token usage ledger): entries keyed by a pair of names, loaded
+lazily from a JSON file on first use, saved atomically (temp file +
+rename) at most every ``save_interval`` seconds, and once more at exit so
+the last updates of a short CLI run are not lost.
+"""
+
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypeVar
+
+logger = logging.getLogger(__name__)
+
+Entry = TypeVar("Entry")
+Key = Tuple[str, str]
+
+
+class JSONStore(Generic[Entry]):
+    """
+    Thread-safe, lazily loaded, throttled-persistence store of entries.
+
+    Subclasses set ``entry_type`` (with ``to_dict`` / ``from_dict`` and a
+    no-argument constructor), ``section`` (the key holding the entries in
+    the file) and ``label`` (for log messages), and implement
+    ``default_path``.
+    """
+
+    entry_type: Type[Entry]
+    section: str
+    label: str
+
+    def __init__(self, path: Optional[str] = None, save_interval: float = 10.0):
+        """
+        Initialize the store.
+
+        Args:
+            path: JSON file for persistence (defaults to ``default_path()``)
+            save_interval: Minimum seconds between automatic saves
+        """
+        self._path = path
+        self.save_interval = save_interval
+        self._entries: Dict[Key, Entry] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._dirty = False
+        self._last_save = 0.0
+        atexit.register(self.save)
+
+    def default_path(self) -> str:
+        raise NotImplementedError
+
+    @property
+    def path(self) -> str:
+        return os.path.expanduser(self._path or self.default_path())
+
+    @staticmethod
+    def split_key(key: str) -> Key:
+        first, _, second = key.partition("|")
+        return first, second
+
+    def _ensure_loaded(self) -> None:
+        """Load the file on first use; call with the lock held."""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable {self.label} {self.path}: {e}")
+            return
+        for key, value in data.get(self.section, {}).items():
+            self._entries[self.split_key(key)] = self.entry_type.from_dict(value)
+
+    def _entry(self, key: Key) -> Entry:
+        """The entry for a key, created if missing; call with the lock held."""
+        self._ensure_loaded()
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = self.entry_type()
+        return entry
+
+    def _changed(self) -> bool:
+        """Mark the store dirty; call with the lock held. Returns whether a save is due."""
+        self._dirty = True
+        return time.monotonic() - self._last_save >= self.save_interval
+
+    def _get(self, key: Key) -> Optional[Entry]:
+        with self._lock:
+            self._ensure_loaded()
+            return self._entries.get(key)
+
+    def _items(self) -> List[Tuple[Key, Entry]]:
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._entries.items())
+
+    def save(self) -> None:
+        """Write the store atomically (temp file + rename)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data: Dict[str, Any] = {
+                "version": 1,
+                self.section: {f"{a}|{b}": entry.to_dict() for (a, b), entry in self._entries.items()},
+            }
+            self._dirty = False
+            self._last_save = time.monotonic()
+        path = self.path
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{self.section}.", suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Failed to save {self.label} to {path}: {e}")
@@ -23,17 +23,25 @@ class LLMClient:
         """
         self.unified_client = UnifiedAIClient(task_type)
     
-    def invoke(self, prompt: str):
+    def invoke(self, prompt: str, profile: str = None, prefix: str = None, history=()):
         """
         Sends a prompt to the configured AI and returns the response.
         
         Args:
             prompt: Input prompt
+            profile: Optional generation profile from config.yaml (e.g.
+                "filename_suggestion" for a small, fast model)
+            prefix: Optional stable prompt prefix the provider may cache
+            history: Earlier chat turns (see airis.chat.ChatSession)
             
         Returns:
             Response object with .content attribute
         """
-        return self.unified_client.invoke(prompt)
+        return self.unified_client.invoke(prompt, profile=profile, prefix=prefix, history=history)
+    
+    def reset(self):
+        """Re-resolve the engine from the current config (the provider client is rebuilt lazily)."""
+        self.unified_client = UnifiedAIClient(self.unified_client.task_type)
     
     def get_engine_name(self) -> str:
         """Get the name of the current engine."""
@@ -52,6 +52,32 @@ def create_project_structure(project_name: str):
 
     typer.echo(f"Project '{project_name}' created successfully at '{project_path}'.")
 
+def _run_task(prompt: str) -> tuple[str, str | None]:
+    """
+    Run a prompt on the warm Airis daemon if one is available, otherwise in-process.
+    """
+    if config.snapshot.daemon.use_daemon and not os.environ.get("AIRIS_NO_DAEMON"):
+        from airis.daemon import DaemonError, send_task
+        try:
+            reply = send_task(prompt, on_output=lambda text: print(text, end="", flush=True))
+        except (DaemonError, OSError) as e:
+            # The task may already have run on the daemon; don't silently run it twice
+            return f"Error: Airis daemon request failed: {e}", None
+        if reply is not None:
+            return reply
+
+    from airis.cancellation import DeadlineExceeded, OperationCancelled
+    from airis.resilience import LLMError
+    orchestrator = Orchestrator()
+    try:
+        return orchestrator.delegate_task(prompt)
+    except LLMError as e:
+        return f"Error: AI engine request failed: {e}", None
+    except DeadlineExceeded as e:
+        return f"Error: Request timed out: {e}", None
+    except OperationCancelled as e:
+        return f"Error: Request cancelled: {e}", None
+
 def main(prompt: str):
     """
     Airis: Your personal AI assistant.
@@ -97,8 +123,19 @@ def main(prompt: str):
         
         return
 
-    orchestrator = Orchestrator()
-    display_result, generated_code = orchestrator.delegate_task(prompt)
+    # Full-text search over the current project's memory
+    if prompt.lower().startswith("memory search"):
+        query = prompt[len("memory search"):].strip()
+        current_project = config.get("current_project")
+        if not query or not current_project:
+            typer.echo("Usage: 'memory search <query>' with a project selected ('use project <name>').")
+            return
+        from airis.memory_archive import format_hits
+        memory = project_memory_manager.get_memory(current_project, config.get("projects_root_dir", "projects"))
+        typer.echo(format_hits(memory.search(query), query))
+        return
+
+    display_result, generated_code = _run_task(prompt)
     print("--- RESULT ---")
     print(display_result)
 
@@ -135,9 +172,53 @@ def interactive():
     run_interactive_cli()
 
 
+def startup_profile():
+    """
+    Report a -X importtime style breakdown of Airis CLI startup.
+    """
+    from airis.startup_profile import run_startup_profile
+    print(run_startup_profile())
+
+
+def serve(args: list[str]):
+    """
+    Run the persistent Airis daemon, or control a running one.
+
+    Usage: airis serve [--stop | --reload]
+           airis serve --http [--port N]
+    """
+    if "--http" in args:
+        from airis.http_server import run_http_server
+        port = int(args[args.index("--port") + 1]) if "--port" in args else None
+        run_http_server(port=port)
+        return
+    from airis.daemon import AirisDaemon, send_control
+    if "--stop" in args or "--reload" in args:
+        reply = send_control("shutdown" if "--stop" in args else "reload")
+        print(reply if reply is not None else "No Airis daemon is running.")
+        return
+    AirisDaemon().serve_forever()
+
+
+def batch(args: list[str]):
+    """
+    Run a JSONL file of prompts concurrently.
+
+    Usage: airis batch <input.jsonl> [--output results.jsonl] [--concurrency N]
+    """
+    from airis.batch import run_batch_command
+    sys.exit(run_batch_command(args))
+
+
 if __name__ == "__main__":
+    if "--startup-profile" in sys.argv[1:]:
+        startup_profile()
+    elif len(sys.argv) >= 2 and sys.argv[1] == "serve":
+        serve(sys.argv[2:])
+    elif len(sys.argv) >= 2 and sys.argv[1] == "batch":
+        batch(sys.argv[2:])
     # Check if interactive mode is requested
-    if len(sys.argv) == 1 or (len(sys.argv) == 2 and sys.argv[1] in ["--interactive", "-i", "interactive"]):
+    elif len(sys.argv) == 1 or (len(sys.argv) == 2 and sys.argv[1] in ["--interactive", "-i", "interactive"]):
         interactive()
     else:
         typer.run(main)
@@ -0,0 +1,175 @@
+"""
+Project Memory Archive
+
+ProjectMemory keeps a bounded working set (the last 50 conversations, 30 AI
+interactions, shortened responses) for prompt context. The archive keeps
+everything, untruncated, in ``.airis_memory/memory.db``: one SQLite table
+per kind of entry plus an FTS5 index over their text, so ``memory search``
+finds old work in milliseconds even with tens of thousands of entries.
+
+The index uses the trigram tokenizer, which matches any substring of three
+or more characters and therefore works for Japanese text without word
+boundaries; shorter terms are matched with LIKE. Without FTS5 support in
+the local SQLite, every term is matched with LIKE.
+
+The database runs in WAL mode, so searches never block writers.
+"""
+
+import logging
+import sqlite3
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+# kind -> (table, columns, columns indexed for search)
+TABLES = {
+    "conversation": ("conversations", ("task_type", "user_prompt", "ai_response"), ("user_prompt", "ai_response")),
+    "file": ("files", ("path", "type", "description"), ("path", "description")),
+    "interaction": ("interactions", ("agent", "task", "result"), ("task", "result")),
+    "note": ("notes", ("content",), ("content",)),
+}
+# ProjectMemory lists holding each kind
+MEMORY_LISTS = {
+    "conversation": "conversation_history",
+    "file": "generated_files",
+    "interaction": "ai_interactions",
+    "note": "notes",
+}
+KIND_LABELS = {"conversation": "会話", "file": "ファイル", "interaction": "AI実行", "note": "メモ"}
+
+# Shortest term the trigram index can match
+MIN_INDEXED_TERM = 3
+SNIPPET_WIDTH = 80
+
+
+@dataclass(slots=True)
+class SearchHit:
+    """One entry found by ``memory search``."""
+    kind: str
+    at: str
+    text: str
+
+    def snippet(self, terms: List[str]) -> str:
+        """The text around the first matched term, on one line."""
+        text = " ".join(self.text.split())
+        lowered = text.lower()
+        positions = [lowered.find(term.lower()) for term in terms]
+        start = min((p for p in positions if p >= 0), default=0)
+        start = max(0, start - SNIPPET_WIDTH // 4)
+        snippet = text[start:start + SNIPPET_WIDTH]
+        return ("…" if start else "") + snippet + ("…" if start + SNIPPET_WIDTH < len(text) else "")
+
+
+class MemoryArchive:
+    """Complete, searchable record of a project's memory."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            for table, columns, _ in TABLES.values():
+                self._conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} "
+                    f"(id INTEGER PRIMARY KEY, at TEXT NOT NULL, {', '.join(f'{c} TEXT' for c in columns)})"
+                )
+            try:
+                self._conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS search "
+                    "USING fts5(kind UNINDEXED, at UNINDEXED, body, tokenize='trigram')"
+                )
+                self.fts = True
+            except sqlite3.OperationalError:
+                logger.info("SQLite has no FTS5 trigram tokenizer; memory search falls back to LIKE")
+                self._conn.execute("CREATE TABLE IF NOT EXISTS search (kind TEXT, at TEXT, body TEXT)")
+                self.fts = False
+
+    def is_empty(self) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT NOT EXISTS (SELECT 1 FROM search)").fetchone()[0] == 1
+
+    def add(self, kind: str, entry: Dict[str, Any]) -> None:
+        """Archive one ProjectMemory entry (a conversation, file, interaction or note)."""
+        with self._lock, self._conn:
+            self._insert(kind, entry)
+
+    def import_memory(self, memory: Dict[str, Any]) -> int:
+        """Archive the entries of an existing ProjectMemory; returns how many."""
+        count = 0
+        with self._lock, self._conn:
+            for kind, key in MEMORY_LISTS.items():
+                for entry in memory.get(key, []):
+                    self._insert(kind, entry)
+                    count += 1
+        return count
+
+    def _insert(self, kind: str, entry: Dict[str, Any]) -> None:
+        table, columns, indexed = TABLES[kind]
+        at = entry.get("timestamp", "")
+        self._conn.execute(
+            f"INSERT INTO {table} (at, {', '.join(columns)}) VALUES (?{', ?' * len(columns)})",
+            (at, *(str(entry.get(column, "")) for column in columns)),
+        )
+        body = "\n".join(str(entry.get(column, "")) for column in indexed)
+        self._conn.execute("INSERT INTO search (kind, at, body) VALUES (?, ?, ?)", (kind, at, body))
+
+    def search(self, query: str, limit: int = 20) -> List[SearchHit]:
+        """
+        Entries containing every whitespace-separated term of the query.
+
+        Returns:
+            Most recent first; with LIMIT this stops at the first matches
+            instead of ranking every one, which keeps common terms fast
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        where, params = [], []
+        indexed = [term for term in terms if self.fts and len(term) >= MIN_INDEXED_TERM]
+        if indexed:
+            where.append("search MATCH ?")
+            params.append(" AND ".join('"' + term.replace('"', '""') + '"' for term in indexed))
+        for term in terms:
+            if term not in indexed:
+                where.append("body LIKE ? ESCAPE '\\'")
+                escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                params.append(f"%{escaped}%")
+        sql = f"SELECT kind, at, body FROM search WHERE {' AND '.join(where)} ORDER BY rowid DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, limit)).fetchall()
+        return [SearchHit(kind, at, body) for kind, at, body in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def search_entries(memory: Dict[str, Any], query: str, limit: int = 20) -> List[SearchHit]:
+    """Search a ProjectMemory's working set (when the archive is disabled)."""
+    terms = [term.lower() for term in query.split()]
+    if not terms:
+        return []
+    hits = []
+    for kind, key in MEMORY_LISTS.items():
+        indexed = TABLES[kind][2]
+        for entry in memory.get(key, []):
+            body = "\n".join(str(entry.get(column, "")) for column in indexed)
+            if all(term in body.lower() for term in terms):
+                hits.append(SearchHit(kind, entry.get("timestamp", ""), body))
+    hits.sort(key=lambda hit: hit.at, reverse=True)
+    return hits[:limit]
+
+
+def format_hits(hits: List[SearchHit], query: str) -> str:
+    """Result list for ``memory search``."""
+    if not hits:
+        return f"'{query}' に一致する記憶はありません"
+    terms = query.split()
+    lines = []
+    for hit in hits:
+        lines.append(f"[{KIND_LABELS[hit.kind]}] {hit.at[:16].replace('T', ' ')}  {hit.snippet(terms)}")
+    return "\n".join(lines)
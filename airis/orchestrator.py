@@ -1,48 +1,57 @@
-from agents.code_agent import CodeAgent
-from agents.shell_agent import ShellAgent
-from agents.cursor_agent import CursorAgent
-from agents.web_search_agent import WebSearchAgent
-from agents.web_browser_agent import WebBrowserAgent
-from agents.document_completion_agent import DocumentCompletionAgent
-from agents.git_agent import GitAgent
-from agents.gemini_agent import GeminiAgent
-from agents.validator_agent import ValidatorAgent
+from airis.agent_registry import AgentRegistry
 from airis.llm import llm_client
 from airis.config import config
 from airis.ai_engine_manager import ai_engine_manager
 from airis.ai_engine_commands import ai_engine_commands
 from airis.system_context import get_system_context, get_capability_info
-from airis.project_memory import project_memory_manager
+from airis.prompt_budget import PromptSection, build_prompt
+from airis.request_context import RequestContext
 import os
+import re
 import difflib
 
+# A bare "name.ext" (the filename profile stops at the first newline, not at prose)
+_FILENAME = re.compile(r"^[\w-][\w.-]*\.[A-Za-z0-9]+$")
+DEFAULT_FILENAME = "main.py"
+
 class Orchestrator:
     def __init__(self):
-        self.agents = {
-            "code": CodeAgent(),
-            "shell": ShellAgent(),
-            "cursor": CursorAgent(),
-            "web_search": WebSearchAgent(),
-            "web_browser": WebBrowserAgent(),
-            "doc_completion": DocumentCompletionAgent(),
-            "git": GitAgent(),
-            "gemini": GeminiAgent(),
-            "validator": ValidatorAgent(),
-        }
+        # Agents are constructed lazily on first use (see airis.agent_registry)
+        self.agents = AgentRegistry()
+        agent_settings = config.snapshot.agents
+        self.prewarm_likely_next = agent_settings.prewarm_likely_next
+        if agent_settings.prewarm:
+            self.agents.prewarm(agent_settings.prewarm)
         # Validation settings
-        self.enable_validation = config.get("enable_output_validation", True)
-        self.validation_tasks = config.get("validation_tasks", [
-            "code_generation", 
-            "document_generation", 
-            "code_analysis"
-        ])
-
-    def delegate_task(self, user_prompt: str) -> tuple[str, str | None]:
+        self.enable_validation = config.snapshot.enable_output_validation
+        self.validation_tasks = list(config.snapshot.validation_tasks)
+
+    def delegate_task(self, user_prompt: str, context: RequestContext | None = None,
+                      draft=None) -> tuple[str, str | None]:
         """
         Delegates the user's task to the appropriate agent based on keywords.
         Returns a tuple of (display_result_string, generated_code_string).
         If no code is generated (e.g., for shell agent), generated_code_string will be None.
+
+        The request runs in ``context`` (project, memory, engine overrides,
+        deadline); without one, a context is built from the current config.
+        The context is the current request while the task runs, so agents,
+        LLM calls and sandbox runs share its deadline and cancellation.
+
+        A speculative ``draft`` (airis.speculation.Draft) written for this
+        prompt is run instead of generating the code again.
+
+        Raises:
+            OperationCancelled: If the request was cancelled (DeadlineExceeded
+                when it ran out of time)
         """
+        if context is None:
+            context = RequestContext.from_config()
+        with context.activate():
+            context.check()
+            return self._delegate(user_prompt, context, draft)
+
+    def _delegate(self, user_prompt: str, context: RequestContext, draft=None) -> tuple[str, str | None]:
         # Check if user is asking about Airis itself
         prompt_lower = user_prompt.lower()
         if any(keyword in prompt_lower for keyword in ["airisとは", "airisについて", "airisの機能", "あなたは誰", "何ができる", "できること"]):
@@ -61,20 +70,19 @@ class Orchestrator:
         # Check for document generation intent
         # Check for a full development cycle request
         if user_prompt.lower().startswith("develop:"):
-            return self._handle_development_cycle(user_prompt.replace("develop:", "").strip())
+            return self._handle_development_cycle(user_prompt.replace("develop:", "").strip(), context)
 
         # NEW: Check for Cursor editing intent
         if user_prompt.lower().startswith("edit in cursor:"):
-            return self._handle_cursor_edit(user_prompt.replace("edit in cursor:", "").strip())
+            return self._handle_cursor_edit(user_prompt.replace("edit in cursor:", "").strip(), context)
 
         # Check for document generation intent
         if user_prompt.lower().startswith("generate docs"):
-            current_project = config.get("current_project")
+            current_project = context.project
             if not current_project:
                 return "Error: No active project selected. Please use 'use project [project_name]' first.", None
             
-            projects_root = config.get("projects_root_dir", "projects")
-            project_doc_path = os.path.join(projects_root, current_project, "doc")
+            project_doc_path = context.project_path("doc")
             os.makedirs(project_doc_path, exist_ok=True)
 
             doc_type = user_prompt.lower().replace("generate docs", "").strip()
@@ -149,30 +157,29 @@ class Orchestrator:
             return result, None
         
         # Use AI Engine Manager for intelligent routing
-        task_type = self._determine_task_type(user_prompt)
-        selected_engine = ai_engine_manager.get_engine_for_task(task_type, user_prompt)
-        agent_name = self._map_engine_to_agent(selected_engine, user_prompt)
+        task_type, selected_engine, agent_name = self.route(user_prompt, context)
         
+        # Warm up follow-up agents (git, validator, ...) while this one works
+        if self.prewarm_likely_next:
+            self.agents.prewarm_likely_next(agent_name)
+
+        context.check()
 
         agent = self.agents[agent_name]
         
         if agent_name == "code":
-            execution_result, generated_code = agent.execute(user_prompt)
-            
-            # Ask LLM to suggest a filename
-            filename_prompt = f"""Based on the following user prompt and generated Python code, suggest a single, appropriate filename (e.g., main.py, fibonacci.py). Do not include any explanation or markdown formatting.
-
-User Prompt: {user_prompt}
-Generated Code:\n{generated_code}
-Filename:"""
-            suggested_filename_response = llm_client.invoke(filename_prompt)
-            suggested_filename = suggested_filename_response.content.strip()
+            if draft is not None:
+                execution_result, generated_code = agent.execute(
+                    user_prompt, request_context=context, code=draft.code
+                )
+                suggested_filename = draft.filename or self.suggest_filename(user_prompt, generated_code)
+            else:
+                execution_result, generated_code = agent.execute(user_prompt, request_context=context)
+                suggested_filename = self.suggest_filename(user_prompt, generated_code)
 
             # Save code to file if user approves
-            current_project = config.get("current_project")
-            if current_project:
-                projects_root = config.get("projects_root_dir", "projects")
-                project_src_path = os.path.join(projects_root, current_project, "src")
+            if context.project:
+                project_src_path = context.project_path("src")
                 os.makedirs(project_src_path, exist_ok=True)
                 
                 code_file_path = os.path.join(project_src_path, suggested_filename)
@@ -181,8 +188,8 @@ Filename:"""
                 
                 # Auto git commit after code generation
                 git_agent = self.agents["git"]
-                if git_agent._check_git_repo():
-                    git_result = git_agent.execute("git auto")
+                if git_agent._check_git_repo(context.working_dir):
+                    git_result = git_agent.execute("git auto", request_context=context)
                     display_result = f"{execution_result}\nCode saved to: {code_file_path}\nGit update: {git_result}"
                 else:
                     display_result = f"{execution_result}\nCode saved to: {code_file_path}"
@@ -199,7 +206,7 @@ Filename:"""
             return display_result, generated_code
         elif agent_name in ["web_search", "web_browser", "doc_completion", "git", "gemini", "cursor"]:
             # Execute agent
-            result = agent.execute(user_prompt)
+            result = agent.execute(user_prompt, request_context=context)
             
             # Validate output if enabled
             if self.enable_validation and task_type in self.validation_tasks:
@@ -211,17 +218,41 @@ Filename:"""
             return result, None
         else:
             # For shell agent, no code is generated for saving
-            result = agent.execute(user_prompt)
+            result = agent.execute(user_prompt, request_context=context)
             return result, None
 
-    def _handle_development_cycle(self, task_description: str) -> tuple[str, str | None]:
-        current_project = config.get("current_project")
-        if not current_project:
+    def route(self, user_prompt: str, context: RequestContext) -> tuple[str, str, str]:
+        """
+        Pick the task type, engine and agent for a prompt.
+
+        Returns:
+            (task_type, engine, agent_name)
+        """
+        task_type = self._determine_task_type(user_prompt)
+        selected_engine = ai_engine_manager.get_engine_for_task(
+            task_type, user_prompt, preferred=context.engine_for(task_type)
+        )
+        return task_type, selected_engine, self._map_engine_to_agent(selected_engine, user_prompt)
+
+    def suggest_filename(self, user_prompt: str, generated_code: str) -> str:
+        """Ask the LLM (fast profile) for a filename for generated code (``main.py`` if the answer is not one)."""
+        filename_prompt = f"""Based on the following user prompt and generated Python code, suggest a single, appropriate filename (e.g., main.py, fibonacci.py). Do not include any explanation or markdown formatting.
+
+User Prompt: {user_prompt}
+Generated Code:\n{generated_code}
+Filename:"""
+        suggested_filename_response = llm_client.invoke(filename_prompt, profile="filename_suggestion")
+        filename = (suggested_filename_response.content or "").strip().strip("`'\"")
+        if not _FILENAME.match(filename):
+            return DEFAULT_FILENAME
+        return filename
+
+    def _handle_development_cycle(self, task_description: str, context: RequestContext) -> tuple[str, str | None]:
+        if not context.project:
             return "Error: No active project selected. Please use 'use project [project_name]' first.", None
 
-        projects_root = config.get("projects_root_dir", "projects")
-        project_doc_path = os.path.join(projects_root, current_project, "doc")
-        project_src_path = os.path.join(projects_root, current_project, "src")
+        project_doc_path = context.project_path("doc")
+        project_src_path = context.project_path("src")
         os.makedirs(project_doc_path, exist_ok=True)
         os.makedirs(project_src_path, exist_ok=True)
 
@@ -247,11 +278,12 @@ Filename:"""
 
         # 2. Generate Design Document
         design_filename = "02_design.md"
-        design_prompt = f"""プロジェクト「{task_description}」のシステム設計書を日本語で生成してください。
-
-以下の要件を考慮してください：
-{req_content}
+        design_prompt = build_prompt([
+            PromptSection(f"""プロジェクト「{task_description}」のシステム設計書を日本語で生成してください。
 
+以下の要件を考慮してください："""),
+            PromptSection(req_content, priority=0, name="requirements"),
+            PromptSection("""
 以下の構成で記述してください：
 1. システム概要
 2. アーキテクチャ設計
@@ -263,7 +295,8 @@ Filename:"""
 各セクションは簡潔に、しかし完全に記述してください。
 日本語で記述し、技術的な内容も分かりやすく説明してください。
 
-重要：ドキュメントを完全に生成してください。各セクションを最後まで記述し、適切な終了でドキュメントを完了してください。"""
+重要：ドキュメントを完全に生成してください。各セクションを最後まで記述し、適切な終了でドキュメントを完了してください。"""),
+        ], "orchestration")
         design_content_response = llm_client.invoke(design_prompt)
         design_content = design_content_response.content.strip()
         
@@ -285,25 +318,18 @@ Filename:"""
 
         # 3. Generate Code
         code_agent = self.agents["code"]
-        code_prompt = f"""Based on the following requirements and design, generate Python code to {task_description}.
-Requirements:
-{req_content}
-
-Design:
-{design_content}
-
-Output only the Python code.
-"""
-        execution_result, generated_code = code_agent.execute(code_prompt)
+        # Trimmed to the prompt budget: requirements first (the design covers them), then design
+        code_prompt = build_prompt([
+            PromptSection(f"Based on the following requirements and design, generate Python code to {task_description}.\nRequirements:"),
+            PromptSection(req_content, priority=0, name="requirements"),
+            PromptSection("\nDesign:"),
+            PromptSection(design_content, priority=1, name="design"),
+            PromptSection("\nOutput only the Python code.\n"),
+        ], "code_generation")
+        execution_result, generated_code = code_agent.execute(code_prompt, request_context=context)
 
         # Ask LLM to suggest a filename for the code
-        filename_prompt = f"""Based on the following user prompt and generated Python code, suggest a single, appropriate filename (e.g., main.py, fibonacci.py). Do not include any explanation or markdown formatting.
-
-User Prompt: {task_description}
-Generated Code:\n{generated_code}
-Filename:"""
-        suggested_filename_response = llm_client.invoke(filename_prompt)
-        suggested_filename = suggested_filename_response.content.strip()
+        suggested_filename = self.suggest_filename(task_description, generated_code)
 
         code_file_path = os.path.join(project_src_path, suggested_filename)
         with open(code_file_path, "w") as f:
@@ -313,24 +339,24 @@ Filename:"""
         
         # Auto git commit after code generation
         git_agent = self.agents["git"]
-        if git_agent._check_git_repo():
-            git_result = git_agent.execute("git auto")
+        if git_agent._check_git_repo(context.working_dir):
+            git_result = git_agent.execute("git auto", request_context=context)
             display_result += f"\nGit update: {git_result}\n"
 
         # 4. Generate README.md
         readme_filename = "README.md"
-        readme_prompt = f"""プロジェクト「{task_description}」のREADME.mdを日本語で生成してください。Markdown形式で出力してください。
+        # Trimmed to the prompt budget: design first, then requirements, then code
+        readme_prompt = build_prompt([
+            PromptSection(f"""プロジェクト「{task_description}」のREADME.mdを日本語で生成してください。Markdown形式で出力してください。
 
 以下の要件と設計を考慮してください：
-要件：
-{req_content}
-
-設計：
-{design_content}
-
-生成されたコード：
-{generated_code}
-
+要件："""),
+            PromptSection(req_content, priority=1, name="requirements"),
+            PromptSection("\n設計："),
+            PromptSection(design_content, priority=0, name="design"),
+            PromptSection("\n生成されたコード："),
+            PromptSection(generated_code, priority=2, name="generated code"),
+            PromptSection("""
 以下の構成で記述してください：
 1. プロジェクト概要
 2. 機能
@@ -343,7 +369,8 @@ Filename:"""
 各セクションは簡潔に、しかし完全に記述してください。
 日本語で記述し、プロジェクトの使い方を分かりやすく説明してください。
 
-重要：ドキュメントを完全に生成してください。各セクションを最後まで記述し、適切な終了でドキュメントを完了してください。"""
+重要：ドキュメントを完全に生成してください。各セクションを最後まで記述し、適切な終了でドキュメントを完了してください。"""),
+        ], "orchestration")
         readme_content_response = llm_client.invoke(readme_prompt)
         readme_content = readme_content_response.content.strip()
         
@@ -358,7 +385,7 @@ Filename:"""
             completion_response = llm_client.invoke(completion_prompt)
             readme_content += "\n\n" + completion_response.content.strip()
         
-        readme_file_path = os.path.join(projects_root, current_project, readme_filename)
+        readme_file_path = context.project_path(readme_filename)
         with open(readme_file_path, "w") as f:
             f.write(readme_content)
         display_result += f"README.md generated and saved to '{readme_file_path}'.\n"
@@ -366,7 +393,7 @@ Filename:"""
         return display_result, generated_code
 
     # NEW: _handle_cursor_edit method
-    def _handle_cursor_edit(self, task_description: str) -> tuple[str, str | None]:
+    def _handle_cursor_edit(self, task_description: str, context: RequestContext) -> tuple[str, str | None]:
         cursor_agent = self.agents["cursor"]
         code_agent = self.agents["code"]
 
@@ -378,16 +405,16 @@ Filename:"""
             return f"Error: Active file '{file_path}' is empty or could not be read.", None
 
         # 2. Generate new code based on task and original content
-        code_prompt = f"""Based on the following file content and task, generate the corrected or new Python code.
+        code_prompt = build_prompt([
+            PromptSection(f"""Based on the following file content and task, generate the corrected or new Python code.
 Only output the code, without any explanation or markdown formatting.
 
 File Path: {file_path}
-File Content:
-{original_content}
-
-Task: {task_description}
-"""
-        execution_result, generated_code = code_agent.execute(code_prompt)
+File Content:"""),
+            PromptSection(original_content, priority=0, name="file content"),
+            PromptSection(f"\nTask: {task_description}\n"),
+        ], "code_generation")
+        execution_result, generated_code = code_agent.execute(code_prompt, request_context=context)
 
         if "Code executed successfully." not in execution_result:
             return f"Code generation or execution failed: {execution_result}", generated_code
@@ -559,6 +586,13 @@ Task: {task_description}
         elif "disable cost optimization" in prompt_lower:
             return ai_engine_commands.disable_cost_optimization()
         
+        elif "set policy" in prompt_lower:
+            parts = user_prompt.split()
+            if len(parts) >= 5:
+                return ai_engine_commands.set_routing_policy(parts[4].lower())
+            else:
+                return "Usage: ai engine set policy <static/latency>"
+        
         elif "set availability" in prompt_lower:
             # Extract engine and availability
             parts = user_prompt.split()
@@ -569,6 +603,9 @@ Task: {task_description}
             else:
                 return "Usage: ai engine set availability <engine_name> <true/false>"
         
+        elif "agents" in prompt_lower:
+            return self.agents.get_status()
+        
         elif "info" in prompt_lower or "status" in prompt_lower:
             return ai_engine_commands.get_engine_info()
         
@@ -590,7 +627,9 @@ Task: {task_description}
 - ai engine enable cost optimization
 - ai engine disable cost optimization
 - ai engine set availability <engine_name> <true/false>
+- ai engine set policy <static/latency>
 - ai engine info
+- ai engine agents
 - ai engine debug
 - ai engine save
 - ai engine reset"""
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""
+Per-Thread Output Capture
+
+``contextlib.redirect_stdout`` swaps ``sys.stdout`` for the whole process,
+so it cannot be used when several worker threads run tasks that print at
+the same time (HTTP API jobs, batch runs). ``capture_output`` instead
+installs a router on ``sys.stdout`` that sends each thread's writes to its
+own sink.
+"""
+
+import contextlib
+import sys
+import threading
+
+# Per-thread output sinks shared by every router instance
+_output_sinks = threading.local()
+
+
+class ThreadOutputRouter:
+    """sys.stdout replacement that routes writes to a per-thread sink."""
+
+    def __init__(self, fallback):
+        self.fallback = fallback
+
+    def write(self, text: str) -> int:
+        sink = getattr(_output_sinks, "sink", None)
+        return (sink or self.fallback).write(text)
+
+    def flush(self) -> None:
+        sink = getattr(_output_sinks, "sink", None)
+        (sink or self.fallback).flush()
+
+    def __getattr__(self, name):
+        return getattr(self.fallback, name)
+
+
+@contextlib.contextmanager
+def capture_output(sink):
+    """Send everything the current thread prints to ``sink`` (any object with write/flush)."""
+    if not isinstance(sys.stdout, ThreadOutputRouter):
+        # Installed lazily, in case something replaced sys.stdout meanwhile
+        sys.stdout = ThreadOutputRouter(sys.stdout)
+    previous = getattr(_output_sinks, "sink", None)
+    _output_sinks.sink = sink
+    try:
+        yield
+    finally:
+        _output_sinks.sink = previous
+
+
+def release_output_router() -> None:
+    """Restore the original sys.stdout if a router is installed."""
+    if isinstance(sys.stdout, ThreadOutputRouter):
+        sys.stdout = sys.stdout.fallback
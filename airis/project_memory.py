@@ -5,12 +5,19 @@ This module manages project-specific memory and context to enable
 continuation of work on existing projects.
 """
 
+import atexit
 import os
 import json
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
 from pathlib import Path
 
+from airis.config import config
+
 
 class ProjectMemory:
     """
@@ -22,6 +29,17 @@ class ProjectMemory:
     - Generated files
     - Requirements and specifications
     - Previous AI interactions
+    
+    Updates are appended to a JSON Lines journal (``context.journal.jsonl``),
+    one small entry each, instead of rewriting the whole memory. Every
+    ``memory.compact_every`` entries the memory is written to the
+    ``context.json`` snapshot and the journal starts over; loading reads the
+    snapshot and replays the journal entries after it. The journal is
+    fsynced at most every ``memory.fsync_interval`` seconds.
+    
+    The memory itself is a bounded working set for prompt context; with
+    ``memory.archive`` every entry is also kept, untruncated and
+    full-text searchable, in ``.airis_memory/memory.db`` (see ``search``).
     """
     
     def __init__(self, project_name: str, projects_root: str = "projects"):
@@ -30,6 +48,17 @@ class ProjectMemory:
         self.project_path = os.path.join(projects_root, project_name)
         self.memory_path = os.path.join(self.project_path, ".airis_memory")
         self.memory_file = os.path.join(self.memory_path, "context.json")
+        self.journal_file = os.path.join(self.memory_path, "context.journal.jsonl")
+        
+        self._lock = threading.RLock()
+        self._journal = None          # Append handle, opened on the first update
+        self._seq = 0                 # Sequence number of the last applied entry
+        self._journal_entries = 0     # Entries written since the last snapshot
+        self._last_fsync = 0.0
+        self._unsynced = False
+        self._batch: Optional[List[bytes]] = None
+        # Complete, searchable record (airis.memory_archive); opened on first use
+        self._archive = None
         
         # Initialize memory directory
         os.makedirs(self.memory_path, exist_ok=True)
@@ -38,16 +67,37 @@ class ProjectMemory:
         self.memory = self._load_memory()
     
     def _load_memory(self) -> Dict:
-        """Load project memory from file."""
+        """Load project memory: the snapshot plus the journal entries after it."""
+        memory = self._create_empty_memory()
         if os.path.exists(self.memory_file):
             try:
                 with open(self.memory_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                    memory = json.load(f)
             except Exception as e:
                 print(f"Warning: Failed to load project memory: {e}")
-                return self._create_empty_memory()
-        else:
-            return self._create_empty_memory()
+        self._seq = memory.pop("journal_seq", 0)
+        for entry in self._read_journal():
+            self._journal_entries += 1
+            # Entries up to journal_seq are already in the snapshot (a crash
+            # between writing it and emptying the journal leaves them behind)
+            if entry.get("seq", 0) > self._seq:
+                self._apply(memory, entry)
+                self._seq = entry["seq"]
+        return memory
+    
+    def _read_journal(self) -> Iterator[Dict[str, Any]]:
+        try:
+            with open(self.journal_file, 'rb') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        # A line cut off by a crash
+                        print("Warning: Skipping a damaged project memory entry")
+        except FileNotFoundError:
+            return
+        except OSError as e:
+            print(f"Warning: Failed to read project memory journal: {e}")
     
     def _create_empty_memory(self) -> Dict:
         """Create empty memory structure."""
@@ -65,15 +115,101 @@ class ProjectMemory:
             "notes": []
         }
     
+    @staticmethod
+    def _apply(memory: Dict, entry: Dict[str, Any]):
+        """Apply one journal entry to a memory dict."""
+        field = entry["field"]
+        if entry["op"] == "append":
+            items = memory.setdefault(field, [])
+            items.append(entry["value"])
+            keep = entry.get("keep")
+            if keep and len(items) > keep:
+                del items[:-keep]
+        elif entry.get("key") is not None:
+            memory.setdefault(field, {})[entry["key"]] = entry["value"]
+        else:
+            memory[field] = entry["value"]
+        memory["last_updated"] = entry["at"]
+    
+    def _record(self, op: str, field: str, value: Any, key: Optional[str] = None, keep: Optional[int] = None):
+        """Apply an update and append it to the journal."""
+        with self._lock:
+            self._seq += 1
+            entry = {"seq": self._seq, "at": datetime.now().isoformat(), "op": op, "field": field, "value": value}
+            if key is not None:
+                entry["key"] = key
+            if keep is not None:
+                entry["keep"] = keep
+            self._apply(self.memory, entry)
+            line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+            if self._batch is not None:
+                self._batch.append(line)
+            else:
+                self._write([line])
+    
+    def _write(self, lines: List[bytes]):
+        settings = config.snapshot.memory
+        with self._lock:
+            try:
+                if self._journal is None:
+                    self._journal = open(self.journal_file, 'ab')
+                self._journal.write(b"".join(lines))
+                self._journal.flush()
+                self._journal_entries += len(lines)
+                self._unsynced = True
+                if time.monotonic() - self._last_fsync >= settings.fsync_interval:
+                    self.flush()
+            except OSError as e:
+                print(f"Warning: Failed to save project memory: {e}")
+                return
+            if self._journal_entries >= settings.compact_every:
+                self.save_memory()
+    
+    @contextmanager
+    def batch(self):
+        """Group several updates into one journal write (and at most one fsync)."""
+        with self._lock:
+            if self._batch is not None:
+                yield self
+                return
+            self._batch = []
+            try:
+                yield self
+            finally:
+                lines, self._batch = self._batch, None
+                if lines:
+                    self._write(lines)
+    
+    def flush(self):
+        """fsync journal entries written since the last fsync."""
+        with self._lock:
+            if self._unsynced and self._journal is not None:
+                try:
+                    os.fsync(self._journal.fileno())
+                except OSError as e:
+                    print(f"Warning: Failed to sync project memory: {e}")
+            self._unsynced = False
+            self._last_fsync = time.monotonic()
+    
     def save_memory(self):
-        """Save memory to file."""
-        self.memory["last_updated"] = datetime.now().isoformat()
-        
-        try:
-            with open(self.memory_file, 'w', encoding='utf-8') as f:
-                json.dump(self.memory, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"Warning: Failed to save project memory: {e}")
+        """Write a snapshot of the whole memory and start a new journal."""
+        with self._lock:
+            try:
+                fd, tmp_path = tempfile.mkstemp(dir=self.memory_path, prefix=".context.", suffix=".tmp")
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(dict(self.memory, journal_seq=self._seq), f, ensure_ascii=False, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.memory_file)
+                # Everything journaled so far is in the snapshot now
+                if self._journal is not None:
+                    self._journal.close()
+                    self._journal = None
+                open(self.journal_file, 'wb').close()
+                self._journal_entries = 0
+                self._unsynced = False
+            except Exception as e:
+                print(f"Warning: Failed to save project memory: {e}")
     
     def add_conversation(self, user_prompt: str, ai_response: str, task_type: str = "general"):
         """Add a conversation to memory."""
@@ -84,13 +220,10 @@ class ProjectMemory:
             "ai_response": ai_response[:500] + "..." if len(ai_response) > 500 else ai_response
         }
         
-        self.memory["conversation_history"].append(conversation)
-        
+        archive = self._get_archive()
         # Keep only last 50 conversations
-        if len(self.memory["conversation_history"]) > 50:
-            self.memory["conversation_history"] = self.memory["conversation_history"][-50:]
-        
-        self.save_memory()
+        self._record("append", "conversation_history", conversation, keep=50)
+        self._archive_entry(archive, "conversation", dict(conversation, ai_response=ai_response))
     
     def add_generated_file(self, file_path: str, file_type: str, description: str = ""):
         """Record a generated file."""
@@ -101,18 +234,17 @@ class ProjectMemory:
             "description": description
         }
         
-        self.memory["generated_files"].append(file_info)
-        self.save_memory()
+        archive = self._get_archive()
+        self._record("append", "generated_files", file_info)
+        self._archive_entry(archive, "file", file_info)
     
     def update_requirements(self, requirements: List[str]):
         """Update project requirements."""
-        self.memory["requirements"] = requirements
-        self.save_memory()
+        self._record("set", "requirements", requirements)
     
     def update_specifications(self, spec_key: str, spec_value: any):
         """Update project specifications."""
-        self.memory["specifications"][spec_key] = spec_value
-        self.save_memory()
+        self._record("set", "specifications", spec_value, key=spec_key)
     
     def add_ai_interaction(self, agent_name: str, task: str, result: str):
         """Record an AI interaction."""
@@ -123,13 +255,10 @@ class ProjectMemory:
             "result": result[:200] + "..." if len(result) > 200 else result
         }
         
-        self.memory["ai_interactions"].append(interaction)
-        
+        archive = self._get_archive()
         # Keep only last 30 interactions
-        if len(self.memory["ai_interactions"]) > 30:
-            self.memory["ai_interactions"] = self.memory["ai_interactions"][-30:]
-        
-        self.save_memory()
+        self._record("append", "ai_interactions", interaction, keep=30)
+        self._archive_entry(archive, "interaction", dict(interaction, result=result))
     
     def add_note(self, note: str):
         """Add a note to project memory."""
@@ -138,8 +267,60 @@ class ProjectMemory:
             "content": note
         }
         
-        self.memory["notes"].append(note_entry)
-        self.save_memory()
+        archive = self._get_archive()
+        self._record("append", "notes", note_entry)
+        self._archive_entry(archive, "note", note_entry)
+    
+    def _get_archive(self):
+        """The project's memory archive (None when disabled or unavailable)."""
+        if not config.snapshot.memory.archive:
+            return None
+        with self._lock:
+            if self._archive is None:
+                from airis.memory_archive import MemoryArchive
+                try:
+                    archive = MemoryArchive(os.path.join(self.memory_path, "memory.db"))
+                    # A new archive starts with what the memory still holds
+                    if archive.is_empty():
+                        archive.import_memory(self.memory)
+                    self._archive = archive
+                except Exception as e:
+                    print(f"Warning: Failed to open project memory archive: {e}")
+                    self._archive = False
+            return self._archive or None
+    
+    def _archive_entry(self, archive, kind: str, entry: Dict[str, Any]):
+        """
+        Archive a new entry.
+        
+        ``archive`` must be fetched before the entry is recorded: a new
+        archive imports what the memory holds when it is opened, and would
+        otherwise import this entry too.
+        """
+        if archive is not None:
+            try:
+                archive.add(kind, entry)
+            except Exception as e:
+                print(f"Warning: Failed to archive project memory entry: {e}")
+    
+    def search(self, query: str, limit: int = 20) -> List[Any]:
+        """
+        Full-text search over the project's conversations, generated files,
+        AI interactions and notes.
+        
+        Args:
+            query: Whitespace-separated terms; entries must contain all of them
+            limit: Maximum number of hits
+            
+        Returns:
+            SearchHits (airis.memory_archive), most recent first; without the
+            archive only the working set is searched
+        """
+        from airis.memory_archive import search_entries
+        archive = self._get_archive()
+        if archive is None:
+            return search_entries(self.memory, query, limit)
+        return archive.search(query, limit)
     
     def get_project_context(self) -> str:
         """
@@ -227,8 +408,7 @@ class ProjectMemory:
                         pass
             
             if files and "analyzed_files" not in self.memory:
-                self.memory["analyzed_files"] = files
-                self.save_memory()
+                self._record("set", "analyzed_files", files)
     
     def get_recent_context(self, num_items: int = 5) -> str:
         """Get recent context for continuation."""
@@ -252,15 +432,47 @@ class ProjectMemory:
 class ProjectMemoryManager:
     """
     Global manager for project memories.
+
+    Keeps one ProjectMemory per project so concurrent requests for the same
+    project share (and append to) a single instance.
     """
     
     def __init__(self):
         self.current_memory: Optional[ProjectMemory] = None
+        self._memories: Dict[tuple, ProjectMemory] = {}
+        self._lock = threading.Lock()
+        # Journal entries written since the last fsync are synced at exit
+        atexit.register(self.flush_all)
     
     def load_project_memory(self, project_name: str, projects_root: str = "projects") -> ProjectMemory:
-        """Load memory for a specific project."""
-        self.current_memory = ProjectMemory(project_name, projects_root)
-        return self.current_memory
+        """
+        Make a project's memory current.
+        
+        Returns the shared instance (loaded from disk on first use): a second
+        instance would append to the same journal with its own sequence
+        numbers, and one of them would lose its entries on the next load.
+        """
+        memory = self.get_memory(project_name, projects_root)
+        self.current_memory = memory
+        return memory
+    
+    def get_memory(self, project_name: str, projects_root: str = "projects") -> ProjectMemory:
+        """Return the shared memory for a project without changing the current one."""
+        key = (projects_root, project_name)
+        with self._lock:
+            memory = self._memories.get(key)
+            if memory is None:
+                memory = self._memories[key] = ProjectMemory(project_name, projects_root)
+            return memory
+    
+    def flush_all(self):
+        """fsync the journals of all loaded project memories."""
+        with self._lock:
+            memories = list(self._memories.values())
+        if self.current_memory is not None and self.current_memory not in memories:
+            memories.append(self.current_memory)
+        for memory in memories:
+            memory.flush()
     
     def get_current_memory(self) -> Optional[ProjectMemory]:
         """Get current project memory."""
@@ -0,0 +1,92 @@
+"""
+Prompt Budgets
+
+Prompts are assembled from sections (system context, project context,
+conversation history, earlier documents, ...). ``build_prompt`` keeps the
+assembled prompt within the task type's token budget (``tokens.prompt_budgets``)
+by trimming the lowest-priority sections first: a section is cut down
+just enough to fit, or dropped when even that is not enough. Sections
+without a priority (the instructions and the user's request) are never
+trimmed.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from airis.config import config
+from airis.resilience import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+TRIM_MARKER = "\n...(省略)...\n"
+
+
+@dataclass(slots=True)
+class PromptSection:
+    """One part of a prompt."""
+    text: str
+    priority: Optional[int] = None  # Lower priorities are trimmed first; None: never trimmed
+    name: str = ""
+    keep_tail: bool = False         # Keep the end when trimming (e.g. the latest conversation turns)
+
+
+def fit_sections(sections: Sequence[PromptSection], budget: Optional[int]) -> List[str]:
+    """
+    Trim sections so that their estimated total fits ``budget`` tokens.
+
+    Args:
+        sections: Prompt sections in prompt order
+        budget: Token budget (None: unlimited)
+
+    Returns:
+        Section texts in prompt order; dropped sections are empty strings
+    """
+    texts = [section.text for section in sections]
+    if budget is None:
+        return texts
+    sizes = [estimate_tokens(text) if text else 0 for text in texts]
+    over = sum(sizes) - budget
+    if over <= 0:
+        return texts
+    trimmable = sorted(
+        (i for i, section in enumerate(sections) if section.priority is not None and texts[i]),
+        key=lambda i: sections[i].priority,
+    )
+    trimmed = []
+    marker = estimate_tokens(TRIM_MARKER)
+    for i in trimmable:
+        section = sections[i]
+        trimmed.append(section.name or f"section {i}")
+        keep_tokens = sizes[i] - over - marker
+        if keep_tokens <= 0:
+            texts[i] = ""
+            over -= sizes[i]
+        else:
+            keep_chars = len(section.text) * keep_tokens // sizes[i]
+            if section.keep_tail:
+                texts[i] = TRIM_MARKER + section.text[len(section.text) - keep_chars:]
+            else:
+                texts[i] = section.text[:keep_chars] + TRIM_MARKER
+            over = 0
+        if over <= 0:
+            break
+    logger.info(f"Prompt over its {budget}-token budget; trimmed {', '.join(trimmed)}")
+    if over > 0:
+        logger.warning(f"Prompt exceeds its {budget}-token budget by ~{over} tokens after trimming")
+    return texts
+
+
+def build_prompt(sections: Sequence[PromptSection], task_type: str) -> str:
+    """
+    Join prompt sections, trimmed to the task type's prompt budget.
+
+    Args:
+        sections: Prompt sections in prompt order
+        task_type: Task type whose budget applies (tokens.prompt_budgets)
+
+    Returns:
+        The assembled prompt
+    """
+    budget = config.snapshot.tokens.prompt_budget(task_type)
+    return "\n".join(text for text in fit_sections(sections, budget) if text)
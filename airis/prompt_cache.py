@@ -0,0 +1,181 @@
+"""
+Prompt Prefix Caching
+
+Prompts built from a stable prefix (the Airis system context, the project
+context) and a variable suffix let providers reuse the prefix instead of
+re-processing it on every call:
+
+- Claude: the prefix is sent as the system prompt with an ``ephemeral``
+  cache breakpoint, so repeated prefixes are read from Anthropic's prompt
+  cache. In multi-turn chats a second breakpoint after the previous turn
+  caches the conversation so far.
+- Gemini: the prefix becomes the model's system instruction. Long
+  prefixes (``tokens.gemini_cache_min_tokens``) are uploaded once as
+  cached content and reused until the cache's TTL runs out; shorter ones
+  rely on Gemini's implicit caching of repeated prefixes.
+
+Cache reads are reported in the response's usage metadata and added to
+the usage ledger.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from airis.config import config
+from airis.resilience import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+def claude_messages(prefix: Optional[str], prompt: str,
+                    history: Sequence[Dict[str, str]] = ()) -> List[Dict[str, Any]]:
+    """
+    Chat messages for Claude: ``prefix`` as a cacheable system prompt, then
+    the earlier turns (``{"role": "user" | "assistant", "content": ...}``)
+    with a cache breakpoint after the last one, then ``prompt``.
+    """
+    cache = config.snapshot.tokens.prompt_cache
+    messages: List[Dict[str, Any]] = []
+    if prefix:
+        system: Dict[str, Any] = {"type": "text", "text": prefix}
+        if cache:
+            system["cache_control"] = {"type": "ephemeral"}
+        messages.append({"role": "system", "content": [system]})
+    for i, message in enumerate(history):
+        content: Any = message["content"]
+        if cache and i == len(history) - 1:
+            content = [{"type": "text", "text": content, "cache_control": {"type": "ephemeral"}}]
+        messages.append({"role": message["role"], "content": content})
+    messages.append({"role": "user", "content": prompt})
+    return messages
+
+
+def gemini_history(history: Sequence[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """Earlier turns in Gemini's chat format (the assistant role is "model")."""
+    return [
+        {"role": "user" if message["role"] == "user" else "model", "parts": [message["content"]]}
+        for message in history
+    ]
+
+
+def _generation_config(genai, settings) -> Any:
+    return genai.types.GenerationConfig(
+        max_output_tokens=settings.max_tokens,
+        temperature=settings.temperature,
+        stop_sequences=list(settings.stop_sequences) or None,
+    )
+
+
+class GeminiContextCache:
+    """Gemini models per system prefix: cached-content models for long prefixes."""
+
+    # Stop using a cache this long before the provider expires it
+    EXPIRY_MARGIN = 30.0
+    # System-instruction models kept for prefixes that are not cached
+    MAX_PLAIN_MODELS = 32
+    # Cache-creation errors that will recur for the model; others are retried
+    UNSUPPORTED_ERRORS = ("not supported", "too short", "too small")
+
+    def __init__(self):
+        self._models: Dict[Tuple[Any, str], Tuple[Any, float]] = {}
+        self._plain_models: "OrderedDict[Tuple[Any, str], Any]" = OrderedDict()
+        # Models that cannot cache content (unsupported, minimum size above our threshold)
+        self._unsupported: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def model_for(self, settings, prefix: str) -> Any:
+        """
+        Model with ``prefix`` as its system instruction, created on first use.
+
+        Args:
+            settings: ModelSettings of the call
+            prefix: Stable prompt prefix
+
+        Returns:
+            A GenerativeModel bound to a cached copy of the prefix when it
+            can be cached, else a plain model with the prefix as system
+            instruction
+        """
+        cached = self._cached_model(settings, prefix)
+        if cached is not None:
+            return cached
+        key = (settings, hashlib.sha256(prefix.encode("utf-8")).hexdigest())
+        with self._lock:
+            model = self._plain_models.get(key)
+            if model is not None:
+                self._plain_models.move_to_end(key)
+                return model
+        model = self._build(settings, prefix)
+        with self._lock:
+            self._plain_models[key] = model
+            while len(self._plain_models) > self.MAX_PLAIN_MODELS:
+                self._plain_models.popitem(last=False)
+        return model
+
+    def _cached_model(self, settings, prefix: str) -> Optional[Any]:
+        """Model bound to a cached copy of ``prefix`` (None: not cacheable)."""
+        tokens = config.snapshot.tokens
+        if not tokens.prompt_cache or settings.model_name in self._unsupported:
+            return None
+        if estimate_tokens(prefix) < tokens.gemini_cache_min_tokens:
+            return None
+        key = (settings, hashlib.sha256(prefix.encode("utf-8")).hexdigest())
+        now = time.time()
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None and entry[1] > now:
+                return entry[0]
+        try:
+            model = self._create(settings, prefix, tokens.gemini_cache_ttl)
+        except Exception as e:
+            if not any(marker in str(e).lower() for marker in self.UNSUPPORTED_ERRORS):
+                # Quota, network and server errors pass; try caching again on the next call
+                logger.warning(f"Gemini context cache creation failed for {settings.model_name}: {e}")
+                return None
+            logger.info(f"Gemini context caching unavailable for {settings.model_name}: {e}")
+            with self._lock:
+                self._unsupported.add(settings.model_name)
+            return None
+        with self._lock:
+            self._models = {k: v for k, v in self._models.items() if v[1] > now}
+            self._models[key] = (model, now + tokens.gemini_cache_ttl - self.EXPIRY_MARGIN)
+        return model
+
+    @staticmethod
+    def _create(settings, prefix: str, ttl: float) -> Any:
+        """Upload the prefix as cached content and return a model bound to it."""
+        import datetime
+        import google.generativeai as genai
+        from google.generativeai import caching
+
+        cached = caching.CachedContent.create(
+            model=f"models/{settings.model_name}",
+            system_instruction=prefix,
+            ttl=datetime.timedelta(seconds=ttl),
+        )
+        return genai.GenerativeModel.from_cached_content(cached, generation_config=_generation_config(genai, settings))
+
+    @staticmethod
+    def _build(settings, prefix: str) -> Any:
+        """Model with the prefix as system instruction (no upload)."""
+        import google.generativeai as genai
+
+        return genai.GenerativeModel(
+            settings.model_name,
+            system_instruction=prefix,
+            generation_config=_generation_config(genai, settings),
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+            self._plain_models.clear()
+            self._unsupported.clear()
+
+
+# Global instance
+gemini_context_cache = GeminiContextCache()
@@ -0,0 +1,91 @@
+"""
+Rate Limiting
+
+Thread-safe token buckets used to keep Airis below provider rate limits.
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """
+    Classic token bucket.
+
+    Tokens refill continuously at ``rate_per_minute / 60`` per second up to
+    ``capacity``; each acquisition takes ``amount`` tokens, waiting for the
+    bucket to refill when it is empty.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        """
+        Initialize the bucket.
+
+        Args:
+            rate_per_minute: Sustained refill rate
+            capacity: Maximum burst size (defaults to one second's worth, at least 1)
+            clock: Monotonic clock, injectable for tests
+            sleep: Sleep function, injectable for tests
+        """
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(1.0, self.rate_per_second)
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+        self._updated = now
+
+    def try_acquire(self, amount: float = 1.0) -> float:
+        """
+        Take ``amount`` tokens if available.
+
+        Returns:
+            0.0 on success, otherwise the seconds to wait before retrying
+        """
+        # Requests larger than the bucket could never succeed; let them drain it
+        amount = min(amount, self.capacity)
+        with self._lock:
+            self._refill()
+            if self._tokens >= amount:
+                self._tokens -= amount
+                return 0.0
+            return (amount - self._tokens) / self.rate_per_second
+
+    def acquire(self, amount: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """
+        Block until ``amount`` tokens are available.
+
+        Args:
+            amount: Tokens to take
+            timeout: Maximum seconds to wait, or None to wait indefinitely
+
+        Returns:
+            True if acquired, False if the timeout expired first
+        """
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            wait = self.try_acquire(amount)
+            if wait == 0.0:
+                return True
+            if deadline is not None:
+                remaining = deadline - self._clock()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            self._sleep(wait)
+
+    @property
+    def available(self) -> float:
+        """Tokens currently in the bucket."""
+        with self._lock:
+            self._refill()
+            return self._tokens
@@ -0,0 +1,253 @@
+"""
+REPL Background Jobs
+
+Long REPL tasks (``quick`` requests such as ``develop:`` cycles or web
+searches, executing a confirmed spec) run as background jobs so the prompt
+stays usable: the user can keep chatting or start more tasks while earlier
+ones run, and manage them with ``jobs``, ``fg <id>`` and ``cancel <id>``.
+
+Jobs run on a bounded thread pool (``repl.max_jobs``; further jobs queue).
+An asyncio event loop on a helper thread supervises them and prints their
+progress and completion lines, so worker threads never write to the
+terminal themselves. The main thread keeps reading input with ``input()``,
+which keeps readline editing and Ctrl-C working as before.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from airis.cancellation import DeadlineExceeded, OperationCancelled
+from airis.output_capture import capture_output
+from airis.request_context import RequestContext
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+FINISHED_STATES = (JOB_DONE, JOB_FAILED, JOB_CANCELLED)
+
+STATUS_LABELS = {
+    JOB_QUEUED: "待機中",
+    JOB_RUNNING: "実行中",
+    JOB_DONE: "完了",
+    JOB_FAILED: "失敗",
+    JOB_CANCELLED: "キャンセル",
+}
+
+# Width of the progress lines printed for background jobs
+PROGRESS_WIDTH = 100
+
+
+class BackgroundJob:
+    """One task running (or queued) in the background."""
+
+    __slots__ = ("id", "title", "context", "status", "result", "code", "error", "output",
+                 "created_at", "started_at", "finished_at", "future", "_partial", "_runner")
+
+    def __init__(self, job_id: int, title: str, context: RequestContext, runner: "JobRunner"):
+        self.id = job_id
+        self.title = title
+        self.context = context
+        self.status = JOB_QUEUED
+        self.result: Optional[str] = None
+        self.code: Optional[str] = None
+        self.error: Optional[str] = None
+        self.output: List[str] = []
+        self.created_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.future: Optional[concurrent.futures.Future] = None
+        self._partial = ""
+        self._runner = runner
+
+    def write(self, text: str) -> int:
+        """Collect the job's printed output line by line."""
+        self._partial += text
+        *lines, self._partial = self._partial.split("\n")
+        for line in lines:
+            self.output.append(line)
+            self._runner._progress(self, line)
+        return len(text)
+
+    def flush(self) -> None:
+        pass
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds the job has been running (0 while queued)."""
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+
+class JobRunner:
+    """Runs REPL tasks in the background with bounded concurrency."""
+
+    def __init__(self, max_jobs: int = 2, progress: bool = True, echo: Callable[[str], None] = print):
+        """
+        Initialize the runner.
+
+        Args:
+            max_jobs: Jobs running at once; further jobs wait in the queue
+            progress: Print background jobs' output lines as they appear
+            echo: Prints a line to the terminal (called on the event loop thread)
+        """
+        self.max_jobs = max_jobs
+        self.progress = progress
+        self.echo = echo
+        self.jobs: Dict[int, BackgroundJob] = {}
+        self.foreground: Optional[int] = None  # Job whose output is shown in full
+        self._next_id = 1
+        self._executor = ThreadPoolExecutor(max_workers=max_jobs, thread_name_prefix="airis-job")
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="airis-repl-loop", daemon=True)
+        self._thread.start()
+
+    def submit(self, title: str, fn: Callable[[RequestContext], Tuple[str, Optional[str]]],
+               context: Optional[RequestContext] = None) -> BackgroundJob:
+        """
+        Start ``fn(context)`` as a background job.
+
+        ``fn`` returns (result, generated_code) and may print; its output
+        becomes the job's progress. The job is cancelled through
+        ``context``'s cancellation token.
+
+        Args:
+            title: Short description shown in ``jobs``
+            fn: The task
+            context: Request context to run in (defaults to the current config)
+
+        Returns:
+            The queued job
+        """
+        job = BackgroundJob(self._next_id, title, context or RequestContext.from_config(), self)
+        self._next_id += 1
+        self.jobs[job.id] = job
+        job.future = asyncio.run_coroutine_threadsafe(self._supervise(job, fn), self._loop)
+        return job
+
+    async def _supervise(self, job: BackgroundJob, fn) -> None:
+        await self._loop.run_in_executor(self._executor, self._run, job, fn)
+        if job.id != self.foreground:
+            self.echo(self._finish_line(job))
+
+    def _run(self, job: BackgroundJob, fn) -> None:
+        if job.status == JOB_CANCELLED:
+            return
+        job.status = JOB_RUNNING
+        job.started_at = time.monotonic()
+        with capture_output(job):
+            try:
+                with job.context.activate():
+                    job.result, job.code = fn(job.context)
+                job.status = JOB_DONE
+            except DeadlineExceeded as e:
+                job.status, job.error = JOB_FAILED, str(e)
+            except OperationCancelled as e:
+                job.status, job.error = JOB_CANCELLED, str(e)
+            except Exception as e:
+                logger.exception(f"Job {job.id} failed")
+                job.status, job.error = JOB_FAILED, str(e)
+            finally:
+                if job._partial:
+                    job.write("\n")
+                job.finished_at = time.monotonic()
+
+    def _progress(self, job: BackgroundJob, line: str) -> None:
+        """Show a job's output line (called on the job's worker thread)."""
+        if job.id == self.foreground:
+            self._loop.call_soon_threadsafe(self.echo, line)
+        elif self.progress and line.strip():
+            text = f"[{job.id}] {line.strip()}"
+            if len(text) > PROGRESS_WIDTH:
+                text = text[:PROGRESS_WIDTH - 3] + "..."
+            self._loop.call_soon_threadsafe(self.echo, text)
+
+    @staticmethod
+    def _finish_line(job: BackgroundJob) -> str:
+        line = f"[{job.id}] {STATUS_LABELS[job.status]} ({job.elapsed:.1f}s): {job.title}"
+        if job.status == JOB_DONE:
+            line += f" — 'fg {job.id}' で結果を表示"
+        elif job.error:
+            line += f" — {job.error}"
+        return line
+
+    def get(self, job_id: int) -> BackgroundJob:
+        """
+        Look up a job.
+
+        Raises:
+            KeyError: If there is no such job
+        """
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise KeyError(f"ジョブ {job_id} は存在しません")
+        return job
+
+    def wait(self, job_id: int, timeout: Optional[float] = None) -> BackgroundJob:
+        """
+        Bring a job to the foreground and wait for it.
+
+        Its output so far is echoed, then new lines as they appear. A
+        KeyboardInterrupt while waiting sends the job back to the
+        background (it keeps running).
+
+        Raises:
+            KeyError: If there is no such job
+            concurrent.futures.TimeoutError: If ``timeout`` passed first
+        """
+        job = self.get(job_id)
+        for line in list(job.output):
+            self.echo(line)
+        self.foreground = job.id
+        try:
+            job.future.result(timeout)
+        finally:
+            self.foreground = None
+        return job
+
+    def cancel(self, job_id: int) -> BackgroundJob:
+        """
+        Cancel a queued or running job.
+
+        Raises:
+            KeyError: If there is no such job
+        """
+        job = self.get(job_id)
+        if not job.finished:
+            if job.status == JOB_QUEUED:
+                job.status = JOB_CANCELLED
+            job.context.cancellation.cancel("cancelled by user")
+        return job
+
+    def running(self) -> List[BackgroundJob]:
+        """Jobs that are queued or running."""
+        return [job for job in self.jobs.values() if not job.finished]
+
+    def format(self) -> str:
+        """Job table for the ``jobs`` command."""
+        if not self.jobs:
+            return "ジョブはありません"
+        lines = []
+        for job in self.jobs.values():
+            lines.append(f"[{job.id}] {STATUS_LABELS[job.status]:<6} {job.elapsed:6.1f}s  {job.title}")
+        return "\n".join(lines)
+
+    def shutdown(self) -> None:
+        """Cancel unfinished jobs and stop the event loop."""
+        for job in self.running():
+            self.cancel(job.id)
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._loop.call_soon_threadsafe(self._loop.stop)
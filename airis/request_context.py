@@ -0,0 +1,169 @@
+"""
+Request Context
+
+Everything a single request needs to know about *where* it runs: the
+active project and its memory, engine overrides, deadline and a trace id.
+The context is resolved once when a request starts and then passed down
+through the Orchestrator, the agents and interactive sessions, so
+concurrent requests for different projects never read each other's state
+from the global config mid-request.
+
+The context also carries the request's cancellation token. While a request
+runs (``with context.activate():``) it is the *current request*, so deep
+call sites such as LLM calls can find their time budget and token via
+``current_request()`` without every signature passing it along.
+"""
+
+import contextvars
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from airis.cancellation import CancellationToken, DeadlineExceeded, OperationCancelled, run_cancellable
+from airis.config import config
+from airis.project_memory import ProjectMemory, project_memory_manager
+
+_current_request: contextvars.ContextVar[Optional["RequestContext"]] = contextvars.ContextVar(
+    "airis_current_request", default=None
+)
+
+
+def current_request() -> Optional["RequestContext"]:
+    """The RequestContext of the request running in this thread / task, if any."""
+    return _current_request.get()
+
+
+def call_budget(cap: Optional[float]) -> Optional[float]:
+    """Time budget for a call made on behalf of the current request (``cap`` outside requests)."""
+    request = current_request()
+    return request.budget(cap) if request is not None else cap
+
+
+def is_project_name(project: Any) -> bool:
+    """Whether ``project`` is a plain project name (no path separators, not hidden)."""
+    return isinstance(project, str) and bool(project) and os.sep not in project and not project.startswith(".")
+
+
+def _new_trace_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+@dataclass(slots=True)
+class RequestContext:
+    """Per-request execution context."""
+    project: Optional[str] = None
+    projects_root: str = "projects"
+    memory: Optional[ProjectMemory] = None
+    engine_overrides: Dict[str, str] = field(default_factory=dict)
+    deadline: Optional[float] = None  # time.monotonic() timestamp
+    trace_id: str = field(default_factory=_new_trace_id)
+    working_dir: str = field(default_factory=os.getcwd)
+    cancellation: CancellationToken = field(default_factory=CancellationToken)
+    # Engines that answered this request's LLM calls, in first-use order
+    served_engines: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_config(cls, project: Optional[str] = None, timeout: Optional[float] = None,
+                    **kwargs) -> "RequestContext":
+        """
+        Build a context from the current config snapshot.
+
+        Args:
+            project: Project to run in (defaults to ``current_project``)
+            timeout: Seconds until the request's deadline (defaults to timeouts.request)
+            **kwargs: Other RequestContext fields (engine_overrides, trace_id, ...);
+                an explicit ``deadline`` wins over ``timeout``
+
+        Returns:
+            A context with the project's memory attached
+        """
+        snapshot = config.snapshot
+        project = project or snapshot.current_project
+        projects_root = kwargs.pop("projects_root", snapshot.projects_root_dir)
+        memory = kwargs.pop("memory", None)
+        if project and memory is None:
+            memory = project_memory_manager.get_memory(project, projects_root)
+        deadline = kwargs.pop("deadline", None)
+        if deadline is None:
+            timeout = timeout if timeout is not None else snapshot.timeouts.request
+            deadline = time.monotonic() + timeout if timeout is not None else None
+        return cls(project=project, projects_root=projects_root, memory=memory, deadline=deadline, **kwargs)
+
+    def project_path(self, *parts: str) -> str:
+        """Path inside the active project (e.g. ``project_path("src")``)."""
+        if not self.project:
+            raise ValueError("No active project in this request context")
+        return os.path.join(self.projects_root, self.project, *parts)
+
+    def engine_for(self, task_type: str) -> Optional[str]:
+        """Engine override for a task type (or the ``default`` override), if any."""
+        return self.engine_overrides.get(task_type) or self.engine_overrides.get("default")
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left until the deadline, or None without a deadline."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def budget(self, cap: Optional[float] = None) -> Optional[float]:
+        """
+        Time budget for one call: the time left until the deadline, capped at ``cap``.
+
+        Returns:
+            Seconds, or None when there is neither a deadline nor a cap
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return cap
+        return remaining if cap is None else min(remaining, cap)
+
+    def check(self) -> None:
+        """
+        Raise if the request should stop now.
+
+        Raises:
+            OperationCancelled: If the request was cancelled
+            DeadlineExceeded: If the deadline has passed
+        """
+        if self.cancellation.cancelled:
+            raise OperationCancelled(f"Request {self.trace_id} cancelled: {self.cancellation.reason}")
+        if self.expired:
+            raise DeadlineExceeded(f"Request {self.trace_id} exceeded its deadline")
+
+    def run(self, fn: Callable[[], Any], cap: Optional[float] = None,
+            on_cancel: Optional[Callable[[], Any]] = None, name: str = "operation") -> Any:
+        """
+        Run a blocking call within this request's budget (see run_cancellable).
+
+        Args:
+            fn: Zero-argument blocking call
+            cap: Per-call time limit on top of the request deadline
+            on_cancel: Abort hook called when the call is abandoned
+            name: Description for error messages
+        """
+        self.check()
+        return run_cancellable(fn, self.cancellation, self.budget(cap), on_cancel, name)
+
+    @contextmanager
+    def activate(self) -> Iterator["RequestContext"]:
+        """
+        Make this the current request for the duration of the block.
+
+        A KeyboardInterrupt (Ctrl-C) raised inside the block cancels the
+        request, which aborts its containers and HTTP calls.
+        """
+        token = _current_request.set(self)
+        try:
+            yield self
+        except KeyboardInterrupt:
+            self.cancellation.cancel("interrupted")
+            raise
+        finally:
+            _current_request.reset(token)
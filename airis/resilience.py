@@ -0,0 +1,401 @@
+"""
+Provider Resilience
+
+Per-engine protection for LLM calls:
+
+- token buckets for requests per minute and tokens per minute,
+- retries with exponential backoff and full jitter on retryable errors
+  (rate limits, overload, timeouts, 5xx),
+- a circuit breaker that stops sending traffic to an engine after
+  consecutive failures and probes it again after a cool-down.
+
+Provider exceptions are translated into the typed ``LLMError`` hierarchy so
+callers never have to parse error strings out of response content.
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from airis.cancellation import DeadlineExceeded, OperationCancelled
+from airis.config import config
+from airis.config_schema import EngineLimits, ResilienceSettings
+from airis.rate_limit import TokenBucket
+from airis.request_context import current_request
+
+logger = logging.getLogger(__name__)
+
+
+class LLMError(RuntimeError):
+    """Base class for failed LLM calls."""
+    retryable = False
+
+    def __init__(self, engine: str, message: str, retry_after: Optional[float] = None):
+        super().__init__(f"{engine}: {message}")
+        self.engine = engine
+        self.retry_after = retry_after
+
+
+class RateLimitError(LLMError):
+    """The provider rejected the call because of rate or quota limits (HTTP 429)."""
+    retryable = True
+
+
+class ProviderUnavailableError(LLMError):
+    """The provider is overloaded, timed out or returned a server error."""
+    retryable = True
+
+
+class ProviderError(LLMError):
+    """The provider rejected the request itself (bad request, auth, blocked content, ...)."""
+
+
+class CircuitOpenError(LLMError):
+    """The engine's circuit breaker is open; no call was made."""
+
+
+_RATE_LIMIT_NAMES = {"RateLimitError", "ResourceExhausted", "TooManyRequests"}
+_UNAVAILABLE_NAMES = {
+    "ServiceUnavailable", "InternalServerError", "DeadlineExceeded", "GatewayTimeout",
+    "APIConnectionError", "APITimeoutError", "OverloadedError", "Timeout", "ReadTimeout",
+    "ConnectTimeout", "ConnectionError", "TimeoutError", "ConnectionResetError",
+}
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    for attr in ("status_code", "code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+    return None
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    try:
+        value = headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def classify_error(engine: str, exc: BaseException) -> LLMError:
+    """
+    Translate a provider SDK exception into an LLMError.
+
+    Works on exception names and status codes so the provider SDKs never
+    have to be imported here.
+    """
+    if isinstance(exc, LLMError):
+        return exc
+    names = {cls.__name__ for cls in type(exc).__mro__}
+    status = _status_code(exc)
+    message = str(exc) or type(exc).__name__
+    lowered = message.lower()
+
+    if names & _RATE_LIMIT_NAMES or status == 429 or "rate limit" in lowered or "quota" in lowered:
+        return RateLimitError(engine, message, _retry_after(exc))
+    if names & _UNAVAILABLE_NAMES or (status is not None and (status >= 500 or status == 408)) or "overloaded" in lowered:
+        return ProviderUnavailableError(engine, message, _retry_after(exc))
+    return ProviderError(engine, message)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough local token estimate, for throttling and when a provider reports no usage.
+
+    About 4 ASCII characters per token; other characters (Japanese text)
+    count as roughly one token each.
+    """
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return max(1, ascii_chars // 4 + len(text) - ascii_chars)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed -> open after ``failure_threshold`` failures in a row; open ->
+    half_open after ``reset_timeout`` seconds, letting one probe call
+    through; the probe's outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    @property
+    def consecutive_failures(self) -> int:
+        return self._failures
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker lets a probe through (0 when not open)."""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+
+    def allow(self) -> bool:
+        """Return True if a call may be made now."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if self._clock() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def release_probe(self) -> None:
+        """Free the half-open probe slot without an outcome (the probe was cancelled)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.times_opened += 1
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+
+class EngineGuard:
+    """Rate limiting, retries and circuit breaking for one engine."""
+
+    def __init__(self, engine: str, settings: ResilienceSettings, limits: Optional[EngineLimits] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep,
+                 rng: Callable[[float, float], float] = random.uniform):
+        self.engine = engine
+        self.settings = settings
+        limits = limits or EngineLimits()
+        self.request_bucket = (TokenBucket(limits.requests_per_minute, clock=clock, sleep=sleep)
+                               if limits.requests_per_minute else None)
+        # Allow a whole minute's worth of tokens as burst so single large prompts are not starved
+        self.token_bucket = (TokenBucket(limits.tokens_per_minute, capacity=limits.tokens_per_minute,
+                                         clock=clock, sleep=sleep)
+                             if limits.tokens_per_minute else None)
+        self.breaker = CircuitBreaker(settings.failure_threshold, settings.reset_timeout, clock)
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng
+        self._lock = threading.Lock()
+        self._counters = {
+            "requests": 0, "successes": 0, "failures": 0, "retries": 0,
+            "rate_limited": 0, "rejected_open": 0, "throttle_wait_s": 0.0,
+        }
+
+    def _count(self, key: str, amount: float = 1) -> None:
+        with self._lock:
+            self._counters[key] += amount
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Exponential backoff with full jitter, never shorter than the provider's Retry-After."""
+        ceiling = min(self.settings.backoff_max, self.settings.backoff_base * (2 ** attempt))
+        delay = self._rng(0.0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.settings.backoff_max))
+        return delay
+
+    def _backoff(self, delay: float, error: LLMError) -> None:
+        """Sleep before a retry, giving up early if the current request cannot wait that long."""
+        request = current_request()
+        if request is None:
+            self._sleep(delay)
+            return
+        remaining = request.remaining()
+        if remaining is not None and delay >= remaining:
+            self._count("failures")
+            raise error
+        if request.cancellation.wait(delay):
+            request.check()
+
+    def _throttle(self, tokens: int) -> None:
+        start = self._clock()
+        try:
+            if self.request_bucket is not None:
+                self._acquire(self.request_bucket, 1)
+            if self.token_bucket is not None and tokens:
+                self._acquire(self.token_bucket, tokens)
+        finally:
+            waited = self._clock() - start
+            if waited > 0:
+                self._count("throttle_wait_s", waited)
+
+    def _acquire(self, bucket: TokenBucket, amount: float) -> None:
+        """
+        Wait for rate-limit tokens on behalf of the current request.
+
+        Raises:
+            OperationCancelled: If the request is cancelled while waiting
+            DeadlineExceeded: If the tokens would arrive after the request's deadline
+        """
+        request = current_request()
+        if request is None:
+            bucket.acquire(amount)
+            return
+        while True:
+            request.check()
+            wait = bucket.try_acquire(amount)
+            if wait == 0.0:
+                return
+            remaining = request.remaining()
+            if remaining is not None and wait >= remaining:
+                raise DeadlineExceeded(f"Request {request.trace_id}: {self.engine} rate limit "
+                                       f"frees up in {wait:.1f}s, after the deadline")
+            request.cancellation.wait(wait)
+
+    def call(self, fn: Callable[[], Any], tokens: int = 0) -> Any:
+        """
+        Run ``fn`` under this engine's limits.
+
+        Args:
+            fn: Zero-argument function making one provider call
+            tokens: Estimated tokens for the tokens-per-minute bucket
+
+        Returns:
+            Whatever ``fn`` returns
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+            LLMError: The classified provider error once retries are exhausted
+        """
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self._count("rejected_open")
+                raise CircuitOpenError(self.engine, "circuit breaker is open", self.breaker.retry_after())
+            try:
+                self._throttle(tokens)
+                self._count("requests")
+                result = fn()
+            except OperationCancelled:
+                # The request gave up; says nothing about the engine's health,
+                # but a cancelled half-open probe must let the next one through
+                self.breaker.release_probe()
+                raise
+            except Exception as exc:
+                error = classify_error(self.engine, exc)
+                if isinstance(error, RateLimitError):
+                    self._count("rate_limited")
+                if error.retryable:
+                    self.breaker.record_failure()
+                else:
+                    # The provider answered; it is healthy even if the request was bad
+                    self.breaker.record_success()
+                if not error.retryable or attempt >= self.settings.max_retries:
+                    self._count("failures")
+                    if error is exc:
+                        raise
+                    raise error from exc
+                delay = self.backoff_delay(attempt, error.retry_after)
+                logger.warning(f"{error}; retrying in {delay:.1f}s (attempt {attempt + 1}/{self.settings.max_retries})")
+                self._count("retries")
+                attempt += 1
+                self._backoff(delay, error)
+                continue
+            self.breaker.record_success()
+            self._count("successes")
+            return result
+
+    def metrics(self) -> Dict[str, Any]:
+        """Counters plus current limiter and breaker state."""
+        with self._lock:
+            data: Dict[str, Any] = dict(self._counters)
+        data["throttle_wait_s"] = round(data["throttle_wait_s"], 3)
+        data["circuit"] = self.breaker.state
+        data["consecutive_failures"] = self.breaker.consecutive_failures
+        data["times_opened"] = self.breaker.times_opened
+        if self.request_bucket is not None:
+            data["request_tokens_available"] = round(self.request_bucket.available, 2)
+        if self.token_bucket is not None:
+            data["token_budget_available"] = int(self.token_bucket.available)
+        return data
+
+
+_guards: Dict[str, EngineGuard] = {}
+_guards_settings: Optional[ResilienceSettings] = None
+_guards_lock = threading.Lock()
+
+
+def get_guard(engine: str) -> EngineGuard:
+    """Return the shared guard for an engine, rebuilding all guards when the settings changed."""
+    global _guards_settings
+    settings = config.snapshot.resilience
+    with _guards_lock:
+        if settings != _guards_settings:
+            _guards.clear()
+            _guards_settings = settings
+        guard = _guards.get(engine)
+        if guard is None:
+            guard = _guards[engine] = EngineGuard(engine, settings, settings.engines.get(engine))
+        return guard
+
+
+def is_healthy(engine: str) -> bool:
+    """True unless the engine's circuit breaker is currently open."""
+    with _guards_lock:
+        guard = _guards.get(engine)
+    return guard is None or guard.breaker.state != CircuitBreaker.OPEN
+
+
+def reset_guards() -> None:
+    """Drop all guards (limiter, breaker and metrics state)."""
+    global _guards_settings
+    with _guards_lock:
+        _guards.clear()
+        _guards_settings = None
+
+
+def get_metrics() -> Dict[str, Dict[str, Any]]:
+    """Metrics for every engine that has been called."""
+    with _guards_lock:
+        guards = list(_guards.values())
+    return {guard.engine: guard.metrics() for guard in guards}
+
+
+def format_metrics() -> str:
+    """Format engine metrics for display."""
+    metrics = get_metrics()
+    if not metrics:
+        return "No LLM calls recorded yet."
+    lines = []
+    for engine, data in sorted(metrics.items()):
+        lines.append(
+            f"  {engine}: circuit={data['circuit']} requests={data['requests']} ok={data['successes']} "
+            f"failed={data['failures']} retries={data['retries']} rate_limited={data['rate_limited']} "
+            f"rejected={data['rejected_open']} throttled={data['throttle_wait_s']}s"
+        )
+    return "\n".join(lines)
@@ -1,26 +1,79 @@
-import docker
-from docker.types import Mount
 import os
+import threading
+
+from airis.cancellation import run_cancellable
+from airis.config import config
+from airis.request_context import current_request
+
+_docker_client = None
+_docker_client_lock = threading.Lock()
+
+
+def get_docker_client():
+    """
+    Return the process-wide Docker client, creating it on first use.
+
+    All Sandbox instances share one client (and its connection pool), which
+    matters for long-running processes such as the Airis daemon.
+    """
+    global _docker_client
+    if _docker_client is None:
+        with _docker_client_lock:
+            if _docker_client is None:
+                # Imported lazily: the docker SDK pulls in requests/urllib3
+                import docker
+                _docker_client = docker.from_env()
+    return _docker_client
+
 
 class Sandbox:
     def __init__(self, image="python:3.11-slim"):
-        self.docker_client = docker.from_env()
+        self.docker_client = get_docker_client()
         self.image = image
         self.host_project_dir = os.environ.get("HOST_PROJECT_DIR")
         if not self.host_project_dir:
             raise ValueError("HOST_PROJECT_DIR environment variable is not set. This is required for sandbox to function correctly.")
 
-    def run_command(self, command: str, working_dir: str) -> tuple[str, str, int]:
+    def prewarm(self) -> None:
+        """
+        Make sure the sandbox image is available locally, pulling it if needed.
+
+        Lets a run that is expected soon (e.g. a speculative draft) start
+        without waiting for the image download.
+        """
+        from docker.errors import ImageNotFound
+
+        try:
+            self.docker_client.images.get(self.image)
+        except ImageNotFound:
+            self.docker_client.images.pull(self.image)
+
+    def run_command(self, command: str, working_dir: str, request_context=None) -> tuple[str, str, int]:
         """
         Runs a command in a new Docker container and returns the output.
 
+        The run is limited to the request's remaining time (capped at
+        timeouts.sandbox); when the request is cancelled or runs out of
+        time the container is killed.
+
         Args:
             command: The command to execute.
             working_dir: The absolute path on the host to mount as the working directory.
+            request_context: Request to run for (defaults to the current request).
 
         Returns:
             A tuple containing (stdout, stderr, exit_code).
+
+        Raises:
+            OperationCancelled: If the request was cancelled (DeadlineExceeded
+                when it ran out of time)
         """
+        from docker.types import Mount
+
+        request = request_context or current_request()
+        cap = config.snapshot.timeouts.sandbox
+        if request is not None:
+            request.check()
         container = None
         try:
             # The source for the mount must be a path on the host machine
@@ -36,7 +89,13 @@ class Sandbox:
                 detach=True,
             )
             container.start()
-            result = container.wait()
+            result = run_cancellable(
+                container.wait,
+                request.cancellation if request is not None else None,
+                request.budget(cap) if request is not None else cap,
+                on_cancel=container.kill,
+                name="sandbox run",
+            )
             
             stdout = container.logs(stdout=True, stderr=False).decode('utf-8').strip()
             stderr = container.logs(stdout=False, stderr=True).decode('utf-8').strip()
@@ -0,0 +1,240 @@
+"""
+Interactive Session Manager
+
+Holds the interactive sessions of a server. Only the most recently used
+sessions are kept in memory ("hot"); the others are spilled to disk and
+reduced to a compact ``SessionHandle``: a few identifiers and the byte
+offsets of the session's turns in its journal (see airis.session_store).
+A spilled session is rebuilt from its journal on its next message, without
+calling the LLM. Sessions idle for longer than the TTL are dropped from
+memory entirely; their journals stay on disk and can still be resumed.
+
+All sessions share one LLM client, so a session costs no provider client
+or connection pool of its own.
+"""
+
+import logging
+import sys
+import threading
+import time
+import uuid
+from array import array
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from airis.request_context import RequestContext
+from airis.session_store import SessionJournal
+
+logger = logging.getLogger(__name__)
+
+
+class SessionHandle:
+    """Compact per-session state; the conversation itself lives in the journal."""
+
+    __slots__ = ("id", "client_id", "project", "engine_overrides", "journal_path", "turn_offsets",
+                 "last_used", "lock")
+
+    def __init__(self, client_id: str, context: RequestContext):
+        self.id = uuid.uuid4().hex[:12]
+        self.client_id = client_id
+        self.project = context.project
+        self.engine_overrides = dict(context.engine_overrides) or None
+        self.journal_path: Optional[str] = None  # Set when the session is spilled
+        self.turn_offsets = array("q")
+        self.last_used = time.time()
+        # Held while a message is processed; spilling skips locked sessions
+        self.lock = threading.Lock()
+
+    def size(self) -> int:
+        """Approximate bytes held by this handle."""
+        size = sys.getsizeof(self) + sys.getsizeof(self.lock) + sys.getsizeof(self.turn_offsets)
+        for value in (self.id, self.client_id, self.project, self.journal_path, self.engine_overrides):
+            if value is not None:
+                size += sys.getsizeof(value)
+        if self.engine_overrides:
+            size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in self.engine_overrides.items())
+        return size
+
+
+class SessionManager:
+    """Interactive sessions with an in-memory LRU of hot sessions."""
+
+    def __init__(self, interactive_factory: Callable[[], Any], max_hot: int = 256, idle_ttl: float = 3600.0):
+        """
+        Initialize the manager.
+
+        Args:
+            interactive_factory: Creates an InteractiveOrchestrator for a session
+            max_hot: Sessions kept in memory; the least recently used ones
+                beyond this are spilled to disk
+            idle_ttl: Seconds after which an unused session is dropped
+        """
+        self._factory = interactive_factory
+        self.max_hot = max_hot
+        self.idle_ttl = idle_ttl
+        self._handles: Dict[str, SessionHandle] = {}
+        self._hot: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.spilled = 0
+        self.hydrated = 0
+        self.expired = 0
+
+    def create(self, client_id: str, context: RequestContext) -> Tuple[SessionHandle, Any]:
+        """
+        Register a new session.
+
+        Returns:
+            (handle, interactive orchestrator); start the conversation on the
+            orchestrator while holding ``handle.lock``
+        """
+        handle = SessionHandle(client_id, context)
+        interactive = self._factory()
+        with self._lock:
+            self._handles[handle.id] = handle
+            self._hot[handle.id] = interactive
+        return handle, interactive
+
+    def get(self, session_id: str, client_id: str) -> SessionHandle:
+        """
+        Handle of a client's session.
+
+        Raises:
+            KeyError: If the session does not exist (or belongs to another client)
+        """
+        self.expire()
+        with self._lock:
+            handle = self._handles.get(session_id)
+        if handle is None or handle.client_id != client_id:
+            raise KeyError(session_id)
+        handle.last_used = time.time()
+        return handle
+
+    def checkout(self, handle: SessionHandle) -> Any:
+        """
+        The session's interactive orchestrator, rebuilt from its journal if it was spilled.
+
+        Call while holding ``handle.lock``.
+
+        Raises:
+            KeyError: If the spilled session's journal is gone
+        """
+        with self._lock:
+            interactive = self._hot.get(handle.id)
+            if interactive is not None:
+                self._hot.move_to_end(handle.id)
+                return interactive
+        interactive = self._hydrate(handle)
+        with self._lock:
+            self._hot[handle.id] = interactive
+            handle.journal_path = None
+            handle.turn_offsets = array("q")
+            self.hydrated += 1
+        return interactive
+
+    def active(self, handle: SessionHandle) -> bool:
+        """Whether the session's conversation is still going (spilled sessions always are)."""
+        with self._lock:
+            interactive = self._hot.get(handle.id)
+        return interactive is None or interactive.has_active_session()
+
+    def release(self, handle: SessionHandle) -> None:
+        """Done with a session for now: spill the least recently used sessions over the limit."""
+        self._spill_over_limit()
+
+    def close(self, session_id: str) -> None:
+        with self._lock:
+            self._handles.pop(session_id, None)
+            interactive = self._hot.pop(session_id, None)
+        if interactive is not None:
+            interactive.close()
+
+    def history(self, handle: SessionHandle) -> List[Dict[str, str]]:
+        """The session's turns (user message and reply), read from memory or the journal."""
+        with self._lock:
+            interactive = self._hot.get(handle.id)
+        if interactive is None:
+            journal = SessionJournal(handle.journal_path)
+            turns = [journal.read_at(offset) for offset in handle.turn_offsets]
+            return [{"user": turn["user"], "reply": turn["reply"]} for turn in turns]
+        history = interactive.current_session.conversation_history if interactive.current_session else []
+        return [{"user": user["content"], "reply": reply["content"]}
+                for user, reply in zip(history[::2], history[1::2])]
+
+    def expire(self) -> None:
+        """Drop sessions that have been idle for longer than the TTL."""
+        cutoff = time.time() - self.idle_ttl
+        dropped = []
+        with self._lock:
+            stale = [h.id for h in self._handles.values() if h.last_used < cutoff and not h.lock.locked()]
+            for session_id in stale:
+                del self._handles[session_id]
+                interactive = self._hot.pop(session_id, None)
+                if interactive is not None:
+                    dropped.append(interactive)
+            self.expired += len(stale)
+        for interactive in dropped:
+            interactive.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Session counts and the memory held by spilled sessions."""
+        with self._lock:
+            cold = [h for h in self._handles.values() if h.id not in self._hot]
+            hot = len(self._hot)
+        cold_bytes = sum(h.size() for h in cold)
+        return {
+            "sessions": hot + len(cold),
+            "hot": hot,
+            "cold": len(cold),
+            "max_hot": self.max_hot,
+            "spilled": self.spilled,
+            "hydrated": self.hydrated,
+            "expired": self.expired,
+            "cold_bytes": cold_bytes,
+            "bytes_per_cold_session": cold_bytes // len(cold) if cold else 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def _spill_over_limit(self) -> None:
+        """Spill least recently used sessions until at most ``max_hot`` are in memory."""
+        with self._lock:
+            over = len(self._hot) - self.max_hot
+            if over <= 0:
+                return
+            for session_id in list(self._hot):
+                if over <= 0:
+                    break
+                handle = self._handles.get(session_id)
+                if handle is None or not handle.lock.acquire(blocking=False):
+                    continue  # Busy; spilled on a later release
+                try:
+                    if self._spill(handle, self._hot[session_id]):
+                        over -= 1
+                finally:
+                    handle.lock.release()
+
+    def _spill(self, handle: SessionHandle, interactive: Any) -> bool:
+        """Reduce a hot session to its handle (False if it has no journal to come back from)."""
+        session = interactive.current_session
+        journal = getattr(session, "journal", None)
+        if not isinstance(journal, SessionJournal):
+            return False
+        handle.journal_path = journal.path
+        handle.turn_offsets = array("q", session.turn_offsets)
+        del self._hot[handle.id]
+        self.spilled += 1
+        return True
+
+    def _hydrate(self, handle: SessionHandle) -> Any:
+        if handle.journal_path is None:
+            raise KeyError(handle.id)
+        context = RequestContext.from_config(
+            project=handle.project, engine_overrides=dict(handle.engine_overrides or {}), trace_id=handle.id
+        )
+        # Sessions outlive a single request; only the per-call timeout applies
+        context.deadline = None
+        interactive = self._factory()
+        journal = SessionJournal(handle.journal_path)
+        interactive.resume_session(journal.session_id, context)
+        return interactive
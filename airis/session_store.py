@@ -0,0 +1,212 @@
+"""
+Interactive Session Store
+
+Interactive requirement-gathering sessions are journaled as they happen, so
+a crash or an exit does not lose the conversation. Each session is an
+append-only JSON Lines file under the project's ``.airis_memory/sessions``
+directory (``.airis/sessions`` without a project). Every turn appends one
+record (O(1) per turn, nothing is rewritten), and resuming replays the
+records into a session without calling the LLM again.
+
+Record types (``"type"``):
+
+- ``start``: initial request and system prompt
+- ``turn``: the user's message (as shown and as sent) and the reply
+- ``fold``: older turns folded into the rolling summary and facts
+- ``spec``: the confirmed specification
+- ``draft``: a speculative implementation of the spec
+- ``closed``: the session was executed or cancelled
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SESSIONS_DIR = "sessions"
+# Sessions outside any project
+DEFAULT_SESSIONS_DIR = os.path.join(".airis", SESSIONS_DIR)
+
+STATUS_OPEN = "対話中"
+STATUS_SPECIFIED = "要件確定"
+
+
+@dataclass(slots=True)
+class SessionInfo:
+    """Summary of a stored session for ``session list``."""
+    id: str
+    title: str
+    created_at: float
+    updated_at: float
+    turns: int
+    status: str
+
+
+class SessionJournal:
+    """Append-only record file of one session."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.session_id = os.path.splitext(os.path.basename(path))[0]
+        self._lock = threading.Lock()
+
+    def append(self, kind: str, **data: Any) -> Optional[int]:
+        """
+        Append one record (flushed immediately; failures are logged, not raised).
+
+        Returns:
+            The record's byte offset in the journal (None if it could not be written)
+        """
+        line = json.dumps({"type": kind, "at": time.time(), **data}, ensure_ascii=False) + "\n"
+        try:
+            with self._lock, open(self.path, "ab") as f:
+                offset = f.tell()
+                f.write(line.encode("utf-8"))
+            return offset
+        except OSError as e:
+            logger.warning(f"Could not save session {self.session_id}: {e}")
+            return None
+
+    def scan(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """(byte offset, record) in order (a line cut off by a crash is skipped)."""
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                try:
+                    yield offset, json.loads(line)
+                except ValueError:
+                    logger.warning(f"Skipping a damaged record in session {self.session_id}")
+                offset += len(line)
+
+    def records(self) -> Iterator[Dict[str, Any]]:
+        """The session's records in order."""
+        return (record for _, record in self.scan())
+
+    def read_at(self, offset: int) -> Dict[str, Any]:
+        """The record at a byte offset returned by ``append`` or ``scan``."""
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+
+
+class SessionStore:
+    """The stored sessions of one project."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    @classmethod
+    def for_context(cls, context) -> "SessionStore":
+        """Store of the request context's project (or the default store without one)."""
+        if context.memory is not None:
+            return cls(os.path.join(context.memory.memory_path, SESSIONS_DIR))
+        return cls(DEFAULT_SESSIONS_DIR)
+
+    def create(self) -> SessionJournal:
+        """Start the journal of a new session."""
+        os.makedirs(self.directory, exist_ok=True)
+        return SessionJournal(os.path.join(self.directory, f"{uuid.uuid4().hex[:8]}.jsonl"))
+
+    def open(self, session_id: str) -> SessionJournal:
+        """
+        Journal of a stored session (a unique id prefix is enough).
+
+        Raises:
+            KeyError: If no session or more than one matches
+        """
+        matches = [name for name in self._files() if name.startswith(session_id)]
+        if len(matches) != 1:
+            problem = "見つかりません" if not matches else "が複数のセッションに一致します"
+            raise KeyError(f"セッション '{session_id}' {problem}")
+        return SessionJournal(os.path.join(self.directory, matches[0]))
+
+    def list(self, include_closed: bool = False) -> List[SessionInfo]:
+        """Stored sessions, most recently updated first."""
+        sessions = []
+        for name in self._files():
+            journal = SessionJournal(os.path.join(self.directory, name))
+            info = self._info(journal)
+            if info is not None and (include_closed or info.status in (STATUS_OPEN, STATUS_SPECIFIED)):
+                sessions.append(info)
+        return sorted(sessions, key=lambda info: info.updated_at, reverse=True)
+
+    def format(self) -> str:
+        """Session table for ``session list``."""
+        sessions = self.list()
+        if not sessions:
+            return "再開できるセッションはありません"
+        lines = []
+        for info in sessions:
+            updated = time.strftime("%Y-%m-%d %H:%M", time.localtime(info.updated_at))
+            title = info.title if len(info.title) <= 40 else info.title[:37] + "..."
+            lines.append(f"{info.id}  {updated}  {info.status:<4}  {info.turns:>2}ターン  {title}")
+        return "\n".join(lines)
+
+    def _files(self) -> List[str]:
+        try:
+            return sorted(name for name in os.listdir(self.directory) if name.endswith(".jsonl"))
+        except FileNotFoundError:
+            return []
+
+    @staticmethod
+    def _info(journal: SessionJournal) -> Optional[SessionInfo]:
+        title, created, updated, turns, status = "", 0.0, 0.0, 0, STATUS_OPEN
+        try:
+            for record in journal.records():
+                kind = record.get("type")
+                updated = record.get("at", updated)
+                if kind == "start":
+                    title, created = record.get("initial_prompt", ""), record.get("at", 0.0)
+                elif kind == "turn":
+                    turns += 1
+                elif kind == "spec":
+                    status = STATUS_SPECIFIED
+                elif kind == "closed":
+                    status = record.get("reason", "closed")
+        except OSError:
+            return None
+        return SessionInfo(journal.session_id, title, created, updated, turns, status)
+
+
+def replay(journal: SessionJournal) -> Tuple[Dict[str, Any], List[Tuple[int, Dict[str, Any]]]]:
+    """
+    Rebuild a session's state from its records.
+
+    Returns:
+        (state, turns): ``state`` has initial_prompt, system, messages
+        (the chat as sent), summary, facts, folded_turns, spec, draft and
+        closed; ``turns`` are the (offset, record) pairs of the turns
+    """
+    state: Dict[str, Any] = {
+        "initial_prompt": "", "system": "", "messages": [], "summary": "", "facts": [],
+        "folded_turns": 0, "spec": None, "draft": None, "closed": None,
+    }
+    turns: List[Tuple[int, Dict[str, Any]]] = []
+    for offset, record in journal.scan():
+        kind = record.get("type")
+        if kind == "start":
+            state["initial_prompt"], state["system"] = record["initial_prompt"], record["system"]
+        elif kind == "turn":
+            turns.append((offset, record))
+            state["messages"] += [
+                {"role": "user", "content": record["sent"]},
+                {"role": "assistant", "content": record["reply"]},
+            ]
+        elif kind == "fold":
+            # Folds always remove the oldest turns after the first exchange
+            del state["messages"][2:2 + 2 * record["turns"]]
+            state["summary"], state["facts"] = record["summary"], record["facts"]
+            state["folded_turns"] += record["turns"]
+        elif kind == "spec":
+            state["spec"] = record["spec"]
+        elif kind == "draft":
+            state["draft"] = record["draft"]
+        elif kind == "closed":
+            state["closed"] = record.get("reason")
+    return state, turns
@@ -0,0 +1,180 @@
+"""
+Spec Slot Filling
+
+The final spec of an interactive session has a fixed set of fields
+(機能, 入力方法, 出力形式, エラーハンドリング). ``SpecSlots`` tracks locally
+which of them the user has already answered, so a user who answers
+everything in one message gets the final spec from one targeted call instead
+of another open-ended clarification turn.
+
+Slots are filled by keyword rules, without calling the LLM:
+
+- the clarification questions are mapped to slots by their cue words
+  ("入力方法はどうしますか？" asks for 入力方法)
+- numbered answers ("2. キーボード", "2: B") fill the slot of that question;
+  a bare option letter resolves to the option's text
+- other answers are split into clauses; a clause naming a slot's cue fills
+  that slot, and when there is one clause per question the cue-less ones
+  answer the questions in order
+
+Which fields are needed depends on the task (``SCHEMAS``): documents need
+no input method or error handling.
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class Slot:
+    """One field of the final spec."""
+    name: str
+    cues: Tuple[str, ...]  # Words that point a question or an answer at this slot
+
+
+FEATURE = Slot("機能", ("機能",))
+INPUT = Slot("入力方法", ("入力", "キーボード", "マウス", "クリック", "タッチ", "操作", "引数",
+                         "コマンドライン", "標準入力", "読み込", "input"))
+OUTPUT = Slot("出力形式", ("出力", "表示", "画面", "ターミナル", "コンソール", "GUI", "ウィンドウ",
+                          "保存", "形式", "フォーマット", "output"))
+ERRORS = Slot("エラーハンドリング", ("エラー", "例外", "不正", "異常", "失敗", "バリデーション", "error"))
+
+SCHEMAS: Dict[str, Tuple[Slot, ...]] = {
+    "code": (FEATURE, INPUT, OUTPUT, ERRORS),
+    "document": (FEATURE, OUTPUT),
+}
+DOCUMENT_KEYWORDS = ("ドキュメント", "文書", "資料", "レポート", "要件定義書", "仕様書", "document", "report")
+
+# Fields of the final spec format (see FOLLOW_UP_INSTRUCTIONS)
+SPEC_FIELDS = ("機能", "入力方法", "出力形式", "エラーハンドリング", "その他")
+
+_NUMBERED = re.compile(r"^\s*(\d+)\s*[.)．:：、](?!\d)\s*(.*)$")
+_OPTION = re.compile(r"(?:^|\s+)([A-EＡ-Ｅ])[)）]\s*")
+_CLAUSE_SPLIT = re.compile(r"[、。,;；\n]+")
+_FIELD = re.compile(r"^\s*[-・]?\s*(" + "|".join(SPEC_FIELDS) + r")\s*[:：]\s*(.+)$")
+
+
+def schema_for(request: str) -> str:
+    """Spec schema of a request ("document" or "code")."""
+    request = request.lower()
+    return "document" if any(keyword in request for keyword in DOCUMENT_KEYWORDS) else "code"
+
+
+def parse_spec_fields(text: str) -> Dict[str, str]:
+    """The "- 機能: ..." fields of a final spec."""
+    fields = {}
+    for line in text.splitlines():
+        match = _FIELD.match(line)
+        if match:
+            fields.setdefault(match.group(1), match.group(2).strip())
+    return fields
+
+
+class SpecSlots:
+    """Which fields of the final spec the conversation has filled so far."""
+
+    def __init__(self, schema: str = "code"):
+        self.schema = schema
+        self.slots = SCHEMAS[schema]
+        self.values: Dict[str, str] = {}
+        # Open clarification questions: number -> (slot name or None, options)
+        self.questions: Dict[int, Tuple[Optional[str], Dict[str, str]]] = {}
+
+    @classmethod
+    def for_request(cls, request: str) -> "SpecSlots":
+        """Slots of a new session; the request itself says what to build."""
+        slots = cls(schema_for(request))
+        slots.values[FEATURE.name] = request.strip()
+        return slots
+
+    @property
+    def missing(self) -> List[str]:
+        return [slot.name for slot in self.slots if not self.values.get(slot.name)]
+
+    @property
+    def complete(self) -> bool:
+        return not self.missing
+
+    def observe_questions(self, reply: str) -> None:
+        """Take the numbered clarification questions of an assistant reply."""
+        questions: Dict[int, Tuple[Optional[str], Dict[str, str]]] = {}
+        current = None
+        for line in reply.splitlines():
+            match = _NUMBERED.match(line)
+            if match:
+                current = int(match.group(1))
+                questions[current] = (self._slot_of(match.group(2)), {})
+            elif current is not None and "選択肢" in line:
+                parts = _OPTION.split(line.split("選択肢", 1)[1].lstrip(":： "))
+                for letter, option in zip(parts[1::2], parts[2::2]):
+                    questions[current][1][_ascii(letter)] = option.strip()
+        if questions:
+            self.questions = questions
+
+    def observe_answer(self, answer: str) -> None:
+        """Fill slots from the user's answer to the open questions."""
+        numbered = [_NUMBERED.match(line) for line in answer.splitlines()]
+        numbered = [match for match in numbered if match]
+        if numbered:
+            for match in numbered:
+                number = int(match.group(1))
+                if number in self.questions:
+                    self._answer(number, match.group(2))
+                else:
+                    self._fill_by_cue(match.group(2))
+            return
+
+        clauses = [clause.strip() for clause in _CLAUSE_SPLIT.split(answer) if clause.strip()]
+        if len(clauses) == len(self.questions):
+            # One clause per question, in order ("Python、キーボード、ターミナル、無視")
+            for number, clause in zip(sorted(self.questions), clauses):
+                if not self._fill_by_cue(clause):
+                    self._answer(number, clause)
+        else:
+            for clause in clauses:
+                self._fill_by_cue(clause)
+
+    def finalize_prompt(self, answer: str) -> str:
+        """Message asking for the final spec now that every slot is filled."""
+        fields = "\n".join(f"- {slot.name}: {self.values[slot.name]}" for slot in self.slots)
+        return f"""{answer}
+
+---
+上記の回答で、仕様に必要な項目がすべて揃いました：
+{fields}
+
+追加の質問はせずに、これまでの会話を踏まえて【要件確定】の形式で最終仕様をまとめてください。
+未回答の細かい点は妥当な既定値で補い、「その他」に記載してください。"""
+
+    def _answer(self, number: int, text: str) -> None:
+        slot, options = self.questions[number]
+        text = text.strip()
+        letter = _ascii(text.rstrip(")）.")) if len(text.rstrip(")）.")) == 1 else None
+        if letter in options:
+            text = options[letter]
+        if slot is not None and text:
+            self.values[slot] = text
+        elif text:
+            self._fill_by_cue(text)
+
+    def _fill_by_cue(self, clause: str) -> bool:
+        slot = self._slot_of(clause)
+        if slot is None:
+            return False
+        self.values[slot] = clause
+        return True
+
+    def _slot_of(self, text: str) -> Optional[str]:
+        """The slot a question or clause is about."""
+        lowered = text.lower()
+        # Error cues win: "不正な入力は無視" is about error handling, not input
+        for slot in sorted(self.slots, key=lambda slot: slot is not ERRORS):
+            if any(cue.lower() in lowered for cue in slot.cues):
+                return slot.name
+        return None
+
+
+def _ascii(letter: str) -> str:
+    """Full-width option letters ("Ａ") as ASCII."""
+    return chr(ord(letter) - 0xFEE0) if "Ａ" <= letter <= "Ｅ" else letter.upper()
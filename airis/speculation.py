@@ -0,0 +1,194 @@
+"""
+Speculative Drafts
+
+While the user reads a candidate specification in interactive mode and
+decides whether to ``execute`` it, Airis would otherwise sit idle and then
+do everything serially. With ``interactive.speculative_drafts`` enabled the
+implementation is drafted in the background as soon as a candidate spec
+exists, and the code agent's sandbox is warmed up meanwhile.
+
+At ``execute`` time the draft is checked against the final spec:
+
+- same spec: the draft is run as is;
+- slightly changed spec (``interactive.draft_patch_similarity``): the
+  draft is revised in one call instead of being regenerated;
+- anything else: the draft is discarded and the request runs normally.
+
+A newer candidate spec supersedes the running draft (it is cancelled); a
+finished draft for a similar spec is revised rather than regenerated.
+"""
+
+import dataclasses
+import difflib
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from airis.cancellation import CancellationToken, OperationCancelled
+from airis.config import config
+from airis.request_context import RequestContext
+
+logger = logging.getLogger(__name__)
+
+_draft_pool = None
+_draft_pool_lock = threading.Lock()
+
+
+def _get_draft_pool() -> ThreadPoolExecutor:
+    """Shared worker threads for speculative drafts, started on first use."""
+    global _draft_pool
+    if _draft_pool is None:
+        with _draft_pool_lock:
+            if _draft_pool is None:
+                _draft_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="airis-draft")
+    return _draft_pool
+
+
+@dataclass(slots=True)
+class Draft:
+    """Code written ahead of time for a spec."""
+    spec: str
+    code: str
+    filename: Optional[str] = None
+
+
+def spec_similarity(a: str, b: str) -> float:
+    """Similarity of two specs (0.0 - 1.0), line based."""
+    return difflib.SequenceMatcher(None, a.splitlines(), b.splitlines()).ratio()
+
+
+class Speculator:
+    """Drafts the implementation of candidate specs in the background."""
+
+    def __init__(self, orchestrator):
+        """
+        Initialize the speculator.
+
+        Args:
+            orchestrator: Orchestrator whose routing and agents are used
+        """
+        self.orchestrator = orchestrator
+        self._job: Optional[Future] = None
+        self._job_context: Optional[RequestContext] = None
+        self._draft: Optional[Draft] = None  # Latest finished draft
+        self._lock = threading.Lock()
+
+    def start(self, spec: str, context: RequestContext,
+              on_draft: Optional[Callable[[Draft], None]] = None) -> bool:
+        """
+        Start drafting ``spec`` in the background (superseding any running draft).
+
+        Args:
+            spec: Candidate spec (the prompt ``execute`` will run)
+            context: The session's request context
+            on_draft: Called with the draft once it is ready (e.g. to store it)
+
+        Returns:
+            True if a draft was started; False when the spec would not run
+            on the code agent
+        """
+        if self.orchestrator.route(spec, context)[2] != "code":
+            return False
+        # The draft runs as its own request so it can be cancelled on its own
+        job_context = dataclasses.replace(context, cancellation=CancellationToken())
+        with self._lock:
+            self._cancel_locked("superseded by a newer spec")
+            base = self._draft
+            self._job_context = job_context
+            self._job = _get_draft_pool().submit(self._write, spec, job_context, base, on_draft)
+        return True
+
+    def take(self, spec: str, context: RequestContext) -> Optional[Draft]:
+        """
+        Draft for ``spec``, waiting for a running draft within the request's budget.
+
+        Args:
+            spec: Final spec about to be executed
+            context: The executing request's context
+
+        Returns:
+            A draft whose code fits ``spec`` (revised if the spec changed
+            slightly), or None to run the request normally
+        """
+        with self._lock:
+            job = self._job
+        if job is not None:
+            try:
+                context.run(job.result, name="speculative draft")
+            except OperationCancelled:
+                raise
+            except Exception as e:
+                logger.info(f"Speculative draft unavailable: {e}")
+        with self._lock:
+            draft = self._draft
+        if draft is None:
+            return None
+        if draft.spec == spec:
+            return draft
+        if spec_similarity(draft.spec, spec) < config.snapshot.interactive.draft_patch_similarity:
+            logger.info("Spec changed too much since the draft; generating from scratch")
+            return None
+        with context.activate():
+            return self._revise(draft, spec)
+
+    def seed(self, draft: Draft) -> None:
+        """Adopt a draft made earlier (e.g. stored with a resumed session)."""
+        with self._lock:
+            self._draft = draft
+
+    def cancel(self) -> None:
+        """Cancel the running draft and forget finished ones."""
+        with self._lock:
+            self._cancel_locked("session ended")
+            self._draft = None
+
+    def _cancel_locked(self, reason: str) -> None:
+        if self._job is not None and not self._job.done():
+            self._job_context.cancellation.cancel(reason)
+        self._job = None
+        self._job_context = None
+
+    def _write(self, spec: str, context: RequestContext, base: Optional[Draft],
+               on_draft: Optional[Callable[[Draft], None]] = None) -> Optional[Draft]:
+        """Background job: warm the sandbox and draft (or revise) the code."""
+        with context.activate():
+            code_agent = self.orchestrator.agents["code"]
+            warm = threading.Thread(target=self._prewarm, args=(code_agent,), name="airis-sandbox-prewarm", daemon=True)
+            warm.start()
+            # The agents that follow the code agent (git, validator)
+            self.orchestrator.agents.prewarm_likely_next("code")
+            draft = None
+            if base is not None and spec_similarity(base.spec, spec) >= config.snapshot.interactive.draft_patch_similarity:
+                draft = self._revise(base, spec)
+            if draft is None:
+                error, code = code_agent.generate(spec)
+                if error:
+                    logger.info(f"Speculative draft failed: {error}")
+                    return None
+                draft = Draft(spec, code, self.orchestrator.suggest_filename(spec, code))
+            context.check()
+        with self._lock:
+            if self._job_context is not context:
+                return draft
+            self._draft = draft
+        if on_draft is not None:
+            on_draft(draft)
+        return draft
+
+    def _revise(self, draft: Draft, spec: str) -> Optional[Draft]:
+        """Revise a draft for a slightly changed spec (None if that fails)."""
+        error, code = self.orchestrator.agents["code"].revise(draft.code, draft.spec, spec)
+        if error:
+            logger.info(f"Revising the speculative draft failed: {error}")
+            return None
+        return Draft(spec, code, draft.filename)
+
+    @staticmethod
+    def _prewarm(code_agent) -> None:
+        try:
+            code_agent.sandbox.prewarm()
+        except Exception as e:
+            # Best effort; the real run will surface the error
+            logger.info(f"Sandbox prewarm failed: {e}")
@@ -0,0 +1,153 @@
+"""
+Startup Profiling for Airis
+
+Measures the cold import cost of the CLI entry point in a fresh interpreter
+using ``python -X importtime`` and formats a breakdown by module and by
+top-level package. Used by ``airis --startup-profile`` and by the import
+budget regression test.
+"""
+
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+# Modules that must only be imported on first use, never at CLI startup
+HEAVY_MODULES = (
+    "google.generativeai",
+    "langchain_anthropic",
+    "docker",
+    "ddgs",
+    "bs4",
+    "lxml",
+    "requests",
+)
+
+# Default cold-import budget for airis.main, in milliseconds
+DEFAULT_IMPORT_BUDGET_MS = 750
+
+
+@dataclass(slots=True)
+class ImportRecord:
+    """One line of ``-X importtime`` output."""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportRecord]:
+    """
+    Parse ``-X importtime`` stderr output.
+
+    Args:
+        output: Raw stderr of an interpreter started with ``-X importtime``
+
+    Returns:
+        List of import records in the order they were reported
+    """
+    records = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3:
+            continue
+        try:
+            self_us = int(fields[0].strip())
+            cumulative_us = int(fields[1].strip())
+        except ValueError:
+            continue
+        raw_name = fields[2]
+        stripped = raw_name.lstrip(" ")
+        # One leading space is the separator; every two more are one nesting level
+        depth = max(0, (len(raw_name) - len(stripped) - 1) // 2)
+        records.append(ImportRecord(stripped.strip(), self_us, cumulative_us, depth))
+    return records
+
+
+def collect_import_times(module: str = "airis.main", cwd: Optional[str] = None) -> List[ImportRecord]:
+    """
+    Import a module in a fresh interpreter and collect per-module import times.
+
+    Args:
+        module: Module to import
+        cwd: Working directory (config.yaml is resolved relative to it)
+
+    Returns:
+        Parsed import records
+    """
+    env = dict(os.environ)
+    env.pop("PYTHONPROFILEIMPORTTIME", None)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=cwd,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def total_import_us(records: List[ImportRecord], module: str = "airis.main") -> int:
+    """Return the cumulative import time of ``module`` in microseconds."""
+    for record in records:
+        if record.module == module:
+            return record.cumulative_us
+    return 0
+
+
+def find_heavy_imports(records: List[ImportRecord]) -> List[str]:
+    """Return the heavy modules (see HEAVY_MODULES) that were imported."""
+    imported = {r.module for r in records}
+    return [m for m in HEAVY_MODULES if m in imported]
+
+
+def format_report(records: List[ImportRecord], module: str = "airis.main", top: int = 20) -> str:
+    """
+    Format an import time breakdown for display.
+
+    Args:
+        records: Parsed import records
+        module: Entry module whose cumulative time is the total
+        top: Number of modules / packages to list
+
+    Returns:
+        Human readable report
+    """
+    total_us = total_import_us(records, module)
+    lines = ["=== Airis Startup Profile ===", f"Cold import of {module}: {total_us / 1000:.1f}ms", ""]
+
+    lines.append(f"Top {top} modules by cumulative time:")
+    lines.append(f"  {'cumulative':>12} {'self':>10}  module")
+    for record in sorted(records, key=lambda r: r.cumulative_us, reverse=True)[:top]:
+        lines.append(
+            f"  {record.cumulative_us / 1000:>10.1f}ms {record.self_us / 1000:>8.1f}ms  "
+            f"{'  ' * record.depth}{record.module}"
+        )
+
+    packages: Dict[str, int] = {}
+    for record in records:
+        package = record.module.split(".")[0]
+        packages[package] = packages.get(package, 0) + record.self_us
+    lines.append("")
+    lines.append(f"Top {top} packages by self time:")
+    for package, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+        lines.append(f"  {self_us / 1000:>10.1f}ms  {package}")
+
+    heavy = find_heavy_imports(records)
+    lines.append("")
+    if heavy:
+        lines.append(f"⚠ Heavy modules imported at startup: {', '.join(heavy)}")
+    else:
+        lines.append("✓ No heavy provider SDKs or parsers imported at startup")
+    return "\n".join(lines)
+
+
+def run_startup_profile(module: str = "airis.main", top: int = 20) -> str:
+    """Collect and format a startup profile for ``module``."""
+    return format_report(collect_import_times(module, cwd=os.getcwd()), module, top)
@@ -0,0 +1,127 @@
+"""
+Token Usage Ledger
+
+Counts LLM calls, input / output tokens and prompt-cache reads per
+project and engine, using the token counts reported by the provider (or a
+local estimate when the response carries none). The ledger is persisted to disk so usage adds up
+across runs, and is shown by ``ai engine info``.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from airis.config import config
+from airis.json_store import JSONStore
+
+# Ledger key for calls made outside a project
+NO_PROJECT = "-"
+
+
+@dataclass(slots=True)
+class UsageEntry:
+    """Accumulated usage for one (project, engine) pair."""
+    calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    estimated_calls: int = 0  # Calls counted with the local estimate
+    cache_read_tokens: int = 0  # Input tokens served from the provider's prompt cache
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls, "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens, "estimated_calls": self.estimated_calls,
+            "cache_read_tokens": self.cache_read_tokens,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "UsageEntry":
+        return cls(
+            calls=int(data.get("calls", 0)),
+            input_tokens=int(data.get("input_tokens", 0)),
+            output_tokens=int(data.get("output_tokens", 0)),
+            estimated_calls=int(data.get("estimated_calls", 0)),
+            cache_read_tokens=int(data.get("cache_read_tokens", 0)),
+        )
+
+
+def _count(value: Any) -> Optional[int]:
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+def provider_usage(raw: Any) -> Optional[Tuple[int, int, int]]:
+    """
+    Token counts reported by a provider response.
+
+    Understands Gemini ``GenerateContentResponse.usage_metadata`` and
+    LangChain ``AIMessage.usage_metadata`` (Claude). Input tokens include
+    the ones read from the prompt cache.
+
+    Returns:
+        (input_tokens, output_tokens, cache_read_tokens), or None if the
+        response has no usage
+    """
+    usage = getattr(raw, "usage_metadata", None)
+    if isinstance(usage, dict):
+        details = usage.get("input_token_details") or {}
+        counts = (usage.get("input_tokens"), usage.get("output_tokens"), details.get("cache_read", 0))
+    else:
+        counts = (getattr(usage, "prompt_token_count", None), getattr(usage, "candidates_token_count", None),
+                  getattr(usage, "cached_content_token_count", 0))
+    counts = tuple(_count(count) for count in counts)
+    if counts[0] is None or counts[1] is None:
+        return None
+    return counts[0], counts[1], counts[2] or 0
+
+
+class UsageLedger(JSONStore[UsageEntry]):
+    """Thread-safe per-project, per-engine token counts with throttled persistence."""
+
+    entry_type = UsageEntry
+    section = "usage"
+    label = "usage ledger"
+
+    def default_path(self) -> str:
+        return config.snapshot.tokens.ledger_path
+
+    @staticmethod
+    def split_key(key: str) -> Tuple[str, str]:
+        # Project names may contain "|"; engine names never do
+        project, _, engine = key.rpartition("|")
+        return project, engine
+
+    def record(self, project: Optional[str], engine: str, input_tokens: int, output_tokens: int,
+               cache_read_tokens: int = 0, estimated: bool = False) -> None:
+        """Add one call's token counts."""
+        with self._lock:
+            entry = self._entry((project or NO_PROJECT, engine))
+            entry.calls += 1
+            entry.input_tokens += input_tokens
+            entry.output_tokens += output_tokens
+            entry.cache_read_tokens += cache_read_tokens
+            entry.estimated_calls += int(estimated)
+            due = self._changed()
+        if due:
+            self.save()
+
+    def get(self, project: Optional[str], engine: str) -> Optional[UsageEntry]:
+        return self._get((project or NO_PROJECT, engine))
+
+    def format(self) -> str:
+        """Format the ledger for ``ai engine info``."""
+        entries = sorted(self._items())
+        if not entries:
+            return "  No LLM calls recorded yet."
+        lines = []
+        for (project, engine), entry in entries:
+            line = f"  {project}/{engine}: {entry.calls} calls, in={entry.input_tokens:,}"
+            if entry.cache_read_tokens:
+                line += f" (cached={entry.cache_read_tokens:,})"
+            line += f" out={entry.output_tokens:,} tokens"
+            if entry.estimated_calls:
+                line += f" ({entry.estimated_calls} estimated)"
+            lines.append(line)
+        return "\n".join(lines)
+
+
+# Global instance
+usage_ledger = UsageLedger()
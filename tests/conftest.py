@@ -0,0 +1,67 @@
+import atexit
+import sys
+import pytest
+from unittest.mock import MagicMock, patch
+from airis.ai_engine_manager import AIEngineManager
+from airis.config_schema import compile_config
+from airis.engine_stats import EngineStatsTracker
+from airis.resilience import reset_guards
+from airis.usage_ledger import UsageLedger
+
+def isolate_store(monkeypatch, name, fresh):
+    """Point every module that imported the shared store ``name`` at ``fresh``."""
+    for module in list(sys.modules.values()):
+        # By type: a module first imported during a test holds that test's store
+        if isinstance(getattr(module, "__dict__", {}).get(name), type(fresh)):
+            monkeypatch.setattr(module, name, fresh)
+    yield fresh
+    # Stores save themselves at exit; a test's store has nothing worth keeping
+    atexit.unregister(fresh.save)
+
+
+@pytest.fixture(autouse=True)
+def isolated_engine_stats(tmp_path, monkeypatch):
+    # Keep latency samples recorded by tests away from the real stats file
+    fresh = EngineStatsTracker(str(tmp_path / "engine_stats.json"))
+    yield from isolate_store(monkeypatch, "engine_stats", fresh)
+
+
+@pytest.fixture(autouse=True)
+def isolated_usage_ledger(tmp_path, monkeypatch):
+    fresh = UsageLedger(str(tmp_path / "usage.json"))
+    yield from isolate_store(monkeypatch, "usage_ledger", fresh)
+
+
+@pytest.fixture(autouse=True)
+def isolated_session_store(tmp_path, monkeypatch):
+    # Sessions started without a project are journaled under the working directory
+    sessions_dir = tmp_path / "sessions"
+    monkeypatch.setattr("airis.session_store.DEFAULT_SESSIONS_DIR", str(sessions_dir))
+    yield sessions_dir
+
+
+@pytest.fixture
+def fresh_guards():
+    # No retries, so failing over does not wait for backoff
+    fast = MagicMock()
+    fast.snapshot = compile_config({"resilience": {"max_retries": 0}})
+    reset_guards()
+    with patch("airis.resilience.config", fast):
+        yield
+    reset_guards()
+
+
+@pytest.fixture
+def make_manager():
+    """Factory for AIEngineManagers built from ``ai_engines`` settings."""
+    def _make_manager(**engines):
+        settings = {"ai_engines": {"default_engine": "gemini", "allowed_engines": ["gemini", "claude"],
+                                   "failover": {"orchestration": ["gemini", "claude"]}, **engines}}
+        fake_config = MagicMock()
+        fake_config.snapshot = compile_config(settings)
+        fake_config.version = 1
+        with patch("airis.ai_engine_manager.config", fake_config):
+            manager = AIEngineManager()
+        manager.config = fake_config
+        return manager
+    return _make_manager
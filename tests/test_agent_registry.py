@@ -0,0 +1,48 @@
+import pytest
+from unittest.mock import MagicMock
+from airis.agent_registry import AgentRegistry
+
+@pytest.fixture
+def factories():
+    return {"alpha": MagicMock(name="alpha"), "beta": MagicMock(name="beta")}
+
+@pytest.fixture
+def registry(factories):
+    return AgentRegistry(dict(factories), entry_point_group=None)
+
+def test_agents_are_not_constructed_until_requested(registry, factories):
+    factories["alpha"].assert_not_called()
+    assert not registry.is_loaded("alpha")
+    agent = registry["alpha"]
+    assert agent is factories["alpha"].return_value
+    factories["alpha"].assert_called_once_with()
+    factories["beta"].assert_not_called()
+
+def test_agent_is_constructed_only_once(registry, factories):
+    assert registry["alpha"] is registry["alpha"]
+    factories["alpha"].assert_called_once_with()
+
+def test_init_timings_recorded(registry):
+    registry["beta"]
+    assert "beta" in registry.init_timings
+    assert "alpha" not in registry.init_timings
+
+def test_unknown_agent_raises_key_error(registry):
+    with pytest.raises(KeyError):
+        registry["missing"]
+
+def test_string_reference_is_resolved_lazily():
+    registry = AgentRegistry({"od": "collections:OrderedDict"}, entry_point_group=None)
+    assert registry["od"] == {}
+
+def test_prewarm_in_background(registry, factories):
+    thread = registry.prewarm(["alpha", "missing"])
+    thread.join(timeout=5)
+    assert registry.is_loaded("alpha")
+    factories["alpha"].assert_called_once_with()
+
+def test_prewarm_failure_is_not_fatal():
+    failing = MagicMock(side_effect=RuntimeError("no docker"))
+    registry = AgentRegistry({"code": failing}, entry_point_group=None)
+    registry.prewarm(["code"], background=False)
+    assert not registry.is_loaded("code")
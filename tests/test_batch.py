@@ -0,0 +1,91 @@
+import json
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+import pytest
+from airis.batch import BatchRunner, completed_ids, load_items
+from airis.rate_limit import TokenBucket
+
+@pytest.fixture
+def orchestrator():
+    mock = MagicMock()
+    mock._determine_task_type.return_value = "code_generation"
+    def delegate(prompt, context=None):
+        print("log line")
+        time.sleep(0.1)
+        if prompt == "bad":
+            raise RuntimeError("boom")
+        if prompt == "no project":
+            return "Error: No active project selected.", None
+        context.served_engines.append("gemini")
+        return f"done: {prompt}", None
+    mock.delegate_task.side_effect = delegate
+    return mock
+
+def write_input(path, prompts):
+    path.write_text("\n".join(json.dumps({"id": f"p{i}", "prompt": p}) for i, p in enumerate(prompts)), encoding="utf-8")
+
+def test_results_are_written_with_timings(tmp_path, orchestrator):
+    write_input(tmp_path / "in.jsonl", ["a", "bad"])
+    out = tmp_path / "out.jsonl"
+    summary = BatchRunner(orchestrator, concurrency=2, progress=lambda _: None).run(
+        load_items(str(tmp_path / "in.jsonl")), str(out))
+    assert (summary.succeeded, summary.failed) == (1, 1)
+    records = {r["id"]: r for r in map(json.loads, out.read_text(encoding="utf-8").splitlines())}
+    assert records["p0"]["status"] == "ok" and records["p0"]["result"] == "done: a"
+    assert records["p0"]["engines"] == ["gemini"]
+    assert records["p0"]["log"] == "log line\n"
+    assert records["p0"]["duration_s"] >= 0.1
+    assert "boom" in records["p1"]["error"]
+
+def test_resume_skips_completed_ids(tmp_path, orchestrator):
+    write_input(tmp_path / "in.jsonl", ["a", "bad"])
+    out = tmp_path / "out.jsonl"
+    runner = BatchRunner(orchestrator, concurrency=2, progress=lambda _: None)
+    runner.run(load_items(str(tmp_path / "in.jsonl")), str(out))
+    summary = runner.run(load_items(str(tmp_path / "in.jsonl")), str(out))
+    assert summary.skipped == 1 and summary.failed == 1
+    assert completed_ids(str(out)) == {"p0"}
+
+def test_error_results_are_failures(tmp_path, orchestrator):
+    write_input(tmp_path / "in.jsonl", ["a", "no project"])
+    out = tmp_path / "out.jsonl"
+    summary = BatchRunner(orchestrator, concurrency=2, progress=lambda _: None).run(
+        load_items(str(tmp_path / "in.jsonl")), str(out))
+    assert (summary.succeeded, summary.failed) == (1, 1)
+    records = {r["id"]: r for r in map(json.loads, out.read_text(encoding="utf-8").splitlines())}
+    assert records["p1"]["status"] == "error" and records["p1"]["error"].startswith("Error:")
+    assert completed_ids(str(out)) == {"p0"}
+
+def test_concurrency_scales_throughput(tmp_path, orchestrator):
+    write_input(tmp_path / "in.jsonl", [f"task {i}" for i in range(8)])
+    items = load_items(str(tmp_path / "in.jsonl"))
+    start = time.monotonic()
+    BatchRunner(orchestrator, concurrency=8, progress=lambda _: None).run(items, str(tmp_path / "o.jsonl"))
+    # Eight 0.1s prompts in parallel finish well under their serial time
+    assert time.monotonic() - start < 0.6
+
+def test_projects_must_name_an_existing_project(tmp_path):
+    (tmp_path / "projects" / "alpha").mkdir(parents=True)
+    snapshot = SimpleNamespace(projects_root_dir=str(tmp_path / "projects"))
+    with patch("airis.batch.config", SimpleNamespace(snapshot=snapshot)):
+        for project in ["alpha", "../alpha", ".hidden", "beta"]:
+            (tmp_path / "in.jsonl").write_text(json.dumps({"prompt": "p", "project": project}), encoding="utf-8")
+            if project == "alpha":
+                assert load_items(str(tmp_path / "in.jsonl"))[0].project == "alpha"
+                continue
+            with pytest.raises(ValueError, match="project"):
+                load_items(str(tmp_path / "in.jsonl"))
+
+def test_token_bucket_waits_for_refill():
+    now = [0.0]
+    sleeps = []
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+    bucket = TokenBucket(60, capacity=1, clock=lambda: now[0], sleep=sleep)
+    assert bucket.acquire()
+    assert bucket.try_acquire() == pytest.approx(1.0)
+    assert bucket.acquire()
+    assert sleeps == [pytest.approx(1.0)]
+    assert bucket.acquire(timeout=0.5) is False
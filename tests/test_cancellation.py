@@ -0,0 +1,49 @@
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from airis.cancellation import CancellationToken, DeadlineExceeded, OperationCancelled, run_cancellable
+from airis.request_context import RequestContext, current_request
+
+def test_run_cancellable_aborts_on_cancel_and_timeout():
+    token = CancellationToken()
+    aborted = []
+    threading.Timer(0.05, token.cancel, args=("stop",)).start()
+    with pytest.raises(OperationCancelled, match="stop"):
+        run_cancellable(lambda: time.sleep(2), token, on_cancel=lambda: aborted.append("cancel"))
+    with pytest.raises(DeadlineExceeded):
+        run_cancellable(lambda: time.sleep(2), None, 0.05, on_cancel=lambda: aborted.append("timeout"))
+    assert aborted == ["cancel", "timeout"]
+    assert run_cancellable(lambda: 42, CancellationToken(), 1) == 42
+
+def test_request_context_budget_and_activation():
+    context = RequestContext(deadline=time.monotonic() + 10)
+    assert context.budget(2) == 2
+    assert 9 < context.budget() <= 10
+    assert current_request() is None
+    with pytest.raises(KeyboardInterrupt):
+        with context.activate():
+            assert current_request() is context
+            raise KeyboardInterrupt
+    assert current_request() is None
+    assert context.cancellation.reason == "interrupted"
+    with pytest.raises(OperationCancelled):
+        context.check()
+
+def test_sandbox_kills_container_on_cancel():
+    from airis.sandbox import Sandbox
+    killed = threading.Event()
+    container = MagicMock()
+    container.wait.side_effect = lambda: killed.wait(5) and {"StatusCode": 137}
+    container.kill.side_effect = killed.set
+    docker = MagicMock()
+    docker.containers.create.return_value = container
+    with patch("airis.sandbox.get_docker_client", return_value=docker), \
+         patch.dict("os.environ", {"HOST_PROJECT_DIR": "/tmp"}), \
+         patch.dict("sys.modules", {"docker": MagicMock(), "docker.types": MagicMock()}):
+        context = RequestContext()
+        threading.Timer(0.05, context.cancellation.cancel).start()
+        with pytest.raises(OperationCancelled):
+            Sandbox().run_command("sleep 100", "/app", context)
+    container.kill.assert_called()
+    container.remove.assert_called_once_with(force=True)
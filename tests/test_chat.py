@@ -0,0 +1,61 @@
+import json
+from unittest.mock import MagicMock
+
+from airis.chat import ChatSession
+
+
+def fake_client(summary_reply=None):
+    """LLM client answering chat turns with "ok N" and summaries with ``summary_reply``."""
+    client = MagicMock()
+    turns = []
+
+    def invoke(prompt, profile=None, prefix=None, history=()):
+        if profile == "conversation_summary":
+            if summary_reply is None:
+                raise RuntimeError("summary model down")
+            return MagicMock(content=summary_reply)
+        turns.append(history)
+        return MagicMock(content=f"ok {len(turns)}", input_tokens=None, cache_read_tokens=0)
+
+    client.invoke.side_effect = invoke
+    client.turns = turns
+    return client
+
+
+def test_older_turns_are_folded_into_summary_and_facts():
+    reply = "```json\n" + json.dumps({"summary": "テトリスを作る", "facts": ["言語はPython"]}) + "\n```"
+    client = fake_client(reply)
+    chat = ChatSession(client, "interactive_mode", system="sys", keep_turns=2, background_summary=False)
+    for i in range(6):
+        chat.send(f"回答{i}")
+
+    assert chat.facts == ["言語はPython"]
+    assert chat.folded_turns == 2
+    history = client.turns[-1]
+    # First exchange, memory exchange, then the last two turns verbatim
+    assert history[0]["content"] == "回答0"
+    assert "テトリスを作る" in history[2]["content"] and "言語はPython" in history[2]["content"]
+    assert [m["content"] for m in history[4::2]] == ["回答3", "回答4"]
+
+
+def test_failed_summary_keeps_turns_verbatim():
+    client = fake_client(summary_reply=None)
+    chat = ChatSession(client, "interactive_mode", keep_turns=1, background_summary=False)
+    for i in range(4):
+        chat.send(f"回答{i}")
+
+    assert chat.summary == "" and chat.folded_turns == 0
+    assert [m["content"] for m in client.turns[-1][::2]] == ["回答0", "回答1", "回答2"]
+
+
+def test_background_summary_is_applied_on_the_next_turn():
+    client = fake_client(json.dumps({"summary": "要約", "facts": []}))
+    chat = ChatSession(client, "interactive_mode", keep_turns=1)
+    for i in range(3):
+        chat.send(f"回答{i}")
+    chat._pending[0].result(timeout=5)
+    assert chat.summary == ""  # Not applied until the next turn
+
+    chat.send("回答3")
+    assert chat.summary == "要約" and chat.folded_turns == 1
+    assert [m["content"] for m in client.turns[-1][::2]] == ["回答0", chat.memory_text(), "回答2"]
@@ -0,0 +1,142 @@
+import os
+import stat
+import pytest
+import yaml
+from airis.config import Config
+from airis.config_schema import ConfigError, compile_config
+
+SAMPLE_SETTINGS = {
+    "ai_engines": {
+        "default_engine": "gemini",
+        "task_routing": {"orchestration": "gemini", "code_generation": "cursor"},
+        "allowed_engines": ["gemini", "cursor", "local"],
+        "compliance_mode": False,
+    },
+    "gemini": {"model_name": "gemini-2.5-pro", "max_tokens": 4000, "temperature": 0.1},
+    "current_project": None,
+    "projects_root_dir": "projects",
+}
+
+@pytest.fixture
+def config_file(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(SAMPLE_SETTINGS), encoding="utf-8")
+    return path
+
+@pytest.fixture
+def fresh_config(config_file):
+    # Bypass the singleton so each test works on its own file
+    cfg = object.__new__(Config)
+    cfg.__init__(str(config_file))
+    return cfg
+
+def test_compile_config_exposes_typed_attributes():
+    snapshot = compile_config(SAMPLE_SETTINGS)
+    assert snapshot.ai_engines.default_engine == "gemini"
+    assert snapshot.ai_engines.task_routing["code_generation"] == "cursor"
+    assert snapshot.ai_engines.allowed_engines == ("gemini", "cursor", "local")
+    assert snapshot.gemini.max_tokens == 4000
+    assert snapshot.current_project is None
+    assert snapshot.projects_root_dir == "projects"
+
+def test_compile_config_rejects_unknown_engine():
+    bad = {"ai_engines": {"default_engine": "gpt"}}
+    with pytest.raises(ConfigError, match="ai_engines.default_engine"):
+        compile_config(bad)
+
+def test_compile_config_rejects_wrong_type():
+    bad = {"gemini": {"max_tokens": "lots"}}
+    with pytest.raises(ConfigError, match="gemini.max_tokens"):
+        compile_config(bad)
+
+def test_snapshot_slots_have_no_instance_dict():
+    snapshot = compile_config(SAMPLE_SETTINGS)
+    assert not hasattr(snapshot, "__dict__")
+    assert not hasattr(snapshot.ai_engines, "__dict__")
+
+def test_get_compatibility_layer(fresh_config):
+    assert fresh_config.get("ai_engines.default_engine") == "gemini"
+    assert fresh_config.get("ai_engines.task_routing.orchestration") == "gemini"
+    assert fresh_config.get("ai_engines.task_routing.missing", "claude") == "claude"
+    assert fresh_config.get("current_project") is None
+    assert fresh_config.get("nope.deeper", 1) == 1
+
+def test_set_recompiles_snapshot(fresh_config):
+    fresh_config.set("current_project", "demo")
+    assert fresh_config.snapshot.current_project == "demo"
+    assert fresh_config.get("current_project") == "demo"
+
+def test_set_rejects_invalid_value_and_keeps_old_state(fresh_config):
+    with pytest.raises(ConfigError):
+        fresh_config.set("ai_engines.default_engine", "unknown")
+    assert fresh_config.snapshot.ai_engines.default_engine == "gemini"
+    assert fresh_config.get("ai_engines.default_engine") == "gemini"
+
+def test_reload_if_changed(fresh_config, config_file):
+    assert fresh_config.reload_if_changed() is False
+    changed = dict(SAMPLE_SETTINGS, projects_root_dir="elsewhere/projects")
+    config_file.write_text(yaml.safe_dump(changed), encoding="utf-8")
+    assert fresh_config.reload_if_changed() is True
+    assert fresh_config.snapshot.projects_root_dir == "elsewhere/projects"
+
+def test_bad_file_fails_fast(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump({"enable_output_validation": "yes"}), encoding="utf-8")
+    cfg = object.__new__(Config)
+    with pytest.raises(ConfigError, match="enable_output_validation"):
+        cfg.__init__(str(path))
+
+def test_batch_writes_once(fresh_config, monkeypatch):
+    writes = []
+    original = fresh_config._save_config
+    monkeypatch.setattr(fresh_config, "_save_config", lambda: (writes.append(1), original()))
+    version = fresh_config.version
+    with fresh_config.batch():
+        fresh_config.set("ai_engines.compliance_mode", True)
+        fresh_config.set("ai_engines.allowed_engines", ["gemini"])
+    assert len(writes) == 1
+    assert fresh_config.version == version + 1
+    on_disk = yaml.safe_load(open(fresh_config.config_path, encoding="utf-8"))
+    assert on_disk["ai_engines"]["compliance_mode"] is True
+    assert on_disk["ai_engines"]["allowed_engines"] == ["gemini"]
+
+def test_batch_rolls_back_on_error(fresh_config, config_file):
+    before = config_file.read_text(encoding="utf-8")
+    with pytest.raises(RuntimeError):
+        with fresh_config.batch():
+            fresh_config.set("current_project", "demo")
+            raise RuntimeError("boom")
+    assert fresh_config.snapshot.current_project is None
+    assert config_file.read_text(encoding="utf-8") == before
+
+def test_commit_merges_concurrent_write(fresh_config, config_file):
+    # Another process changes a different key behind our back
+    other = dict(SAMPLE_SETTINGS, projects_root_dir="shared/projects")
+    config_file.write_text(yaml.safe_dump(other) + "\n", encoding="utf-8")
+    fresh_config.set("current_project", "demo")
+    on_disk = yaml.safe_load(config_file.read_text(encoding="utf-8"))
+    assert on_disk["projects_root_dir"] == "shared/projects"
+    assert on_disk["current_project"] == "demo"
+
+def test_atomic_write_leaves_no_temp_files(fresh_config, tmp_path):
+    fresh_config.set("current_project", "demo")
+    leftovers = [p.name for p in tmp_path.iterdir() if p.name.endswith(".tmp")]
+    assert leftovers == []
+
+def test_save_keeps_the_file_mode(fresh_config, config_file):
+    os.chmod(config_file, 0o644)
+    fresh_config.set("current_project", "demo")
+    assert stat.S_IMODE(os.stat(config_file).st_mode) == 0o644
+
+def test_generation_profiles_merge_with_builtin_micro_tier():
+    settings = dict(SAMPLE_SETTINGS, generation={
+        "filename_suggestion": {"gemini": {"max_tokens": 16}},
+        "summary": {"claude": {"temperature": 0.5}},
+    })
+    profiles = compile_config(settings).generation
+    assert profiles["filename_suggestion"]["gemini"].max_tokens == 16
+    assert profiles["filename_suggestion"]["gemini"].model_name == "gemini-2.5-flash-lite"
+    assert profiles["query_rewrite"]["claude"].stop_sequences == ("\n",)
+    assert profiles["summary"]["claude"].temperature == 0.5
+    with pytest.raises(ConfigError, match="generation.summary"):
+        compile_config(dict(SAMPLE_SETTINGS, generation={"summary": {"cursor": {}}}))
@@ -0,0 +1,69 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock
+from airis.daemon import AirisDaemon, DaemonError, ping, send_control, send_task
+
+@pytest.fixture
+def socket_path():
+    # Unix socket paths are limited to ~100 characters, so avoid pytest's tmp_path
+    directory = tempfile.mkdtemp(prefix="airis-test-", dir="/tmp")
+    yield os.path.join(directory, "airis.sock")
+    shutil.rmtree(directory, ignore_errors=True)
+
+@pytest.fixture
+def orchestrator():
+    mock = MagicMock()
+    def delegate(prompt):
+        print("working on", prompt)
+        return f"done: {prompt}", None
+    mock.delegate_task.side_effect = delegate
+    return mock
+
+@pytest.fixture
+def daemon(socket_path, orchestrator):
+    daemon = AirisDaemon(socket_path, orchestrator_factory=lambda: orchestrator)
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    for _ in range(100):
+        if ping(socket_path) is not None:
+            break
+        time.sleep(0.02)
+    yield daemon
+    daemon.stop()
+    thread.join(timeout=5)
+
+def test_ping_reports_status(daemon, socket_path):
+    status = ping(socket_path)
+    assert status["pid"] == os.getpid()
+    assert status["tasks_served"] == 0
+
+def test_task_output_is_streamed_and_result_returned(daemon, socket_path, orchestrator):
+    chunks = []
+    result = send_task("run shell command", chunks.append, socket_path=socket_path)
+    assert result == ("done: run shell command", None)
+    assert "working on run shell command" in "".join(chunks)
+    # The orchestrator stays warm across tasks
+    send_task("again", chunks.append, socket_path=socket_path)
+    assert orchestrator.delegate_task.call_count == 2
+    assert daemon.tasks_served == 2
+
+def test_task_error_is_reported(daemon, socket_path, orchestrator):
+    orchestrator.delegate_task.side_effect = ValueError("boom")
+    with pytest.raises(DaemonError, match="boom"):
+        send_task("fail", lambda _: None, socket_path=socket_path)
+
+def test_no_daemon_returns_none(socket_path):
+    assert ping(socket_path) is None
+    assert send_task("x", lambda _: None, socket_path=socket_path) is None
+
+def test_shutdown_removes_socket(daemon, socket_path):
+    assert send_control("shutdown", socket_path=socket_path) == "Airis daemon stopping."
+    for _ in range(100):
+        if not os.path.exists(socket_path):
+            break
+        time.sleep(0.02)
+    assert not os.path.exists(socket_path)
@@ -0,0 +1,62 @@
+from unittest.mock import MagicMock, patch
+from airis.config_schema import compile_config
+from airis.engine_stats import EngineStatsTracker
+
+def routing(**settings):
+    fake = MagicMock()
+    fake.snapshot = compile_config({"routing": {"exploration_rate": 0, "min_samples": 2, **settings}})
+    return patch("airis.engine_stats.config", fake)
+
+def test_ewma_and_persistence(tmp_path):
+    path = str(tmp_path / "stats.json")
+    with routing(ewma_alpha=0.5):
+        tracker = EngineStatsTracker(path, save_interval=0)
+        tracker.record("gemini", "orchestration", 2.0, output_tokens=100)
+        tracker.record("gemini", "orchestration", 4.0, output_tokens=100)
+        tracker.record("gemini", "orchestration", 1.0, ok=False)
+        stats = tracker.get("gemini", "orchestration")
+        assert stats.latency == 3.0 and stats.ttft == 3.0
+        assert stats.error_rate == 0.5 and stats.samples == 3
+        reloaded = EngineStatsTracker(path).get("gemini", "orchestration")
+    assert reloaded.latency == 3.0 and list(reloaded.recent) == [2.0, 4.0]
+
+def test_rank_explores_unsampled_then_prefers_fastest(tmp_path):
+    with routing():
+        tracker = EngineStatsTracker(str(tmp_path / "stats.json"))
+        for _ in range(2):
+            tracker.record("claude", "code_generation", 5.0)
+        assert tracker.rank("code_generation", ["claude", "gemini"]) == ["gemini", "claude"]
+        for _ in range(2):
+            tracker.record("gemini", "code_generation", 1.0)
+        assert tracker.rank("code_generation", ["claude", "gemini"]) == ["gemini", "claude"]
+        for _ in range(4):
+            tracker.record("gemini", "code_generation", 30.0, ok=False)
+        # Errors make the fast engine lose its lead
+        assert tracker.rank("code_generation", ["gemini", "claude"])[0] == "claude"
+
+def test_latency_policy_picks_fastest_permitted_engine(isolated_engine_stats, make_manager):
+    manager = make_manager(task_routing={"code_generation": "claude"})
+    manager.routing_policy = "latency"
+    with routing(), patch.object(manager, "_is_engine_available", return_value=True):
+        for _ in range(2):
+            isolated_engine_stats.record("claude", "code_generation", 8.0)
+            isolated_engine_stats.record("gemini", "code_generation", 2.0)
+        assert manager.get_engine_for_task("code_generation") == "gemini"
+        manager.compliance_mode = True
+        manager.allowed_engines = ["claude"]
+        assert manager.get_engine_for_task("code_generation") == "claude"
+
+def test_test_runs_leave_the_real_stats_file_alone(tmp_path):
+    import json, os, shutil, subprocess, sys
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    shutil.copy(os.path.join(repo, "config.yaml"), tmp_path)
+    seeded = {"version": 1, "stats": {"gemini|orchestration": {"samples": 9, "latency": 1.5}}}
+    stats_file = tmp_path / ".airis" / "engine_stats.json"
+    stats_file.parent.mkdir()
+    stats_file.write_text(json.dumps(seeded), encoding="utf-8")
+    # A test recording samples, run from a directory holding real stats
+    test = os.path.join(repo, "tests", "test_engine_stats.py") + "::test_latency_policy_picks_fastest_permitted_engine"
+    result = subprocess.run([sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "--rootdir", repo, test],
+                            cwd=tmp_path, env={**os.environ, "PYTHONPATH": repo}, capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert json.loads(stats_file.read_text(encoding="utf-8")) == seeded
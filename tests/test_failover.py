@@ -0,0 +1,111 @@
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from airis.ai_factory import UnifiedAIClient
+from airis.config_schema import compile_config
+from airis.resilience import ProviderUnavailableError, get_guard
+
+pytestmark = pytest.mark.usefixtures("fresh_guards")
+
+def test_chain_respects_allowed_engines(make_manager):
+    assert make_manager().get_failover_chain("orchestration") == ["gemini", "claude"]
+    manager = make_manager(allowed_engines=["gemini"], compliance_mode=True)
+    assert manager.get_failover_chain("orchestration") == ["gemini"]
+    # allowed_engines only restricts engines in compliance mode
+    manager = make_manager(allowed_engines=["gemini"])
+    assert manager.get_failover_chain("orchestration") == ["gemini", "claude"]
+
+def test_chain_moves_open_circuits_last(make_manager):
+    manager = make_manager()
+    breaker = get_guard("gemini").breaker
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    assert manager.get_failover_chain("orchestration") == ["claude", "gemini"]
+
+def test_client_fails_over_and_records_engine(make_manager):
+    manager = make_manager()
+    client = UnifiedAIClient("orchestration")
+    client.engine = "gemini"
+    client.client = MagicMock()
+    client.client.generate_content.side_effect = ProviderUnavailableError("gemini", "down")
+    claude = MagicMock()
+    claude.invoke.return_value = MagicMock(content="from claude")
+    client._fallback_clients["claude"] = claude
+    with patch("airis.ai_factory.ai_engine_manager", manager):
+        response = client.invoke("hello")
+    assert response.content == "from claude"
+    assert response.engine == "claude" and client.last_engine == "claude"
+    assert manager.served_counts["orchestration"] == {"claude": 1}
+    assert manager.failover_count == 1
+
+def hedging_client(manager, gemini_delay):
+    fake = MagicMock()
+    fake.snapshot = compile_config({"routing": {"hedge_task_types": ["orchestration"], "hedge_default_delay": 0.05}})
+    client = UnifiedAIClient("orchestration")
+    client.engine = "gemini"
+    client.client = MagicMock()
+    client.client.generate_content.side_effect = lambda prompt, **kwargs: (time.sleep(gemini_delay), MagicMock(text="from gemini"))[1]
+    claude = MagicMock()
+    claude.invoke.return_value = MagicMock(content="from claude")
+    client._fallback_clients["claude"] = claude
+    return client, patch("airis.ai_factory.config", fake)
+
+def test_hedge_fires_when_primary_is_slow(make_manager):
+    manager = make_manager()
+    client, hedge_config = hedging_client(manager, gemini_delay=0.5)
+    with hedge_config, patch("airis.ai_factory.ai_engine_manager", manager):
+        response = client.invoke("hello")
+    assert response.content == "from claude"
+    assert manager.hedge_stats["orchestration"] == {"calls": 1, "hedged": 1, "secondary_wins": 1}
+
+def test_hedge_loser_is_cancelled(make_manager):
+    from airis.request_context import current_request
+    manager = make_manager()
+    client, hedge_config = hedging_client(manager, gemini_delay=0.5)
+    legs = []
+    slow = client.client.generate_content.side_effect
+    client.client.generate_content.side_effect = lambda prompt, **kwargs: (legs.append(current_request()),
+                                                                           slow(prompt, **kwargs))[1]
+    with hedge_config, patch("airis.ai_factory.ai_engine_manager", manager):
+        assert client.invoke("hello").content == "from claude"
+    # The primary ran as its own request, which the winning secondary cancelled
+    assert len(legs) == 1 and legs[0].cancellation.cancelled
+    assert legs[0].cancellation.reason == "another engine answered first"
+
+def test_no_hedge_when_primary_is_fast(make_manager):
+    manager = make_manager()
+    client, hedge_config = hedging_client(manager, gemini_delay=0)
+    with hedge_config, patch("airis.ai_factory.ai_engine_manager", manager):
+        response = client.invoke("hello")
+    assert response.content == "from gemini"
+    assert manager.hedge_stats["orchestration"] == {"calls": 1, "hedged": 0, "secondary_wins": 0}
+    client._fallback_clients["claude"].invoke.assert_not_called()
+
+def test_profile_calls_use_their_own_client(make_manager):
+    manager = make_manager()
+    client = UnifiedAIClient("orchestration")
+    client.engine = "gemini"
+    client.client = MagicMock()
+    micro = MagicMock()
+    micro.generate_content.return_value = MagicMock(text="fib.py")
+    with patch("airis.ai_factory.ai_engine_manager", manager), \
+         patch("airis.ai_factory.AIFactory._create_client", return_value=micro) as create:
+        assert client.invoke("name it", profile="filename_suggestion").content == "fib.py"
+    create.assert_called_once_with("gemini", "filename_suggestion")
+    client.client.generate_content.assert_not_called()
+
+def test_cancelled_request_does_not_fail_over(make_manager):
+    from airis.cancellation import OperationCancelled
+    from airis.request_context import RequestContext
+    manager = make_manager()
+    client = UnifiedAIClient("orchestration")
+    client.engine = "gemini"
+    client.client = MagicMock()
+    context = RequestContext()
+    client.client.generate_content.side_effect = lambda prompt, **kwargs: (context.cancellation.cancel(), time.sleep(1))
+    client._fallback_clients["claude"] = MagicMock()
+    with patch("airis.ai_factory.ai_engine_manager", manager), context.activate():
+        with pytest.raises(OperationCancelled):
+            client.invoke("hello")
+    client._fallback_clients["claude"].invoke.assert_not_called()
+    assert get_guard("gemini").breaker.consecutive_failures == 0
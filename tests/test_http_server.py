@@ -0,0 +1,181 @@
+import asyncio
+import http.client
+import json
+import threading
+import time
+import pytest
+from unittest.mock import MagicMock
+from airis.http_server import AirisHTTPServer
+
+@pytest.fixture
+def orchestrator():
+    mock = MagicMock()
+    def delegate(prompt, context=None):
+        print("working on", prompt)
+        if prompt == "slow":
+            time.sleep(0.5)
+        if prompt == "cancellable":
+            context.cancellation.wait(5)
+            context.check()
+        return f"done: {prompt}", None
+    mock.delegate_task.side_effect = delegate
+    return mock
+
+@pytest.fixture
+def interactive():
+    mock = MagicMock()
+    mock.start_interactive_mode.return_value = "どのような機能が必要ですか？"
+    mock.process_user_input.return_value = (True, "完了", "print('hi')")
+    mock.has_active_session.return_value = False
+    return mock
+
+@pytest.fixture
+def server(orchestrator, interactive):
+    server = AirisHTTPServer("127.0.0.1", 0, orchestrator_factory=lambda: orchestrator,
+                             interactive_factory=lambda _orch: interactive)
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result(5)
+    yield server
+    asyncio.run_coroutine_threadsafe(server.stop(), loop).result(5)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join(timeout=5)
+
+def request(server, method, path, body=None, client="tester"):
+    conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=10)
+    headers = {"X-Client-Id": client, "Content-Type": "application/json"}
+    conn.request(method, path, json.dumps(body) if body is not None else None, headers)
+    response = conn.getresponse()
+    raw = response.read().decode("utf-8")
+    conn.close()
+    return response.status, raw
+
+def test_task_wait_returns_result(server, orchestrator):
+    status, raw = request(server, "POST", "/v1/tasks", {"prompt": "list files", "wait": True})
+    assert status == 200
+    job = json.loads(raw)
+    assert job["status"] == "succeeded"
+    assert job["result"] == "done: list files"
+
+def test_async_job_can_be_polled_and_streamed(server):
+    status, raw = request(server, "POST", "/v1/tasks", {"prompt": "slow"})
+    assert status == 202
+    job_id = json.loads(raw)["job_id"]
+    status, raw = request(server, "GET", f"/v1/jobs/{job_id}/stream")
+    assert status == 200
+    assert 'event: output\ndata: {"data": "working on"}' in raw
+    assert "event: result" in raw
+    status, raw = request(server, "GET", f"/v1/jobs/{job_id}")
+    assert json.loads(raw)["result"] == "done: slow"
+
+def test_per_client_limit_rejects_excess_jobs(server):
+    for _ in range(server.jobs.per_client):
+        assert request(server, "POST", "/v1/tasks", {"prompt": "slow"})[0] == 202
+    status, raw = request(server, "POST", "/v1/tasks", {"prompt": "slow"})
+    assert status == 429
+    # Other clients are unaffected
+    assert request(server, "POST", "/v1/tasks", {"prompt": "slow"}, client="other")[0] == 202
+
+def test_timeout_marks_job(server):
+    status, raw = request(server, "POST", "/v1/tasks", {"prompt": "slow", "wait": True, "timeout": 0.1})
+    assert json.loads(raw)["status"] == "timeout"
+
+def test_interactive_session_flow(server, interactive):
+    status, raw = request(server, "POST", "/v1/sessions", {"prompt": "ツールを作って"})
+    assert status == 201
+    session_id = json.loads(raw)["session_id"]
+    status, raw = request(server, "POST", f"/v1/sessions/{session_id}/messages", {"message": "CSV出力"})
+    reply = json.loads(raw)
+    assert reply["is_complete"] is True
+    assert reply["execution_result"] == "print('hi')"
+    # Completed sessions are closed
+    assert request(server, "POST", f"/v1/sessions/{session_id}/messages", {"message": "x"})[0] == 404
+
+def test_task_runs_in_its_own_context(server, orchestrator):
+    overrides = {"code_generation": "gemini"}
+    request(server, "POST", "/v1/tasks", {"prompt": "x", "wait": True, "engine_overrides": overrides})
+    context = orchestrator.delegate_task.call_args.args[1]
+    assert context.engine_overrides == overrides
+    assert context.deadline is not None
+
+def test_bad_request(server):
+    assert request(server, "POST", "/v1/tasks", {"prompt": ""})[0] == 400
+    assert request(server, "POST", "/v1/tasks", {"prompt": "x", "project": "no-such-project"})[0] == 404
+    assert request(server, "POST", "/v1/tasks", {"prompt": "x", "engine_overrides": {"a": "gpt"}})[0] == 400
+    assert request(server, "GET", "/v1/jobs/missing")[0] == 404
+
+def test_bad_content_length_is_rejected(server):
+    for length in ["abc", "-5"]:
+        conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=10)
+        conn.putrequest("POST", "/v1/tasks")
+        conn.putheader("Content-Length", length)
+        conn.endheaders()
+        assert conn.getresponse().status == 400
+        conn.close()
+
+def test_delete_cancels_running_task(server):
+    status, raw = request(server, "POST", "/v1/tasks", {"prompt": "cancellable"})
+    job_id = json.loads(raw)["job_id"]
+    while json.loads(request(server, "GET", f"/v1/jobs/{job_id}")[1])["status"] != "running":
+        time.sleep(0.01)
+    status, raw = request(server, "DELETE", f"/v1/jobs/{job_id}")
+    assert status == 200 and json.loads(raw)["status"] == "cancelled"
+    job = server.jobs.get(job_id)
+    assert job.cancellation.cancelled and job.cancellation.reason == "cancelled by client"
+
+def test_job_timed_out_in_the_queue_never_runs():
+    from airis.http_server import JobManager
+
+    async def scenario():
+        jobs = JobManager(workers=1, max_queue=2, per_client=5, default_timeout=5)
+        release = threading.Event()
+        queued_fn = MagicMock(return_value=("ran", None))
+        blocker = jobs.submit("task", "c", lambda job: (release.wait(5), None))
+        queued = jobs.submit("task", "c", queued_fn, timeout=0.05)
+        while queued.status != "timeout":
+            await asyncio.sleep(0.01)
+        release.set()
+        while blocker.status != "succeeded":
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        return queued, queued_fn
+
+    queued, queued_fn = asyncio.run(scenario())
+    assert queued.status == "timeout" and queued_fn.call_count == 0
+
+def test_cancel_and_start_race_has_one_winner():
+    from airis.http_server import JOB_CANCELLED, JOB_RUNNING, Job
+    loop = asyncio.new_event_loop()
+    for _ in range(200):
+        job = Job("task", "c", 5, loop)
+        barrier = threading.Barrier(2)
+        outcome = {}
+        def run(name, transition):
+            barrier.wait()
+            outcome[name] = transition()
+        threads = [threading.Thread(target=run, args=("started", job.start)),
+                   threading.Thread(target=run, args=("cancelled", lambda: job.cancel("x")))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # A job without a token can't be cancelled once running, nor run once cancelled
+        assert outcome["started"] != outcome["cancelled"]
+        assert job.status == (JOB_RUNNING if outcome["started"] else JOB_CANCELLED)
+    loop.close()
+
+def test_timed_out_session_message_is_cancelled(server, interactive):
+    from airis.request_context import RequestContext, current_request
+    def slow_reply(message):
+        current_request().cancellation.wait(5)
+        current_request().check()
+    interactive.process_user_input.side_effect = slow_reply
+    interactive.current_session = MagicMock(context=RequestContext())
+    status, raw = request(server, "POST", "/v1/sessions", {"prompt": "ツールを作って"})
+    session_id = json.loads(raw)["session_id"]
+    status, _ = request(server, "POST", f"/v1/sessions/{session_id}/messages", {"message": "x", "timeout": 0.1})
+    assert status == 504
+    handle = server.sessions.get(session_id, "tester")
+    # The worker gave up and released the session
+    assert handle.lock.acquire(timeout=2)
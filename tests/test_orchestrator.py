@@ -1,5 +1,5 @@
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 from airis.orchestrator import Orchestrator
 from agents.code_agent import CodeAgent
 from agents.shell_agent import ShellAgent
@@ -15,14 +15,14 @@ def mock_llm_client():
 
 @pytest.fixture
 def mock_code_agent():
-    with patch('airis.orchestrator.CodeAgent') as mock:
+    with patch('agents.code_agent.CodeAgent') as mock:
         mock_instance = mock.return_value
         mock_instance.execute.return_value = ("Code executed successfully.", "def test_func(): pass")
         yield mock_instance
 
 @pytest.fixture
 def mock_git_agent():
-    with patch('airis.orchestrator.GitAgent') as mock:
+    with patch('agents.git_agent.GitAgent') as mock:
         mock_instance = mock.return_value
         mock_instance._check_git_repo.return_value = True
         mock_instance.execute.return_value = "✅ Git operations completed"
@@ -30,7 +30,7 @@ def mock_git_agent():
 
 @pytest.fixture
 def mock_shell_agent():
-    with patch('airis.orchestrator.ShellAgent') as mock:
+    with patch('agents.shell_agent.ShellAgent') as mock:
         mock_instance = mock.return_value
         mock_instance.execute.return_value = "Command executed successfully."
         yield mock_instance
@@ -38,20 +38,44 @@ def mock_shell_agent():
 def test_orchestrator_delegates_to_code_agent(orchestrator, mock_code_agent, mock_llm_client, mock_git_agent):
     mock_llm_client.invoke.return_value.content = "test_file.py"
     result = orchestrator.delegate_task("write python code")
-    mock_code_agent.execute.assert_called_once_with("write python code")
+    mock_code_agent.execute.assert_called_once_with("write python code", request_context=ANY)
     assert "Code executed successfully." in result[0]
     assert "Code saved to:" in result[0]
     assert "test_file.py" in result[0]
 
 def test_orchestrator_delegates_to_shell_agent(orchestrator, mock_shell_agent):
     result = orchestrator.delegate_task("run shell command")
-    mock_shell_agent.execute.assert_called_once_with("run shell command")
+    mock_shell_agent.execute.assert_called_once_with("run shell command", request_context=ANY)
     assert "Command executed successfully." in result
 
 def test_orchestrator_defaults_to_code_agent(orchestrator, mock_code_agent, mock_llm_client, mock_git_agent):
     mock_llm_client.invoke.return_value.content = "default.py"
     result = orchestrator.delegate_task("just a task")
-    mock_code_agent.execute.assert_called_once_with("just a task")
+    mock_code_agent.execute.assert_called_once_with("just a task", request_context=ANY)
     assert "Code executed successfully." in result[0]
     assert "Code saved to:" in result[0]
     assert "default.py" in result[0]
+
+def test_cursor_edit_prompt_is_trimmed_to_the_budget(orchestrator, mock_code_agent):
+    from airis.config_schema import compile_config
+    from airis.request_context import RequestContext
+    fake = MagicMock()
+    fake.snapshot = compile_config({"tokens": {"prompt_budgets": {"default": 500}}})
+    with patch('agents.cursor_agent.CursorAgent') as cursor, patch('airis.prompt_budget.config', fake):
+        cursor.return_value.get_active_file_content.return_value = ("app.py", "x = 1\n" * 5000)
+        cursor.return_value.apply_diff.return_value = True
+        orchestrator._handle_cursor_edit("rename x to y", RequestContext())
+    prompt = mock_code_agent.execute.call_args.args[0]
+    assert "File Path: app.py" in prompt and prompt.rstrip().endswith("Task: rename x to y")
+    assert len(prompt) < 5000
+
+@pytest.mark.parametrize("reply, expected", [
+    ("fibonacci.py\n", "fibonacci.py"),
+    ("`tetris.py`", "tetris.py"),
+    ("", "main.py"),
+    ("Here is a good filename", "main.py"),
+    ("../../etc/passwd.py", "main.py"),
+])
+def test_suggest_filename_falls_back_to_a_default(orchestrator, mock_llm_client, reply, expected):
+    mock_llm_client.invoke.return_value.content = reply
+    assert orchestrator.suggest_filename("fib", "def fib(): pass") == expected
@@ -0,0 +1,96 @@
+import json
+from unittest.mock import MagicMock, patch
+
+from airis.config_schema import compile_config
+from airis.project_memory import ProjectMemory
+
+
+def memory_config(**settings):
+    fake = MagicMock()
+    fake.snapshot = compile_config({"memory": settings})
+    return fake
+
+
+def test_updates_are_journaled_and_replayed(tmp_path):
+    with patch("airis.project_memory.config", memory_config()):
+        memory = ProjectMemory("demo", str(tmp_path))
+        with memory.batch():
+            for i in range(3):
+                memory.add_note(f"要件: {i}")
+        memory.update_specifications("言語", "Python")
+        for i in range(52):
+            memory.add_conversation(f"質問{i}", "回答")
+
+        # Nothing rewrites the snapshot; every update is one journal line
+        assert not (tmp_path / "demo/.airis_memory/context.json").exists()
+        journal = (tmp_path / "demo/.airis_memory/context.journal.jsonl").read_text(encoding="utf-8")
+        assert len(journal.splitlines()) == 56
+
+        loaded = ProjectMemory("demo", str(tmp_path))
+        assert loaded.memory["notes"] == memory.memory["notes"]
+        assert loaded.memory["specifications"] == {"言語": "Python"}
+        assert len(loaded.memory["conversation_history"]) == 50
+        assert loaded.memory["conversation_history"][0]["user_prompt"] == "質問2"
+
+
+def test_journal_is_compacted_into_the_snapshot(tmp_path):
+    with patch("airis.project_memory.config", memory_config(compact_every=4)):
+        memory = ProjectMemory("demo", str(tmp_path))
+        for i in range(5):
+            memory.add_note(f"メモ{i}")
+        memory_dir = tmp_path / "demo/.airis_memory"
+
+        snapshot = json.loads((memory_dir / "context.json").read_text(encoding="utf-8"))
+        assert snapshot["journal_seq"] == 4 and len(snapshot["notes"]) == 4
+        assert len((memory_dir / "context.journal.jsonl").read_text(encoding="utf-8").splitlines()) == 1
+
+        # Entries already in the snapshot are not applied twice
+        with open(memory_dir / "context.journal.jsonl", "a", encoding="utf-8") as f:
+            f.write(json.dumps({"seq": 3, "at": "x", "op": "append", "field": "notes", "value": {}}) + "\n")
+        loaded = ProjectMemory("demo", str(tmp_path))
+        assert [note["content"] for note in loaded.memory["notes"]] == [f"メモ{i}" for i in range(5)]
+        assert "journal_seq" not in loaded.memory
+
+
+def test_search_finds_entries_beyond_the_working_set(tmp_path):
+    with patch("airis.project_memory.config", memory_config()):
+        memory = ProjectMemory("demo", str(tmp_path))
+        memory.add_note("初期メモ: テトリスのスコア計算")
+        for i in range(60):
+            memory.add_conversation(f"電卓の改善 {i}", "回答" + "x" * 600)
+        memory.add_ai_interaction("code", "テトリスを作って", "ブロックの回転を実装しました")
+
+        hits = memory.search("テトリス")
+        assert {hit.kind for hit in hits} == {"note", "interaction"}
+        # Truncated in the working set, complete in the archive
+        assert len(memory.search("電卓の改善", limit=100)) == 60
+        assert len(memory.search("電卓 0")[0].text) > 600
+        assert memory.search("存在しない語") == []
+
+    # Entries from before the archive existed are imported into it
+    memory._archive.close()
+    with patch("airis.project_memory.config", memory_config()):
+        (tmp_path / "demo/.airis_memory/memory.db").unlink()
+        reloaded = ProjectMemory("demo", str(tmp_path))
+        assert len(reloaded.search("電卓の改善", limit=100)) == 50
+
+
+def test_switching_projects_keeps_one_writer_per_journal(tmp_path):
+    from airis.project_memory import ProjectMemoryManager
+    with patch("airis.project_memory.config", memory_config()):
+        manager = ProjectMemoryManager()
+        job = manager.get_memory("demo", str(tmp_path))
+        user = manager.load_project_memory("demo", str(tmp_path))
+        assert user is job and manager.get_current_memory() is job
+        job.add_note("from job")
+        user.add_note("from user")
+
+        loaded = ProjectMemory("demo", str(tmp_path))
+        assert [note["content"] for note in loaded.memory["notes"]] == ["from job", "from user"]
+
+
+def test_first_entry_of_a_new_project_is_archived_once(tmp_path):
+    with patch("airis.project_memory.config", memory_config()):
+        memory = ProjectMemory("demo", str(tmp_path))
+        memory.add_note("テトリスを作る")
+        assert len(memory.search("テトリス")) == 1
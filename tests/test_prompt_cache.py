@@ -0,0 +1,101 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from airis.ai_factory import UnifiedAIClient
+from airis.config_schema import compile_config
+from airis.interactive_mode import InteractiveSession
+from airis.prompt_cache import GeminiContextCache
+from airis.request_context import RequestContext
+from airis.resilience import estimate_tokens
+
+pytestmark = pytest.mark.usefixtures("fresh_guards")
+
+class FakeClaudeChat:
+    """Local stand-in for ChatAnthropic that honours cache breakpoints like Anthropic does."""
+
+    def __init__(self):
+        self.cache = set()
+        self.requests = []
+
+    def invoke(self, messages, timeout=None):
+        self.requests.append(messages)
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        texts = []
+        breakpoints = []
+        for message in messages:
+            content = message["content"]
+            for block in content if isinstance(content, list) else [{"type": "text", "text": content}]:
+                texts.append(block["text"])
+                if "cache_control" in block:
+                    breakpoints.append(len(texts))
+        # Reads hit the longest cached prefix at any block boundary; breakpoints write the cache
+        key = lambda n: "\x00".join(texts[:n])
+        hit = max((n for n in range(1, len(texts) + 1) if key(n) in self.cache), default=0)
+        cache_read = sum(estimate_tokens(text) for text in texts[:hit])
+        self.cache.update(key(n) for n in breakpoints)
+        usage = {"input_tokens": sum(estimate_tokens(text) for text in texts), "output_tokens": 1,
+                 "input_token_details": {"cache_read": cache_read}}
+        return SimpleNamespace(content="ok", usage_metadata=usage)
+
+def claude_client():
+    client = UnifiedAIClient("interactive_mode")
+    client.engine = "claude"
+    client.client = FakeClaudeChat()
+    return client
+
+def test_repeated_prefix_is_read_from_cache(isolated_usage_ledger, make_manager):
+    client = claude_client()
+    prefix = "Airis system context. " * 200
+    with patch("airis.ai_factory.ai_engine_manager", make_manager(default_engine="claude")), \
+            RequestContext(project="demo").activate():
+        first = client.invoke("question 1", prefix=prefix)
+        second = client.invoke("question 2", prefix=prefix)
+    assert first.cache_read_tokens == 0
+    assert second.cache_read_tokens == estimate_tokens(prefix)
+    assert client.client.requests[1][0]["content"][0]["cache_control"] == {"type": "ephemeral"}
+    assert isolated_usage_ledger.get("demo", "claude").cache_read_tokens == second.cache_read_tokens
+    assert "cached=" in isolated_usage_ledger.format()
+
+def test_gemini_caches_long_prefixes_once():
+    fake = MagicMock()
+    fake.snapshot = compile_config({"tokens": {"gemini_cache_min_tokens": 50}})
+    cache = GeminiContextCache()
+    settings = compile_config({}).gemini
+    with patch("airis.prompt_cache.config", fake), patch.object(cache, "_create", return_value="cached") as create, \
+            patch.object(cache, "_build", side_effect=lambda settings, prefix: f"plain:{prefix}") as build:
+        # Short prefixes only become the system instruction
+        assert cache.model_for(settings, "short") == "plain:short"
+        assert cache.model_for(settings, "short") == "plain:short" and build.call_count == 1
+        assert cache.model_for(settings, "long prefix " * 100) == "cached"
+        assert cache.model_for(settings, "long prefix " * 100) == "cached"
+        assert create.call_count == 1
+        # Transient failures fall back to a plain model and are retried
+        create.side_effect = RuntimeError("503 service unavailable")
+        assert cache.model_for(settings, "retried prefix " * 100).startswith("plain:")
+        create.side_effect = None
+        assert cache.model_for(settings, "retried prefix " * 100) == "cached"
+        assert create.call_count == 3
+        create.side_effect = RuntimeError("caching not supported")
+        assert cache.model_for(settings, "another prefix " * 100).startswith("plain:")
+        # Unsupported models are not retried
+        cache.model_for(settings, "third prefix " * 100)
+        assert create.call_count == 4
+
+def test_interactive_turns_only_send_the_new_message(isolated_usage_ledger, make_manager):
+    client = claude_client()
+    with patch("airis.llm.UnifiedAIClient", return_value=client), \
+            patch("airis.ai_factory.ai_engine_manager", make_manager(default_engine="claude")):
+        session = InteractiveSession(RequestContext())
+        session.start_session("Pythonでテトリスを作って")
+        for i in range(4):
+            session.continue_conversation(f"回答{i}")
+    first_turn = client.client.requests[0]
+    last_turn = client.client.requests[-1]
+    # The system prompt is identical every turn; earlier turns are chat messages
+    assert last_turn[0] == first_turn[0]
+    assert [m["role"] for m in last_turn[1:]] == ["user", "assistant"] * 4 + ["user"]
+    assert last_turn[-1]["content"] == "回答3"
+    # Everything but the newest exchange is read from the cache, so new input stays flat
+    uncached = [tokens - cached for tokens, cached in session.chat.turn_tokens]
+    assert len(set(uncached[2:])) == 1 and uncached[2] < uncached[0]
@@ -0,0 +1,70 @@
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from airis.repl_jobs import JOB_CANCELLED, JOB_DONE, JOB_QUEUED, JobRunner
+from airis.request_context import RequestContext
+
+
+@pytest.fixture
+def runner():
+    lines = []
+    runner = JobRunner(max_jobs=1, echo=lines.append)
+    runner.lines = lines
+    yield runner
+    runner.shutdown()
+
+
+def test_jobs_run_in_the_background_with_bounded_concurrency(runner):
+    release = threading.Event()
+
+    def slow(context):
+        print("ステップ1")
+        release.wait(5)
+        return "結果", "print(1)"
+
+    first = runner.submit("develop: app", slow, RequestContext())
+    second = runner.submit("web search", lambda context: ("検索結果", None), RequestContext())
+    # submit returns immediately; the second job waits for the only worker
+    assert second.status == JOB_QUEUED
+    release.set()
+
+    assert runner.wait(second.id, timeout=5).result == "検索結果"
+    assert first.status == JOB_DONE and first.code == "print(1)"
+    assert "[1] ステップ1" in runner.lines
+    assert any(line.startswith("[1] 完了") for line in runner.lines)
+
+
+def test_cancel_stops_a_running_job(runner):
+    started = threading.Event()
+
+    def wait_for_cancel(context):
+        started.set()
+        context.cancellation.wait(5)
+        context.check()
+        return "not reached", None
+
+    job = runner.submit("develop: app", wait_for_cancel, RequestContext())
+    started.wait(5)
+    runner.cancel(job.id)
+
+    assert runner.wait(job.id, timeout=5).status == JOB_CANCELLED
+    assert runner.running() == []
+    with pytest.raises(KeyError):
+        runner.cancel(99)
+
+
+def test_queued_quick_requests_run_their_own_prompt(runner):
+    from airis.interactive_cli import submit_quick
+    release = threading.Event()
+    orchestrator = MagicMock()
+    orchestrator.delegate_task.side_effect = lambda request, context: (release.wait(5), (request, None))[1]
+
+    first = submit_quick(runner, orchestrator, "first")
+    # Queued behind the only worker until the first job finishes
+    second = submit_quick(runner, orchestrator, "second")
+    release.set()
+
+    assert runner.wait(first.id, timeout=5).result == "first"
+    assert runner.wait(second.id, timeout=5).result == "second"
@@ -0,0 +1,42 @@
+import time
+import pytest
+from unittest.mock import MagicMock, patch
+from airis.orchestrator import Orchestrator
+from airis.request_context import RequestContext
+
+def test_engine_overrides_and_deadline():
+    context = RequestContext(engine_overrides={"code_generation": "gemini", "default": "claude"}, deadline=time.monotonic() - 1)
+    assert context.engine_for("code_generation") == "gemini"
+    assert context.engine_for("web_search") == "claude"
+    assert context.expired
+    assert context.remaining() == 0.0
+    assert RequestContext().remaining() is None
+
+def test_from_config_explicit_deadline_wins_over_timeout():
+    deadline = time.monotonic() + 1000
+    assert RequestContext.from_config(timeout=5, deadline=deadline).deadline == deadline
+    assert RequestContext.from_config(deadline=deadline).deadline == deadline
+    assert RequestContext.from_config(timeout=5).remaining() <= 5
+
+def test_project_path_requires_project():
+    assert RequestContext(project="demo", projects_root="root").project_path("src") == "root/demo/src"
+    with pytest.raises(ValueError):
+        RequestContext().project_path("src")
+
+def test_from_config_attaches_shared_memory(tmp_path):
+    first = RequestContext.from_config(project="demo", projects_root=str(tmp_path), timeout=5)
+    second = RequestContext.from_config(project="demo", projects_root=str(tmp_path))
+    assert first.memory is second.memory
+    assert first.memory.project_name == "demo"
+    assert 0 < first.remaining() <= 5
+    assert first.trace_id != second.trace_id
+
+def test_concurrent_projects_write_into_their_own_tree(tmp_path):
+    orchestrator = Orchestrator()
+    with patch("airis.orchestrator.llm_client") as llm:
+        llm.invoke.return_value = MagicMock(content="# README")
+        for project in ("alpha", "beta"):
+            context = RequestContext(project=project, projects_root=str(tmp_path))
+            orchestrator.delegate_task("generate docs readme", context)
+    assert (tmp_path / "alpha" / "doc" / "README.md").exists()
+    assert (tmp_path / "beta" / "doc" / "README.md").exists()
@@ -0,0 +1,121 @@
+import pytest
+from unittest.mock import MagicMock
+from airis.config_schema import EngineLimits, ResilienceSettings
+from airis.resilience import (CircuitBreaker, CircuitOpenError, EngineGuard, ProviderError,
+                              ProviderUnavailableError, RateLimitError, classify_error, reset_guards)
+
+class ResourceExhausted(Exception):
+    """Stand-in for google.api_core.exceptions.ResourceExhausted."""
+
+class APIStatusError(Exception):
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+    def __call__(self):
+        return self.now
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+def make_guard(clock, **overrides):
+    settings = ResilienceSettings(**{"max_retries": 2, "failure_threshold": 3, "reset_timeout": 10, **overrides})
+    return EngineGuard("gemini", settings, EngineLimits(), clock=clock, sleep=clock.sleep,
+                       rng=lambda low, high: high)
+
+def test_classify_error():
+    assert isinstance(classify_error("gemini", ResourceExhausted("quota")), RateLimitError)
+    assert isinstance(classify_error("claude", APIStatusError("overloaded", 529)), ProviderUnavailableError)
+    assert isinstance(classify_error("claude", APIStatusError("bad request", 400)), ProviderError)
+    assert isinstance(classify_error("gemini", TimeoutError()), ProviderUnavailableError)
+
+def test_retries_with_backoff_then_succeeds():
+    clock = FakeClock()
+    guard = make_guard(clock)
+    fn = MagicMock(side_effect=[ResourceExhausted("429"), ResourceExhausted("429"), "ok"])
+    assert guard.call(fn) == "ok"
+    assert clock.sleeps == [0.5, 1.0]
+    metrics = guard.metrics()
+    assert metrics["retries"] == 2 and metrics["rate_limited"] == 2 and metrics["successes"] == 1
+
+def test_exhausted_retries_raise_typed_error():
+    clock = FakeClock()
+    guard = make_guard(clock)
+    with pytest.raises(RateLimitError) as info:
+        guard.call(MagicMock(side_effect=ResourceExhausted("429")))
+    assert info.value.engine == "gemini"
+    assert guard.metrics()["failures"] == 1
+
+def test_non_retryable_errors_are_not_retried():
+    guard = make_guard(FakeClock())
+    fn = MagicMock(side_effect=APIStatusError("invalid", 400))
+    with pytest.raises(ProviderError):
+        guard.call(fn)
+    assert fn.call_count == 1
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+def test_circuit_opens_and_recovers():
+    clock = FakeClock()
+    guard = make_guard(clock, max_retries=0)
+    for _ in range(3):
+        with pytest.raises(ProviderUnavailableError):
+            guard.call(MagicMock(side_effect=TimeoutError()))
+    assert guard.breaker.state == CircuitBreaker.OPEN
+    fn = MagicMock(return_value="ok")
+    with pytest.raises(CircuitOpenError):
+        guard.call(fn)
+    assert fn.call_count == 0
+    clock.now += 10
+    assert guard.call(fn) == "ok"
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+def test_cancelled_half_open_probe_frees_the_probe_slot():
+    from airis.cancellation import OperationCancelled
+    clock = FakeClock()
+    guard = make_guard(clock, max_retries=0, failure_threshold=1)
+    with pytest.raises(ProviderUnavailableError):
+        guard.call(MagicMock(side_effect=TimeoutError()))
+    clock.now += 10
+    with pytest.raises(OperationCancelled):
+        guard.call(MagicMock(side_effect=OperationCancelled("cancelled")))
+    # The cancelled probe decided nothing; the next call is the probe
+    assert guard.breaker.state == CircuitBreaker.HALF_OPEN
+    assert guard.call(MagicMock(return_value="ok")) == "ok"
+    assert guard.breaker.state == CircuitBreaker.CLOSED
+
+def test_rate_limit_wait_respects_the_request_deadline_and_cancellation():
+    import time
+    from airis.cancellation import DeadlineExceeded, OperationCancelled
+    from airis.request_context import RequestContext
+    clock = FakeClock()
+    settings = ResilienceSettings(max_retries=0)
+    guard = EngineGuard("gemini", settings, EngineLimits(requests_per_minute=1), clock=clock, sleep=clock.sleep)
+    assert guard.call(MagicMock(return_value="ok")) == "ok"
+    fn = MagicMock(return_value="ok")
+    # The next token is a minute away; a request with two seconds left gives up at once
+    with RequestContext(deadline=time.monotonic() + 2).activate():
+        with pytest.raises(DeadlineExceeded):
+            guard.call(fn)
+    context = RequestContext()
+    context.cancellation.cancel("user")
+    with context.activate():
+        with pytest.raises(OperationCancelled):
+            guard.call(fn)
+    assert fn.call_count == 0 and clock.sleeps == []
+
+def test_unified_client_raises_instead_of_returning_error_text():
+    from airis.ai_factory import UnifiedAIClient
+    reset_guards()
+    client = UnifiedAIClient("orchestration")
+    client.engine = "gemini"
+    client.client = MagicMock()
+    client.client.generate_content.side_effect = APIStatusError("API key not valid", 400)
+    with pytest.raises(ProviderError, match="API key not valid"):
+        client.invoke("hello")
+    client.client.generate_content.side_effect = None
+    client.client.generate_content.return_value = MagicMock(text="hi")
+    assert client.invoke("hello").content == "hi"
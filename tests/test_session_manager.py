@@ -0,0 +1,78 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from airis.interactive_mode import InteractiveOrchestrator
+from airis.request_context import RequestContext
+from airis.session_manager import SessionManager
+
+
+def scripted_client(replies):
+    client = MagicMock()
+    client.invoke.side_effect = [MagicMock(content=reply, input_tokens=None, cache_read_tokens=0)
+                                 for reply in replies]
+    return client
+
+
+@pytest.fixture
+def manager(isolated_session_store):
+    client = scripted_client(["【確認事項】\n1. 言語は？", "【確認事項】\n1. 色は？", "【確認事項】\n1. 音は？"])
+    manager = SessionManager(lambda: InteractiveOrchestrator(MagicMock(), llm_client=client), max_hot=1)
+    manager.client = client
+    return manager
+
+
+def start(manager, prompt):
+    handle, interactive = manager.create("client", RequestContext())
+    with handle.lock:
+        interactive.start_interactive_mode(prompt, RequestContext())
+    manager.release(handle)
+    return handle
+
+
+def test_least_recently_used_session_spills_and_comes_back_from_its_journal(manager):
+    first = start(manager, "テトリスを作って")
+    start(manager, "電卓を作って")
+
+    stats = manager.stats()
+    assert (stats["hot"], stats["cold"], stats["spilled"]) == (1, 1, 1)
+    assert 0 < stats["bytes_per_cold_session"] < 2048
+    # A spilled session's history is read straight from the journal
+    assert manager.history(first) == [{"user": "テトリスを作って", "reply": "【確認事項】\n1. 言語は？"}]
+
+    calls = manager.client.invoke.call_count
+    with first.lock:
+        interactive = manager.checkout(first)
+        assert manager.client.invoke.call_count == calls
+        interactive.process_user_input("Python")
+    manager.release(first)
+
+    assert manager.stats()["hydrated"] == 1
+    assert [turn["user"] for turn in manager.history(first)] == ["テトリスを作って", "Python"]
+
+
+def test_idle_sessions_expire(manager):
+    handle = start(manager, "テトリスを作って")
+    manager.idle_ttl = 60
+    handle.last_used = time.time() - 120
+
+    with pytest.raises(KeyError):
+        manager.get(handle.id, "client")
+    assert len(manager) == 0 and manager.stats()["expired"] == 1
+
+
+def test_dropped_sessions_cancel_their_draft(manager):
+    manager.max_hot = 2
+    expired, expired_interactive = manager.create("client", RequestContext())
+    closed, closed_interactive = manager.create("client", RequestContext())
+    expired_interactive.speculator = MagicMock()
+    closed_interactive.speculator = MagicMock()
+    manager.idle_ttl = 60
+    expired.last_used = time.time() - 120
+
+    manager.expire()
+    expired_interactive.speculator.cancel.assert_called_once_with()
+    closed_interactive.speculator.cancel.assert_not_called()
+    manager.close(closed.id)
+    closed_interactive.speculator.cancel.assert_called_once_with()
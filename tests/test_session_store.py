@@ -0,0 +1,42 @@
+from unittest.mock import MagicMock, patch
+
+from airis.interactive_mode import InteractiveOrchestrator, InteractiveSession
+from airis.request_context import RequestContext
+from airis.speculation import Draft
+
+
+def scripted_client(replies):
+    client = MagicMock()
+    client.invoke.side_effect = [MagicMock(content=reply, input_tokens=None, cache_read_tokens=0)
+                                 for reply in replies]
+    return client
+
+
+def test_resumed_session_continues_without_replaying_llm_calls(isolated_session_store):
+    replies = ["【確認事項】\n1. 言語は？", "【要件確定】\n- 機能: テトリス", "【追加確認事項】\n1. 色は？"]
+    with patch("airis.llm.LLMClient", return_value=scripted_client(replies[:2])):
+        session = InteractiveSession(RequestContext())
+        session.start_session("テトリスを作って")
+        session.continue_conversation("Python")
+        session.record_draft(Draft("spec", "print('draft')", "tetris.py"))
+
+    resumed_client = scripted_client(replies[2:])
+    with patch("airis.llm.LLMClient", return_value=resumed_client):
+        interactive = InteractiveOrchestrator(MagicMock())
+        assert "テトリスを作って" in interactive.list_sessions(RequestContext())
+        last_reply = interactive.resume_session(session.session_id[:4], RequestContext())
+        resumed = interactive.current_session
+        assert last_reply == replies[1]
+        assert resumed_client.invoke.call_count == 0
+        assert resumed.requirements_gathered and resumed.draft.code == "print('draft')"
+        assert resumed.conversation_history == session.conversation_history
+        assert resumed.chat.messages == session.chat.messages
+
+        # The next turn sends the same chat as the original session would have
+        resumed.continue_conversation("色は自由")
+        _, kwargs = resumed_client.invoke.call_args
+        assert kwargs["history"] == tuple(session.chat.messages)
+
+    # One file per session, one line per record
+    (journal,) = isolated_session_store.iterdir()
+    assert len(journal.read_text(encoding="utf-8").splitlines()) == 6
@@ -0,0 +1,50 @@
+from unittest.mock import MagicMock
+
+from airis.interactive_mode import InteractiveSession
+from airis.request_context import RequestContext
+from airis.spec_slots import SpecSlots
+
+QUESTIONS = """【確認事項】
+1. 入力方法はどうしますか？
+   選択肢: A) キーボード B) マウス
+2. 表示はどこに出しますか？
+   選択肢: A) ターミナル B) GUIウィンドウ
+3. エラー時の挙動は？"""
+
+
+def scripted_client(replies):
+    client = MagicMock()
+    client.invoke.side_effect = [MagicMock(content=reply, input_tokens=None, cache_read_tokens=0)
+                                 for reply in replies]
+    return client
+
+
+def test_slots_fill_from_numbered_options_and_clauses():
+    slots = SpecSlots.for_request("テトリスを作って")
+    slots.observe_questions(QUESTIONS)
+    slots.observe_answer("1. A\n2: B")
+    assert slots.values["入力方法"] == "キーボード" and slots.values["出力形式"] == "GUIウィンドウ"
+    assert slots.missing == ["エラーハンドリング"]
+
+    slots = SpecSlots.for_request("テトリスを作って")
+    slots.observe_questions(QUESTIONS)
+    slots.observe_answer("矢印キー、ターミナル、何もしない")
+    assert slots.complete and slots.values["エラーハンドリング"] == "何もしない"
+    # Documents have no input method or error handling to ask about
+    assert SpecSlots.for_request("要件定義書を生成して").missing == ["出力形式"]
+
+
+def test_answering_every_field_asks_for_the_final_spec(isolated_session_store):
+    replies = [QUESTIONS, "【要件確定】\n【最終仕様】\n- 機能: テトリス\n- 入力方法: キーボード\n"
+                          "- 出力形式: ターミナル\n- エラーハンドリング: 無視"]
+    client = scripted_client(replies)
+    session = InteractiveSession(RequestContext(), llm_client=client)
+    session.start_session("テトリスを作って")
+
+    is_complete, _ = session.continue_conversation("キーボードで操作、ターミナルに表示、不正な入力は無視")
+
+    assert is_complete and client.invoke.call_count == 2
+    sent = client.invoke.call_args.args[0]
+    assert "追加の質問はせずに" in sent and "- 入力方法: キーボードで操作" in sent
+    assert session.final_specification["fields"]["出力形式"] == "ターミナル"
+    assert session.conversation_history[-2]["content"] == "キーボードで操作、ターミナルに表示、不正な入力は無視"
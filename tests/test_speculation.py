@@ -0,0 +1,61 @@
+from unittest.mock import ANY, MagicMock
+
+from airis.interactive_mode import InteractiveOrchestrator
+from airis.request_context import RequestContext
+from airis.speculation import Speculator
+
+SPEC = """以下の仕様に基づいて実装してください：
+【最終仕様】
+- 機能: テトリス
+- 入力方法: キーボード
+- 出力形式: ターミナル
+- エラーハンドリング: 不正な入力は無視
+- その他: スコア表示"""
+
+
+def fake_orchestrator():
+    orchestrator = MagicMock()
+    orchestrator.route.return_value = ("code_generation", "claude", "code")
+    orchestrator.suggest_filename.return_value = "tetris.py"
+    code_agent = orchestrator.agents.__getitem__.return_value
+    code_agent.generate.return_value = (None, "print('draft')")
+    code_agent.revise.return_value = (None, "print('revised')")
+    return orchestrator, code_agent
+
+
+def test_unchanged_spec_reuses_the_draft():
+    orchestrator, code_agent = fake_orchestrator()
+    speculator = Speculator(orchestrator)
+    assert speculator.start(SPEC, RequestContext())
+
+    draft = speculator.take(SPEC, RequestContext())
+    assert (draft.code, draft.filename) == ("print('draft')", "tetris.py")
+    code_agent.generate.assert_called_once_with(SPEC)
+    code_agent.sandbox.prewarm.assert_called_once()
+
+
+def test_changed_spec_revises_or_discards_the_draft():
+    orchestrator, code_agent = fake_orchestrator()
+    speculator = Speculator(orchestrator)
+    speculator.start(SPEC, RequestContext())
+
+    draft = speculator.take(SPEC.replace("スコア表示", "スコアとレベル表示"), RequestContext())
+    assert draft.code == "print('revised')"
+    code_agent.revise.assert_called_once_with("print('draft')", SPEC, ANY)
+    assert speculator.take("全く別のタスク：Webスクレイパーを作って", RequestContext()) is None
+
+
+def test_execute_runs_the_draft():
+    orchestrator, _ = fake_orchestrator()
+    orchestrator.delegate_task.return_value = ("Code executed successfully.", "print('draft')")
+    interactive = InteractiveOrchestrator(orchestrator)
+    interactive.speculator = Speculator(orchestrator)
+    session = interactive.current_session = MagicMock(requirements_gathered=True, context=RequestContext())
+    session.continue_conversation.return_value = (True, "【要件確定】")
+    session.get_final_prompt.return_value = SPEC
+
+    interactive.process_user_input("キーボード操作で")
+    interactive.process_user_input("execute")
+
+    _, kwargs = orchestrator.delegate_task.call_args
+    assert kwargs["draft"].code == "print('draft')"
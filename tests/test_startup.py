@@ -0,0 +1,37 @@
+import os
+import pytest
+from airis.startup_profile import (
+    DEFAULT_IMPORT_BUDGET_MS,
+    collect_import_times,
+    find_heavy_imports,
+    parse_importtime,
+    total_import_us,
+)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_OUTPUT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     yaml.error
+import time:       900 |       1020 |   yaml
+import time:       300 |       1320 | airis.config
+"""
+
+def test_parse_importtime():
+    records = parse_importtime(SAMPLE_OUTPUT)
+    assert [r.module for r in records] == ["yaml.error", "yaml", "airis.config"]
+    assert [r.depth for r in records] == [2, 1, 0]
+    assert total_import_us(records, "airis.config") == 1320
+
+@pytest.fixture(scope="module")
+def main_import_records():
+    # Best of three cold starts to keep the budget check stable on busy machines
+    runs = [collect_import_times("airis.main", cwd=REPO_ROOT) for _ in range(3)]
+    return min(runs, key=lambda records: total_import_us(records, "airis.main"))
+
+def test_cli_does_not_import_heavy_modules(main_import_records):
+    assert find_heavy_imports(main_import_records) == []
+
+def test_cold_import_within_budget(main_import_records):
+    budget_ms = float(os.environ.get("AIRIS_IMPORT_BUDGET_MS", DEFAULT_IMPORT_BUDGET_MS))
+    elapsed_ms = total_import_us(main_import_records, "airis.main") / 1000
+    assert elapsed_ms <= budget_ms, f"import airis.main took {elapsed_ms:.0f}ms (budget {budget_ms:.0f}ms)"
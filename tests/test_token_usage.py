@@ -0,0 +1,69 @@
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+from airis.ai_factory import UnifiedAIClient
+from airis.prompt_budget import TRIM_MARKER, PromptSection, fit_sections
+from airis.request_context import RequestContext
+from airis.resilience import estimate_tokens
+from airis.usage_ledger import UsageLedger, provider_usage
+
+pytestmark = pytest.mark.usefixtures("fresh_guards")
+
+def test_fit_sections_trims_lowest_priority_first():
+    sections = [
+        PromptSection("s" * 400, priority=1, name="system"),
+        PromptSection("h" * 200 + "LATEST", priority=0, name="history", keep_tail=True),
+        PromptSection("instructions " * 10),
+    ]
+    texts = fit_sections(sections, budget=None)
+    assert texts == [section.text for section in sections]
+    texts = fit_sections(sections, budget=110)
+    # History goes first (keeping its newest end), instructions are never touched
+    assert texts[1] == "" and texts[0].endswith(TRIM_MARKER)
+    assert texts[2] == sections[2].text
+    assert sum(estimate_tokens(text) for text in texts if text) <= 110
+    texts = fit_sections(sections, budget=150)
+    assert texts[0] == sections[0].text
+    assert texts[1].startswith(TRIM_MARKER) and texts[1].endswith("LATEST")
+
+def test_provider_usage_shapes():
+    gemini = SimpleNamespace(usage_metadata=SimpleNamespace(prompt_token_count=12, candidates_token_count=3))
+    claude = SimpleNamespace(usage_metadata={"input_tokens": 7, "output_tokens": 2})
+    assert provider_usage(gemini) == (12, 3, 0)
+    assert provider_usage(claude) == (7, 2, 0)
+    assert provider_usage(MagicMock()) is None
+
+def test_calls_are_recorded_per_project_and_engine(isolated_usage_ledger, tmp_path, make_manager):
+    client = UnifiedAIClient("orchestration")
+    client.engine = "gemini"
+    client.client = MagicMock()
+    client.client.generate_content.return_value = SimpleNamespace(
+        text="ok", usage_metadata=SimpleNamespace(prompt_token_count=120, candidates_token_count=30))
+    context = RequestContext(project="demo")
+    with patch("airis.ai_factory.ai_engine_manager", make_manager()), context.activate():
+        response = client.invoke("hello")
+        client.client.generate_content.return_value = MagicMock(text="no usage")
+        estimated = client.invoke("hello again")
+    assert (response.input_tokens, response.output_tokens, response.estimated) == (120, 30, False)
+    assert estimated.estimated and estimated.input_tokens == estimate_tokens("hello again")
+    entry = isolated_usage_ledger.get("demo", "gemini")
+    assert entry.calls == 2 and entry.estimated_calls == 1
+    assert entry.input_tokens == 120 + estimated.input_tokens
+    isolated_usage_ledger.save()
+    assert UsageLedger(isolated_usage_ledger.path).get("demo", "gemini").calls == 2
+    assert "demo/gemini: 2 calls" in isolated_usage_ledger.format()
+
+def test_test_runs_leave_the_real_ledger_alone(tmp_path):
+    import json, os, shutil, subprocess, sys
+    repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    shutil.copy(os.path.join(repo, "config.yaml"), tmp_path)
+    seeded = {"version": 1, "usage": {"demo|gemini": {"calls": 7, "input_tokens": 700, "output_tokens": 70}}}
+    ledger_file = tmp_path / ".airis" / "usage.json"
+    ledger_file.parent.mkdir()
+    ledger_file.write_text(json.dumps(seeded), encoding="utf-8")
+    # A test recording usage, run from a directory holding a real ledger
+    test = os.path.join(repo, "tests", "test_prompt_cache.py") + "::test_repeated_prefix_is_read_from_cache"
+    result = subprocess.run([sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "--rootdir", repo, test],
+                            cwd=tmp_path, env={**os.environ, "PYTHONPATH": repo}, capture_output=True, text=True)
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert json.loads(ledger_file.read_text(encoding="utf-8")) == seeded